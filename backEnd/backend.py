@@ -4,16 +4,22 @@ import logging
 
 from flask import Flask
 
+from serialization import JSONProvider, compress_response
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
+app.json = JSONProvider(app)
+app.after_request(compress_response)
 
 from routes_public import public_bp  # noqa: E402
 from routes_admin import admin_bp  # noqa: E402
+from routes_pages import pages_bp  # noqa: E402
 
 app.register_blueprint(public_bp)
 app.register_blueprint(admin_bp)
+app.register_blueprint(pages_bp)
 
 from services import sync_sequences, recalculate_tiers  # noqa: E402, F401
 
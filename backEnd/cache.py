@@ -1,15 +1,31 @@
 from __future__ import annotations
 
 import os
+import logging
 import tempfile
 import time
 from typing import Any
 
-from constants import CACHE_TTL_SECONDS
+import psycopg2
+
+from constants import CACHE_TTL_SECONDS, DATA_VERSION_TTL_SECONDS
+from db import get_db_connection
+
+logger = logging.getLogger(__name__)
 
 _cache_store: dict[str, tuple[Any, float]] = {}
 
-_INVALIDATION_MARKER = os.path.join(tempfile.gettempdir(), "mkreset_cache_invalidated_at")
+# (version, mtime du marqueur, instant de lecture) de la derniere lecture de
+# data_version par ce processus.
+_data_version: tuple[int, float, float] | None = None
+
+# Le marqueur doit etre visible de tous les processus qui invalident le cache :
+# workers gunicorn du backend, mais aussi worker.py, qui tourne dans un autre
+# conteneur (repertoire partage via CACHE_MARKER_DIR).
+_INVALIDATION_MARKER = os.path.join(
+    os.environ.get("CACHE_MARKER_DIR") or tempfile.gettempdir(),
+    "mkreset_cache_invalidated_at"
+)
 
 
 def _last_invalidation() -> float:
@@ -32,11 +48,54 @@ def set_cached(key: str, data: Any) -> None:
     _cache_store[key] = (data, time.time())
 
 
-def invalidate_cache() -> None:
-    _cache_store.clear()
+def _touch_marker() -> None:
     try:
         with open(_INVALIDATION_MARKER, "w") as f:
             f.write(str(time.time()))
         os.utime(_INVALIDATION_MARKER, None)
     except OSError:
         pass
+
+
+# Incremente la version globale des donnees. Appelee apres le commit de
+# l'ecriture : une lecture concurrente peut au pire etiqueter des donnees
+# neuves avec l'ancienne version, ce qui ne coute qu'un rechargement.
+def _bump_data_version() -> None:
+    with get_db_connection() as conn:
+        try:
+            with conn.cursor() as cur:
+                cur.execute("UPDATE data_version SET version = version + 1")
+            conn.commit()
+        except psycopg2.Error as e:
+            conn.rollback()
+            logger.error(f"Erreur increment data_version: {e}")
+
+
+# Le marqueur est touche avant l'increment, pour qu'aucun processus ne serve
+# une entree de cache perimee sous la nouvelle version, puis apres, pour que
+# tous relisent la version sans attendre DATA_VERSION_TTL_SECONDS.
+def invalidate_cache() -> None:
+    _cache_store.clear()
+    _touch_marker()
+    _bump_data_version()
+    _touch_marker()
+
+
+# Version globale des donnees, incrementee a chaque invalidate_cache(). Lue
+# une fois par processus, puis relue seulement si le marqueur a bouge ou si
+# la lecture date de plus de DATA_VERSION_TTL_SECONDS.
+def current_data_version() -> int:
+    global _data_version
+    marker = _last_invalidation()
+    now = time.time()
+    if _data_version is not None:
+        version, seen_marker, read_at = _data_version
+        if seen_marker == marker and now - read_at < DATA_VERSION_TTL_SECONDS:
+            return version
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT version FROM data_version")
+            version = cur.fetchone()[0]
+        conn.commit()
+    _data_version = (version, marker, now)
+    return version
@@ -63,3 +63,46 @@ TOKEN_LIFETIME_MINUTES = 60
 CACHE_TTL_SECONDS = 300
 
 DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Recherche de joueurs par nom (/joueurs/search)
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+
+# Courbe TrueSkill d'un joueur (/stats/joueur/<nom>/trueskill) : nombre de
+# points renvoyes par defaut et au plus, apres sous-echantillonnage.
+TS_SERIES_DEFAULT_POINTS = 200
+TS_SERIES_MAX_POINTS = 1000
+
+# Formats des courbes d'evolution (services.compute_ip_evolution), le premier
+# etant celui par defaut.
+EVOLUTION_FORMATS = ("rows", "columns")
+
+# Nombre d'operations conservees dans le journal d'annulation
+# (journal_operations). Au-dela, les plus anciennes ne sont plus annulables.
+JOURNAL_MAX_OPERATIONS = 200
+
+# Rejeu de l'historique apres suppression / correction d'un tournoi (replay.py).
+# Un joueur est considere comme revenu sur sa note stockee quand mu et sigma
+# en different de moins de REPLAY_EPSILON.
+REPLAY_EPSILON = 1e-6
+REPLAY_BATCH_SIZE = 100
+
+# File de taches de fond (jobs.py / worker.py)
+JOB_CHANNEL = "jobs"
+JOB_POLL_SECONDS = 5
+JOB_RETENTION_DAYS = 30
+
+# Versions de la distribution TrueSkill (distribution_stats) conservees.
+DISTRIBUTION_KEEP_VERSIONS = 50
+
+# Version globale des donnees (table data_version), servie comme ETag. Relue en
+# base au plus tard apres ce delai, meme si le marqueur d'invalidation n'a pas
+# bouge (marqueur non partage, ou non inscriptible).
+DATA_VERSION_TTL_SECONDS = 5
+
+# Compression des reponses du backend (serialization.py). En dessous de
+# COMPRESS_MIN_BYTES le gain ne compense pas le cout de la compression.
+COMPRESS_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
@@ -20,7 +20,9 @@ SET client_min_messages = warning;
 SET row_security = off;
 
 ALTER TABLE IF EXISTS ONLY public.grille_snapshots DROP CONSTRAINT IF EXISTS grille_snapshots_joueur_id_fkey;
+ALTER TABLE IF EXISTS ONLY public.tournois DROP CONSTRAINT IF EXISTS tournois_winner_id_fkey;
 ALTER TABLE IF EXISTS ONLY public.tournois DROP CONSTRAINT IF EXISTS tournois_ligue_id_fkey;
+ALTER TABLE IF EXISTS ONLY public.tournoi_pointers DROP CONSTRAINT IF EXISTS tournoi_pointers_tournoi_id_fkey;
 ALTER TABLE IF EXISTS ONLY public.saisons DROP CONSTRAINT IF EXISTS saisons_ligue_id_fkey;
 ALTER TABLE IF EXISTS ONLY public.participations DROP CONSTRAINT IF EXISTS participations_tournoi_id_fkey;
 ALTER TABLE IF EXISTS ONLY public.participations DROP CONSTRAINT IF EXISTS participations_joueur_id_fkey;
@@ -28,17 +30,30 @@ ALTER TABLE IF EXISTS ONLY public.league_movements DROP CONSTRAINT IF EXISTS lea
 ALTER TABLE IF EXISTS ONLY public.league_movements DROP CONSTRAINT IF EXISTS league_movements_saison_id_fkey;
 ALTER TABLE IF EXISTS ONLY public.league_movements DROP CONSTRAINT IF EXISTS league_movements_joueur_id_fkey;
 ALTER TABLE IF EXISTS ONLY public.league_movements DROP CONSTRAINT IF EXISTS league_movements_from_ligue_id_fkey;
+ALTER TABLE IF EXISTS ONLY public.journal_deltas DROP CONSTRAINT IF EXISTS journal_deltas_operation_id_fkey;
+ALTER TABLE IF EXISTS ONLY public.journal_deltas DROP CONSTRAINT IF EXISTS journal_deltas_joueur_id_fkey;
 ALTER TABLE IF EXISTS ONLY public.joueurs DROP CONSTRAINT IF EXISTS joueurs_ligue_id_fkey;
+ALTER TABLE IF EXISTS ONLY public.joueur_profiles DROP CONSTRAINT IF EXISTS joueur_profiles_joueur_id_fkey;
+ALTER TABLE IF EXISTS ONLY public.head_to_head DROP CONSTRAINT IF EXISTS head_to_head_joueur_b_fkey;
+ALTER TABLE IF EXISTS ONLY public.head_to_head DROP CONSTRAINT IF EXISTS head_to_head_joueur_a_fkey;
 ALTER TABLE IF EXISTS ONLY public.ghost_log DROP CONSTRAINT IF EXISTS ghost_log_tournoi_id_fkey;
 ALTER TABLE IF EXISTS ONLY public.ghost_log DROP CONSTRAINT IF EXISTS ghost_log_joueur_id_fkey;
 ALTER TABLE IF EXISTS ONLY public.awards_obtenus DROP CONSTRAINT IF EXISTS awards_obtenus_saison_id_fkey;
 ALTER TABLE IF EXISTS ONLY public.awards_obtenus DROP CONSTRAINT IF EXISTS awards_obtenus_ligue_id_fkey;
 ALTER TABLE IF EXISTS ONLY public.awards_obtenus DROP CONSTRAINT IF EXISTS awards_obtenus_joueur_id_fkey;
 ALTER TABLE IF EXISTS ONLY public.awards_obtenus DROP CONSTRAINT IF EXISTS awards_obtenus_award_id_fkey;
+DROP INDEX IF EXISTS public.jobs_pending_dedupe_key;
+DROP INDEX IF EXISTS public.idx_tournois_date_id;
 DROP INDEX IF EXISTS public.idx_tournois_date;
 DROP INDEX IF EXISTS public.idx_participations_tournoi_id;
 DROP INDEX IF EXISTS public.idx_participations_joueur_id;
+DROP INDEX IF EXISTS public.idx_league_movements_saison_joueur;
+DROP INDEX IF EXISTS public.idx_journal_operations_kind_ref;
 DROP INDEX IF EXISTS public.idx_joueurs_ligue_id;
+DROP INDEX IF EXISTS public.idx_joueurs_classement;
+DROP INDEX IF EXISTS public.idx_joueur_profiles_dirty;
+DROP INDEX IF EXISTS public.idx_jobs_pending;
+DROP INDEX IF EXISTS public.idx_head_to_head_joueur_b;
 DROP INDEX IF EXISTS public.idx_ghost_log_tournoi_id;
 DROP INDEX IF EXISTS public.idx_ghost_log_joueur_id;
 DROP INDEX IF EXISTS public.idx_awards_obtenus_saison_id;
@@ -48,16 +63,24 @@ DROP INDEX IF EXISTS public.awards_obtenus_unique_no_ligue;
 ALTER TABLE IF EXISTS ONLY public.types_awards DROP CONSTRAINT IF EXISTS types_awards_pkey;
 ALTER TABLE IF EXISTS ONLY public.types_awards DROP CONSTRAINT IF EXISTS types_awards_code_key;
 ALTER TABLE IF EXISTS ONLY public.tournois DROP CONSTRAINT IF EXISTS tournois_pkey;
+ALTER TABLE IF EXISTS ONLY public.tournoi_pointers DROP CONSTRAINT IF EXISTS tournoi_pointers_pkey;
 ALTER TABLE IF EXISTS ONLY public.saisons DROP CONSTRAINT IF EXISTS saisons_slug_key;
 ALTER TABLE IF EXISTS ONLY public.saisons DROP CONSTRAINT IF EXISTS saisons_pkey;
 ALTER TABLE IF EXISTS ONLY public.participations DROP CONSTRAINT IF EXISTS participations_pkey;
 ALTER TABLE IF EXISTS ONLY public.ligues DROP CONSTRAINT IF EXISTS ligues_pkey;
 ALTER TABLE IF EXISTS ONLY public.league_movements DROP CONSTRAINT IF EXISTS league_movements_pkey;
+ALTER TABLE IF EXISTS ONLY public.journal_operations DROP CONSTRAINT IF EXISTS journal_operations_pkey;
+ALTER TABLE IF EXISTS ONLY public.journal_deltas DROP CONSTRAINT IF EXISTS journal_deltas_pkey;
 ALTER TABLE IF EXISTS ONLY public.grille_snapshots DROP CONSTRAINT IF EXISTS grille_snapshots_pkey;
 ALTER TABLE IF EXISTS ONLY public.joueurs DROP CONSTRAINT IF EXISTS joueurs_pkey;
 ALTER TABLE IF EXISTS ONLY public.joueurs DROP CONSTRAINT IF EXISTS joueurs_nom_key;
+ALTER TABLE IF EXISTS ONLY public.joueur_profiles DROP CONSTRAINT IF EXISTS joueur_profiles_pkey;
+ALTER TABLE IF EXISTS ONLY public.jobs DROP CONSTRAINT IF EXISTS jobs_pkey;
+ALTER TABLE IF EXISTS ONLY public.head_to_head DROP CONSTRAINT IF EXISTS head_to_head_pkey;
 ALTER TABLE IF EXISTS ONLY public.global_resets DROP CONSTRAINT IF EXISTS global_resets_pkey;
 ALTER TABLE IF EXISTS ONLY public.ghost_log DROP CONSTRAINT IF EXISTS ghost_log_pkey;
+ALTER TABLE IF EXISTS ONLY public.distribution_stats DROP CONSTRAINT IF EXISTS distribution_stats_pkey;
+ALTER TABLE IF EXISTS ONLY public.data_version DROP CONSTRAINT IF EXISTS data_version_pkey;
 ALTER TABLE IF EXISTS ONLY public.configuration DROP CONSTRAINT IF EXISTS configuration_pkey;
 ALTER TABLE IF EXISTS ONLY public.awards_obtenus DROP CONSTRAINT IF EXISTS awards_obtenus_pkey;
 ALTER TABLE IF EXISTS ONLY public.awards_obtenus DROP CONSTRAINT IF EXISTS awards_obtenus_joueur_id_saison_id_award_id_ligue_id_key;
@@ -67,14 +90,18 @@ ALTER TABLE IF EXISTS public.tournois ALTER COLUMN id DROP DEFAULT;
 ALTER TABLE IF EXISTS public.saisons ALTER COLUMN id DROP DEFAULT;
 ALTER TABLE IF EXISTS public.ligues ALTER COLUMN id DROP DEFAULT;
 ALTER TABLE IF EXISTS public.league_movements ALTER COLUMN id DROP DEFAULT;
+ALTER TABLE IF EXISTS public.journal_operations ALTER COLUMN id DROP DEFAULT;
 ALTER TABLE IF EXISTS public.joueurs ALTER COLUMN id DROP DEFAULT;
+ALTER TABLE IF EXISTS public.jobs ALTER COLUMN id DROP DEFAULT;
 ALTER TABLE IF EXISTS public.global_resets ALTER COLUMN id DROP DEFAULT;
 ALTER TABLE IF EXISTS public.ghost_log ALTER COLUMN id DROP DEFAULT;
+ALTER TABLE IF EXISTS public.distribution_stats ALTER COLUMN version DROP DEFAULT;
 ALTER TABLE IF EXISTS public.awards_obtenus ALTER COLUMN id DROP DEFAULT;
 DROP SEQUENCE IF EXISTS public.types_awards_id_seq;
 DROP TABLE IF EXISTS public.types_awards;
 DROP SEQUENCE IF EXISTS public.tournois_id_seq;
 DROP TABLE IF EXISTS public.tournois;
+DROP TABLE IF EXISTS public.tournoi_pointers;
 DROP SEQUENCE IF EXISTS public.saisons_id_seq;
 DROP TABLE IF EXISTS public.saisons;
 DROP TABLE IF EXISTS public.participations;
@@ -82,13 +109,23 @@ DROP SEQUENCE IF EXISTS public.ligues_id_seq;
 DROP TABLE IF EXISTS public.ligues;
 DROP SEQUENCE IF EXISTS public.league_movements_id_seq;
 DROP TABLE IF EXISTS public.league_movements;
+DROP SEQUENCE IF EXISTS public.journal_operations_id_seq;
+DROP TABLE IF EXISTS public.journal_operations;
+DROP TABLE IF EXISTS public.journal_deltas;
 DROP TABLE IF EXISTS public.grille_snapshots;
 DROP SEQUENCE IF EXISTS public.joueurs_id_seq;
 DROP TABLE IF EXISTS public.joueurs;
+DROP TABLE IF EXISTS public.joueur_profiles;
+DROP SEQUENCE IF EXISTS public.jobs_id_seq;
+DROP TABLE IF EXISTS public.jobs;
+DROP TABLE IF EXISTS public.head_to_head;
 DROP SEQUENCE IF EXISTS public.global_resets_id_seq;
 DROP TABLE IF EXISTS public.global_resets;
 DROP SEQUENCE IF EXISTS public.ghost_log_id_seq;
 DROP TABLE IF EXISTS public.ghost_log;
+DROP SEQUENCE IF EXISTS public.distribution_stats_version_seq;
+DROP TABLE IF EXISTS public.distribution_stats;
+DROP TABLE IF EXISTS public.data_version;
 DROP TABLE IF EXISTS public.configuration;
 DROP SEQUENCE IF EXISTS public.awards_obtenus_id_seq;
 DROP TABLE IF EXISTS public.awards_obtenus;
@@ -164,6 +201,59 @@ CREATE TABLE public.configuration (
 
 ALTER TABLE public.configuration OWNER TO CURRENT_USER;
 
+--
+-- Name: data_version; Type: TABLE; Schema: public; Owner: example
+--
+
+CREATE TABLE public.data_version (
+    id boolean DEFAULT true NOT NULL,
+    version bigint DEFAULT ((EXTRACT(epoch FROM now()) * (1000)::numeric))::bigint NOT NULL,
+    CONSTRAINT data_version_id_check CHECK (id)
+);
+
+
+ALTER TABLE public.data_version OWNER TO CURRENT_USER;
+
+--
+-- Name: distribution_stats; Type: TABLE; Schema: public; Owner: example
+--
+
+CREATE TABLE public.distribution_stats (
+    version integer NOT NULL,
+    mean double precision,
+    stdev double precision,
+    count integer NOT NULL,
+    sigma_threshold double precision NOT NULL,
+    thresholds jsonb NOT NULL,
+    curve jsonb NOT NULL,
+    created_at timestamp without time zone DEFAULT now()
+);
+
+
+ALTER TABLE public.distribution_stats OWNER TO CURRENT_USER;
+
+--
+-- Name: distribution_stats_version_seq; Type: SEQUENCE; Schema: public; Owner: example
+--
+
+CREATE SEQUENCE public.distribution_stats_version_seq
+    AS integer
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+
+ALTER SEQUENCE public.distribution_stats_version_seq OWNER TO CURRENT_USER;
+
+--
+-- Name: distribution_stats_version_seq; Type: SEQUENCE OWNED BY; Schema: public; Owner: example
+--
+
+ALTER SEQUENCE public.distribution_stats_version_seq OWNED BY public.distribution_stats.version;
+
+
 --
 -- Name: ghost_log; Type: TABLE; Schema: public; Owner: example
 --
@@ -258,6 +348,83 @@ CREATE TABLE public.grille_snapshots (
 ALTER TABLE public.grille_snapshots OWNER TO CURRENT_USER;
 
 
+--
+-- Name: head_to_head; Type: TABLE; Schema: public; Owner: example
+--
+
+CREATE TABLE public.head_to_head (
+    joueur_a integer NOT NULL,
+    joueur_b integer NOT NULL,
+    nb_lobbies integer DEFAULT 0 NOT NULL,
+    a_devant integer DEFAULT 0 NOT NULL,
+    b_devant integer DEFAULT 0 NOT NULL,
+    somme_ecart integer DEFAULT 0 NOT NULL,
+    nb_predits integer DEFAULT 0 NOT NULL,
+    attendu_a double precision DEFAULT 0 NOT NULL,
+    CONSTRAINT head_to_head_check CHECK ((joueur_a < joueur_b))
+);
+
+
+ALTER TABLE public.head_to_head OWNER TO CURRENT_USER;
+
+--
+-- Name: jobs; Type: TABLE; Schema: public; Owner: example
+--
+
+CREATE TABLE public.jobs (
+    id integer NOT NULL,
+    kind character varying(50) NOT NULL,
+    payload jsonb DEFAULT '{}'::jsonb NOT NULL,
+    dedupe_key character varying(100),
+    status character varying(16) DEFAULT 'pending'::character varying NOT NULL,
+    attempts integer DEFAULT 0 NOT NULL,
+    result jsonb,
+    error text,
+    created_at timestamp without time zone DEFAULT now(),
+    started_at timestamp without time zone,
+    finished_at timestamp without time zone
+);
+
+
+ALTER TABLE public.jobs OWNER TO CURRENT_USER;
+
+--
+-- Name: jobs_id_seq; Type: SEQUENCE; Schema: public; Owner: example
+--
+
+CREATE SEQUENCE public.jobs_id_seq
+    AS integer
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+
+ALTER SEQUENCE public.jobs_id_seq OWNER TO CURRENT_USER;
+
+--
+-- Name: jobs_id_seq; Type: SEQUENCE OWNED BY; Schema: public; Owner: example
+--
+
+ALTER SEQUENCE public.jobs_id_seq OWNED BY public.jobs.id;
+
+
+--
+-- Name: joueur_profiles; Type: TABLE; Schema: public; Owner: example
+--
+
+CREATE TABLE public.joueur_profiles (
+    joueur_id integer NOT NULL,
+    payload jsonb,
+    dirty boolean DEFAULT true NOT NULL,
+    version integer DEFAULT 0 NOT NULL,
+    built_at timestamp without time zone
+);
+
+
+ALTER TABLE public.joueur_profiles OWNER TO CURRENT_USER;
+
 --
 -- Name: joueurs; Type: TABLE; Schema: public; Owner: example
 --
@@ -272,7 +439,9 @@ CREATE TABLE public.joueurs (
     consecutive_missed integer DEFAULT 0,
     is_ranked boolean DEFAULT true,
     color character varying(7) DEFAULT '#FFFFFF'::character varying,
-    ligue_id integer
+    ligue_id integer,
+    nb_tournois integer DEFAULT 0 NOT NULL,
+    nb_victoires integer DEFAULT 0 NOT NULL
 );
 
 
@@ -300,6 +469,56 @@ ALTER SEQUENCE public.joueurs_id_seq OWNER TO CURRENT_USER;
 ALTER SEQUENCE public.joueurs_id_seq OWNED BY public.joueurs.id;
 
 
+--
+-- Name: journal_deltas; Type: TABLE; Schema: public; Owner: example
+--
+
+CREATE TABLE public.journal_deltas (
+    operation_id integer NOT NULL,
+    joueur_id integer NOT NULL,
+    before jsonb NOT NULL
+);
+
+
+ALTER TABLE public.journal_deltas OWNER TO CURRENT_USER;
+
+--
+-- Name: journal_operations; Type: TABLE; Schema: public; Owner: example
+--
+
+CREATE TABLE public.journal_operations (
+    id integer NOT NULL,
+    kind character varying(32) NOT NULL,
+    ref_id integer,
+    label character varying(255),
+    created_at timestamp without time zone DEFAULT now()
+);
+
+
+ALTER TABLE public.journal_operations OWNER TO CURRENT_USER;
+
+--
+-- Name: journal_operations_id_seq; Type: SEQUENCE; Schema: public; Owner: example
+--
+
+CREATE SEQUENCE public.journal_operations_id_seq
+    AS integer
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+
+ALTER SEQUENCE public.journal_operations_id_seq OWNER TO CURRENT_USER;
+
+--
+-- Name: journal_operations_id_seq; Type: SEQUENCE OWNED BY; Schema: public; Owner: example
+--
+
+ALTER SEQUENCE public.journal_operations_id_seq OWNED BY public.journal_operations.id;
+
+
 --
 -- Name: league_movements; Type: TABLE; Schema: public; Owner: example
 --
@@ -446,6 +665,18 @@ ALTER SEQUENCE public.saisons_id_seq OWNER TO CURRENT_USER;
 ALTER SEQUENCE public.saisons_id_seq OWNED BY public.saisons.id;
 
 
+--
+-- Name: tournoi_pointers; Type: TABLE; Schema: public; Owner: example
+--
+
+CREATE TABLE public.tournoi_pointers (
+    ligue_nom character varying(100) NOT NULL,
+    tournoi_id integer NOT NULL
+);
+
+
+ALTER TABLE public.tournoi_pointers OWNER TO CURRENT_USER;
+
 --
 -- Name: tournois; Type: TABLE; Schema: public; Owner: example
 --
@@ -455,7 +686,13 @@ CREATE TABLE public.tournois (
     date date NOT NULL,
     ligue_id integer,
     ligue_nom character varying(100),
-    ligue_couleur character varying(20)
+    ligue_couleur character varying(20),
+    nb_joueurs integer DEFAULT 0 NOT NULL,
+    winner_id integer,
+    avg_score double precision,
+    sum_old_mu double precision DEFAULT 0 NOT NULL,
+    nb_old_mu integer DEFAULT 0 NOT NULL,
+    session_id integer
 );
 
 
@@ -527,6 +764,13 @@ ALTER SEQUENCE public.types_awards_id_seq OWNED BY public.types_awards.id;
 ALTER TABLE ONLY public.awards_obtenus ALTER COLUMN id SET DEFAULT nextval('public.awards_obtenus_id_seq'::regclass);
 
 
+--
+-- Name: distribution_stats version; Type: DEFAULT; Schema: public; Owner: example
+--
+
+ALTER TABLE ONLY public.distribution_stats ALTER COLUMN version SET DEFAULT nextval('public.distribution_stats_version_seq'::regclass);
+
+
 --
 -- Name: ghost_log id; Type: DEFAULT; Schema: public; Owner: example
 --
@@ -541,6 +785,13 @@ ALTER TABLE ONLY public.ghost_log ALTER COLUMN id SET DEFAULT nextval('public.gh
 ALTER TABLE ONLY public.global_resets ALTER COLUMN id SET DEFAULT nextval('public.global_resets_id_seq'::regclass);
 
 
+--
+-- Name: jobs id; Type: DEFAULT; Schema: public; Owner: example
+--
+
+ALTER TABLE ONLY public.jobs ALTER COLUMN id SET DEFAULT nextval('public.jobs_id_seq'::regclass);
+
+
 --
 -- Name: joueurs id; Type: DEFAULT; Schema: public; Owner: example
 --
@@ -548,6 +799,13 @@ ALTER TABLE ONLY public.global_resets ALTER COLUMN id SET DEFAULT nextval('publi
 ALTER TABLE ONLY public.joueurs ALTER COLUMN id SET DEFAULT nextval('public.joueurs_id_seq'::regclass);
 
 
+--
+-- Name: journal_operations id; Type: DEFAULT; Schema: public; Owner: example
+--
+
+ALTER TABLE ONLY public.journal_operations ALTER COLUMN id SET DEFAULT nextval('public.journal_operations_id_seq'::regclass);
+
+
 --
 -- Name: league_movements id; Type: DEFAULT; Schema: public; Owner: example
 --
@@ -677,6 +935,14 @@ ip_version_live	v1
 \.
 
 
+--
+-- Data for Name: distribution_stats; Type: TABLE DATA; Schema: public; Owner: example
+--
+
+COPY public.distribution_stats (version, mean, stdev, count, sigma_threshold, thresholds, curve, created_at) FROM stdin;
+\.
+
+
 --
 -- Data for Name: ghost_log; Type: TABLE DATA; Schema: public; Owner: example
 --
@@ -695,41 +961,84 @@ COPY public.global_resets (id, date, value_applied, created_at) FROM stdin;
 \.
 
 
+--
+-- Data for Name: head_to_head; Type: TABLE DATA; Schema: public; Owner: example
+--
+
+COPY public.head_to_head (joueur_a, joueur_b, nb_lobbies, a_devant, b_devant, somme_ecart, nb_predits, attendu_a) FROM stdin;
+\.
+
+
+--
+-- Data for Name: jobs; Type: TABLE DATA; Schema: public; Owner: example
+--
+
+COPY public.jobs (id, kind, payload, dedupe_key, status, attempts, result, error, created_at, started_at, finished_at) FROM stdin;
+1	rebuild_profiles	{}	rebuild_profiles	pending	0	\N	\N	2026-10-18 20:00:00	\N	\N
+2	recalculate_tiers	{}	recalculate_tiers	pending	0	\N	\N	2026-10-18 20:00:00	\N	\N
+3	rebuild_head_to_head	{}	rebuild_head_to_head	pending	0	\N	\N	2026-10-18 20:00:00	\N	\N
+\.
+
+
+--
+-- Data for Name: joueur_profiles; Type: TABLE DATA; Schema: public; Owner: example
+--
+
+COPY public.joueur_profiles (joueur_id, payload, dirty, version, built_at) FROM stdin;
+\.
+
+
 --
 -- Data for Name: joueurs; Type: TABLE DATA; Schema: public; Owner: example
 --
 
-COPY public.joueurs (id, nom, mu, sigma, tier, consecutive_missed, is_ranked, color, ligue_id) FROM stdin;
-1	Mario	52.917769	0.959236	A	0	t	#E52521	\N
-2	Luigi	49.483256	0.920269	B	0	t	#43B047	\N
-3	Peach	53.07051	0.717114	A	0	t	#F5A9C7	\N
-4	Daisy	54.367116	0.910378	A	0	t	#FF7F00	\N
-5	Yoshi	59.536012	0.865031	S	0	t	#66CC33	\N
-6	Toad	47.45222	0.879962	B	0	t	#F0F0F0	\N
-7	Toadette	56.39467	0.873335	S	0	t	#EE6FA0	\N
-8	Birdo	51.914338	0.806089	A	0	t	#FF9EC4	\N
-9	Bowser	50.763248	0.699107	A	0	t	#E8A33D	\N
-10	Bowser Jr.	44.433417	0.770874	B	0	t	#7FD4C1	\N
-11	Wario	52.336423	0.694852	A	0	t	#F7D117	\N
-12	Waluigi	50.416033	0.728622	A	0	t	#5B2C87	\N
-13	Rosalina	48.902276	0.714095	B	0	t	#B8CDE8	\N
-14	Donkey Kong	51.406507	0.813461	A	0	t	#6B4423	\N
-15	Diddy Kong	47.811051	0.801387	B	0	t	#C8102E	\N
-16	Funky Kong	58.196756	1.081399	S	0	t	#F2A900	\N
-17	Koopa	50.374783	0.915814	A	0	t	#3CB44B	\N
-18	Shy Guy	44.82968	0.782664	B	0	t	#D1332E	\N
-19	Lakitu	46.410023	0.828598	B	0	t	#7EC8E3	\N
-20	Dry Bones	46.611562	0.802039	B	0	t	#DCDCDC	\N
-21	Dry Bowser	49.784225	0.797824	A	0	t	#4A4A4A	\N
-22	King Boo	44.145017	0.772235	C	0	t	#E6E6FA	\N
-23	Petey	47.351789	0.766876	B	0	t	#4CAF50	\N
-24	Wiggler	43.381929	1.012688	C	0	t	#FFB300	\N
-25	Lemmy	50.874407	0.791367	A	0	t	#00BCD4	\N
-26	Larry	43.363119	0.75244	C	0	t	#2196F3	\N
-27	Wendy	37.670852	1.079329	C	0	t	#FF4081	\N
-28	Ludwig	47.297625	2.025435	U	0	f	#3F51B5	\N
-29	Iggy	48.658616	2.956093	U	0	f	#8BC34A	\N
-30	Morton	55.348765	2.033292	U	0	f	#5D4037	\N
+COPY public.joueurs (id, nom, mu, sigma, tier, consecutive_missed, is_ranked, color, ligue_id, nb_tournois, nb_victoires) FROM stdin;
+1	Mario	52.917769	0.959236	A	0	t	#E52521	\N	25	3
+2	Luigi	49.483256	0.920269	B	0	t	#43B047	\N	27	2
+3	Peach	53.07051	0.717114	A	0	t	#F5A9C7	\N	53	3
+4	Daisy	54.367116	0.910378	A	0	t	#FF7F00	\N	29	6
+5	Yoshi	59.536012	0.865031	S	0	t	#66CC33	\N	44	20
+6	Toad	47.45222	0.879962	B	0	t	#F0F0F0	\N	30	0
+7	Toadette	56.39467	0.873335	S	0	t	#EE6FA0	\N	34	9
+8	Birdo	51.914338	0.806089	A	0	t	#FF9EC4	\N	37	1
+9	Bowser	50.763248	0.699107	A	0	t	#E8A33D	\N	57	5
+10	Bowser Jr.	44.433417	0.770874	B	0	t	#7FD4C1	\N	47	1
+11	Wario	52.336423	0.694852	A	0	t	#F7D117	\N	60	9
+12	Waluigi	50.416033	0.728622	A	0	t	#5B2C87	\N	49	2
+13	Rosalina	48.902276	0.714095	B	0	t	#B8CDE8	\N	53	3
+14	Donkey Kong	51.406507	0.813461	A	0	t	#6B4423	\N	36	3
+15	Diddy Kong	47.811051	0.801387	B	0	t	#C8102E	\N	37	1
+16	Funky Kong	58.196756	1.081399	S	0	t	#F2A900	\N	22	11
+17	Koopa	50.374783	0.915814	A	0	t	#3CB44B	\N	27	2
+18	Shy Guy	44.82968	0.782664	B	0	t	#D1332E	\N	41	0
+19	Lakitu	46.410023	0.828598	B	0	t	#7EC8E3	\N	35	1
+20	Dry Bones	46.611562	0.802039	B	0	t	#DCDCDC	\N	38	2
+21	Dry Bowser	49.784225	0.797824	A	0	t	#4A4A4A	\N	38	2
+22	King Boo	44.145017	0.772235	C	0	t	#E6E6FA	\N	43	0
+23	Petey	47.351789	0.766876	B	0	t	#4CAF50	\N	43	0
+24	Wiggler	43.381929	1.012688	C	0	t	#FFB300	\N	23	0
+25	Lemmy	50.874407	0.791367	A	0	t	#00BCD4	\N	39	2
+26	Larry	43.363119	0.75244	C	0	t	#2196F3	\N	50	0
+27	Wendy	37.670852	1.079329	C	0	t	#FF4081	\N	27	0
+28	Ludwig	47.297625	2.025435	U	0	f	#3F51B5	\N	5	0
+29	Iggy	48.658616	2.956093	U	0	f	#8BC34A	\N	2	0
+30	Morton	55.348765	2.033292	U	0	f	#5D4037	\N	5	0
+\.
+
+
+--
+-- Data for Name: journal_deltas; Type: TABLE DATA; Schema: public; Owner: example
+--
+
+COPY public.journal_deltas (operation_id, joueur_id, before) FROM stdin;
+\.
+
+
+--
+-- Data for Name: journal_operations; Type: TABLE DATA; Schema: public; Owner: example
+--
+
+COPY public.journal_operations (id, kind, ref_id, label, created_at) FROM stdin;
 \.
 
 
@@ -1829,99 +2138,107 @@ COPY public.saisons (id, nom, slug, date_debut, date_fin, is_active, config_awar
 \.
 
 
+--
+-- Data for Name: tournoi_pointers; Type: TABLE DATA; Schema: public; Owner: example
+--
+
+COPY public.tournoi_pointers (ligue_nom, tournoi_id) FROM stdin;
+\.
+
+
 --
 -- Data for Name: tournois; Type: TABLE DATA; Schema: public; Owner: example
 --
 
-COPY public.tournois (id, date, ligue_id, ligue_nom, ligue_couleur) FROM stdin;
-1	2025-01-18	\N	\N	\N
-2	2025-01-23	\N	\N	\N
-3	2025-01-26	\N	\N	\N
-4	2025-01-28	\N	\N	\N
-5	2025-02-01	\N	\N	\N
-6	2025-02-06	\N	\N	\N
-7	2025-02-08	\N	\N	\N
-8	2025-02-12	\N	\N	\N
-9	2025-02-16	\N	\N	\N
-10	2025-02-23	\N	\N	\N
-11	2025-02-27	\N	\N	\N
-12	2025-03-02	\N	\N	\N
-13	2025-03-06	\N	\N	\N
-14	2025-03-13	\N	\N	\N
-15	2025-03-20	\N	\N	\N
-16	2025-03-24	\N	\N	\N
-17	2025-03-31	\N	\N	\N
-18	2025-04-02	\N	\N	\N
-19	2025-04-05	\N	\N	\N
-20	2025-04-08	\N	\N	\N
-21	2025-04-29	\N	\N	\N
-22	2025-05-02	\N	\N	\N
-23	2025-05-05	\N	\N	\N
-24	2025-05-09	\N	\N	\N
-25	2025-05-21	\N	\N	\N
-26	2025-05-26	\N	\N	\N
-27	2025-06-05	\N	\N	\N
-28	2025-06-07	\N	\N	\N
-29	2025-06-11	\N	\N	\N
-30	2025-06-15	\N	\N	\N
-31	2025-06-28	\N	\N	\N
-32	2025-07-01	\N	\N	\N
-33	2025-07-05	\N	\N	\N
-34	2025-07-07	\N	\N	\N
-35	2025-07-10	\N	\N	\N
-36	2025-07-17	\N	\N	\N
-37	2025-07-19	\N	\N	\N
-38	2025-07-22	\N	\N	\N
-39	2025-07-28	\N	\N	\N
-40	2025-08-04	\N	\N	\N
-41	2025-08-06	\N	\N	\N
-42	2025-08-11	\N	\N	\N
-43	2025-08-16	\N	\N	\N
-44	2025-08-18	\N	\N	\N
-45	2025-08-22	\N	\N	\N
-46	2025-08-26	\N	\N	\N
-47	2025-08-30	\N	\N	\N
-48	2025-09-02	\N	\N	\N
-49	2025-09-07	\N	\N	\N
-50	2025-09-11	\N	\N	\N
-51	2025-09-14	\N	\N	\N
-52	2025-09-16	\N	\N	\N
-53	2025-09-22	\N	\N	\N
-54	2025-09-26	\N	\N	\N
-55	2025-09-29	\N	\N	\N
-56	2025-10-08	\N	\N	\N
-57	2025-10-16	\N	\N	\N
-58	2025-10-19	\N	\N	\N
-59	2025-10-24	\N	\N	\N
-60	2025-10-29	\N	\N	\N
-61	2025-11-05	\N	\N	\N
-62	2025-11-09	\N	\N	\N
-63	2025-11-12	\N	\N	\N
-64	2025-11-17	\N	\N	\N
-65	2025-11-21	\N	\N	\N
-66	2025-11-26	\N	\N	\N
-67	2025-11-30	\N	\N	\N
-68	2025-12-08	\N	\N	\N
-69	2025-12-13	\N	\N	\N
-70	2025-12-18	\N	\N	\N
-71	2025-12-22	\N	\N	\N
-72	2025-12-26	\N	\N	\N
-73	2025-12-28	\N	\N	\N
-74	2025-12-31	\N	\N	\N
-75	2026-01-06	\N	\N	\N
-76	2026-01-13	\N	\N	\N
-77	2026-01-18	\N	\N	\N
-78	2026-01-29	\N	\N	\N
-79	2026-02-02	\N	\N	\N
-80	2026-02-04	\N	\N	\N
-81	2026-02-14	\N	\N	\N
-82	2026-02-22	\N	\N	\N
-83	2026-03-01	\N	\N	\N
-84	2026-03-04	\N	\N	\N
-85	2026-03-06	\N	\N	\N
-86	2026-03-10	\N	\N	\N
-87	2026-03-13	\N	\N	\N
-88	2026-03-16	\N	\N	\N
+COPY public.tournois (id, date, ligue_id, ligue_nom, ligue_couleur, nb_joueurs, winner_id, avg_score, sum_old_mu, nb_old_mu, session_id) FROM stdin;
+1	2025-01-18	\N	\N	\N	12	5	29.416666666666668	600	12	1
+2	2025-01-23	\N	\N	\N	12	7	28.083333333333332	600.951705	12	2
+3	2025-01-26	\N	\N	\N	12	7	29.416666666666668	629.312487	12	3
+4	2025-01-28	\N	\N	\N	12	5	29.916666666666668	629.6998189999999	12	4
+5	2025-02-01	\N	\N	\N	12	5	29.583333333333332	609.2496359999999	12	5
+6	2025-02-06	\N	\N	\N	12	2	30.833333333333332	596.413509	12	6
+7	2025-02-08	\N	\N	\N	12	5	29.166666666666668	597.952149	12	7
+8	2025-02-12	\N	\N	\N	12	5	29.416666666666668	588.393139	12	8
+9	2025-02-16	\N	\N	\N	12	5	29.166666666666668	573.6394539999999	12	9
+10	2025-02-23	\N	\N	\N	12	7	29.166666666666668	593.0267030000001	12	10
+11	2025-02-27	\N	\N	\N	12	11	29.166666666666668	582.6325	12	11
+12	2025-03-02	\N	\N	\N	12	5	29.666666666666668	568.273526	12	12
+13	2025-03-06	\N	\N	\N	12	5	29.166666666666668	599.685832	12	13
+14	2025-03-13	\N	\N	\N	12	13	30.416666666666668	585.607	12	14
+15	2025-03-20	\N	\N	\N	12	16	28.916666666666668	589.671415	12	15
+16	2025-03-24	\N	\N	\N	12	16	29.75	610.711302	12	16
+17	2025-03-31	\N	\N	\N	12	6	29.25	591.749104	12	17
+18	2025-04-02	\N	\N	\N	12	16	29.083333333333332	595.056148	12	18
+19	2025-04-05	\N	\N	\N	12	5	29.833333333333332	622.678713	12	19
+20	2025-04-08	\N	\N	\N	12	21	29.666666666666668	574.078723	12	20
+21	2025-04-29	\N	\N	\N	12	5	29.666666666666668	597.211923	12	21
+22	2025-05-02	\N	\N	\N	12	4	30.25	587.201504	12	22
+23	2025-05-05	\N	\N	\N	12	3	28.833333333333332	572.259158	12	23
+24	2025-05-09	\N	\N	\N	12	7	30.25	608.1159120000001	12	24
+25	2025-05-21	\N	\N	\N	12	14	29.25	567.1658639999999	12	25
+26	2025-05-26	\N	\N	\N	12	11	30.333333333333332	598.909497	12	26
+27	2025-06-05	\N	\N	\N	12	17	29.666666666666668	571.214428	12	27
+28	2025-06-07	\N	\N	\N	12	16	28.666666666666668	610.952939	12	28
+29	2025-06-11	\N	\N	\N	12	7	29.083333333333332	572.972708	12	29
+30	2025-06-15	\N	\N	\N	12	13	30.333333333333332	607.776652	12	30
+31	2025-06-28	\N	\N	\N	12	12	29	609.780591	12	31
+32	2025-07-01	\N	\N	\N	12	5	30.083333333333332	601.061347	12	32
+33	2025-07-05	\N	\N	\N	12	16	28.916666666666668	585.669586	12	33
+34	2025-07-07	\N	\N	\N	12	7	30.583333333333332	600.483256	12	34
+35	2025-07-10	\N	\N	\N	12	16	30.166666666666668	605.061887	12	35
+36	2025-07-17	\N	\N	\N	12	9	28.666666666666668	575.060907	12	36
+37	2025-07-19	\N	\N	\N	12	16	29.833333333333332	586.700815	12	37
+38	2025-07-22	\N	\N	\N	12	5	28.833333333333332	613.108422	12	38
+39	2025-07-28	\N	\N	\N	12	19	29.416666666666668	586.8212720000001	12	39
+40	2025-08-04	\N	\N	\N	12	9	29.083333333333332	598.34345	12	40
+41	2025-08-06	\N	\N	\N	12	4	30.25	585.7934270000001	12	41
+42	2025-08-11	\N	\N	\N	12	4	30.083333333333332	591.1699449999999	12	42
+43	2025-08-16	\N	\N	\N	12	7	29.5	591.365426	12	43
+44	2025-08-18	\N	\N	\N	12	15	28.666666666666668	575.7179510000001	12	44
+45	2025-08-22	\N	\N	\N	12	5	30.083333333333332	590.714968	12	45
+46	2025-08-26	\N	\N	\N	12	17	28.916666666666668	577.9734199999999	12	46
+47	2025-08-30	\N	\N	\N	12	8	29.75	592.215899	12	47
+48	2025-09-02	\N	\N	\N	12	11	30.083333333333332	601.305827	12	48
+49	2025-09-07	\N	\N	\N	12	9	30.25	584.2075830000001	12	49
+50	2025-09-11	\N	\N	\N	12	5	28.916666666666668	572.0274430000001	12	50
+51	2025-09-14	\N	\N	\N	12	11	27.916666666666668	604.756472	12	51
+52	2025-09-16	\N	\N	\N	12	3	29.666666666666668	595.7301510000001	12	52
+53	2025-09-22	\N	\N	\N	12	1	29.75	572.981854	12	53
+54	2025-09-26	\N	\N	\N	12	11	30.416666666666668	584.456008	12	54
+55	2025-09-29	\N	\N	\N	12	7	29.583333333333332	594.693339	12	55
+56	2025-10-08	\N	\N	\N	12	5	30	598.248146	12	56
+57	2025-10-16	\N	\N	\N	12	20	29.083333333333332	578.849501	12	57
+58	2025-10-19	\N	\N	\N	12	21	29.083333333333332	596.8731	12	58
+59	2025-10-24	\N	\N	\N	12	2	29.75	581.1141690000001	12	59
+60	2025-10-29	\N	\N	\N	12	5	28.916666666666668	595.613154	12	60
+61	2025-11-05	\N	\N	\N	12	5	29.5	606.6850289999999	12	61
+62	2025-11-09	\N	\N	\N	12	4	29.75	603.292602	12	62
+63	2025-11-12	\N	\N	\N	12	14	29.916666666666668	580.500964	12	63
+64	2025-11-17	\N	\N	\N	12	10	29.916666666666668	573.748523	12	64
+65	2025-11-21	\N	\N	\N	12	19	29.916666666666668	590.061659	12	65
+66	2025-11-26	\N	\N	\N	12	12	29	622.57308	12	66
+67	2025-11-30	\N	\N	\N	12	1	28.416666666666668	583.9889139999999	12	67
+68	2025-12-08	\N	\N	\N	12	11	29.083333333333332	579.0124030000001	12	68
+69	2025-12-13	\N	\N	\N	12	11	30.25	593.1315239999999	12	69
+70	2025-12-18	\N	\N	\N	12	21	30.166666666666668	583.0724630000001	12	70
+71	2025-12-22	\N	\N	\N	12	3	30	582.026752	12	71
+72	2025-12-26	\N	\N	\N	12	16	29.916666666666668	609.2673030000001	12	72
+73	2025-12-28	\N	\N	\N	12	11	28.833333333333332	597.9341320000001	12	73
+74	2025-12-31	\N	\N	\N	12	5	28.666666666666668	586.122569	12	74
+75	2026-01-06	\N	\N	\N	12	4	29.833333333333332	587.568655	12	75
+76	2026-01-13	\N	\N	\N	12	16	29.833333333333332	596.456808	12	76
+77	2026-01-18	\N	\N	\N	12	5	29.416666666666668	616.045534	12	77
+78	2026-01-29	\N	\N	\N	12	5	29.166666666666668	602.751637	12	78
+79	2026-02-02	\N	\N	\N	12	11	30.25	587.39618	12	79
+80	2026-02-04	\N	\N	\N	12	26	30.333333333333332	589.2582170000001	12	80
+81	2026-02-14	\N	\N	\N	12	16	30	599.904903	12	81
+82	2026-02-22	\N	\N	\N	12	5	29.083333333333332	610.44081	12	82
+83	2026-03-01	\N	\N	\N	12	14	29.75	569.54621	12	83
+84	2026-03-04	\N	\N	\N	12	7	29.833333333333332	591.9101	12	84
+85	2026-03-06	\N	\N	\N	12	7	29.25	613.653338	12	85
+86	2026-03-10	\N	\N	\N	12	3	29.583333333333332	609.2285929999998	12	86
+87	2026-03-13	\N	\N	\N	12	5	29.583333333333332	593.6335529999999	12	87
+88	2026-03-16	\N	\N	\N	12	4	30.666666666666668	591.7970859999999	12	88
 \.
 
 
@@ -1954,6 +2271,13 @@ COPY public.types_awards (id, code, nom, emoji, description) FROM stdin;
 SELECT pg_catalog.setval('public.awards_obtenus_id_seq', 60, true);
 
 
+--
+-- Name: distribution_stats_version_seq; Type: SEQUENCE SET; Schema: public; Owner: example
+--
+
+SELECT pg_catalog.setval('public.distribution_stats_version_seq', 1, false);
+
+
 --
 -- Name: ghost_log_id_seq; Type: SEQUENCE SET; Schema: public; Owner: example
 --
@@ -1968,6 +2292,13 @@ SELECT pg_catalog.setval('public.ghost_log_id_seq', 1, false);
 SELECT pg_catalog.setval('public.global_resets_id_seq', 2, true);
 
 
+--
+-- Name: jobs_id_seq; Type: SEQUENCE SET; Schema: public; Owner: example
+--
+
+SELECT pg_catalog.setval('public.jobs_id_seq', 3, true);
+
+
 --
 -- Name: joueurs_id_seq; Type: SEQUENCE SET; Schema: public; Owner: example
 --
@@ -1975,6 +2306,13 @@ SELECT pg_catalog.setval('public.global_resets_id_seq', 2, true);
 SELECT pg_catalog.setval('public.joueurs_id_seq', 30, true);
 
 
+--
+-- Name: journal_operations_id_seq; Type: SEQUENCE SET; Schema: public; Owner: example
+--
+
+SELECT pg_catalog.setval('public.journal_operations_id_seq', 1, false);
+
+
 --
 -- Name: league_movements_id_seq; Type: SEQUENCE SET; Schema: public; Owner: example
 --
@@ -2042,6 +2380,22 @@ ALTER TABLE ONLY public.configuration
     ADD CONSTRAINT configuration_pkey PRIMARY KEY (key);
 
 
+--
+-- Name: data_version data_version_pkey; Type: CONSTRAINT; Schema: public; Owner: example
+--
+
+ALTER TABLE ONLY public.data_version
+    ADD CONSTRAINT data_version_pkey PRIMARY KEY (id);
+
+
+--
+-- Name: distribution_stats distribution_stats_pkey; Type: CONSTRAINT; Schema: public; Owner: example
+--
+
+ALTER TABLE ONLY public.distribution_stats
+    ADD CONSTRAINT distribution_stats_pkey PRIMARY KEY (version);
+
+
 --
 -- Name: ghost_log ghost_log_pkey; Type: CONSTRAINT; Schema: public; Owner: example
 --
@@ -2074,6 +2428,30 @@ ALTER TABLE ONLY public.grille_snapshots
     ADD CONSTRAINT grille_snapshots_pkey PRIMARY KEY (date, joueur_id);
 
 
+--
+-- Name: head_to_head head_to_head_pkey; Type: CONSTRAINT; Schema: public; Owner: example
+--
+
+ALTER TABLE ONLY public.head_to_head
+    ADD CONSTRAINT head_to_head_pkey PRIMARY KEY (joueur_a, joueur_b);
+
+
+--
+-- Name: jobs jobs_pkey; Type: CONSTRAINT; Schema: public; Owner: example
+--
+
+ALTER TABLE ONLY public.jobs
+    ADD CONSTRAINT jobs_pkey PRIMARY KEY (id);
+
+
+--
+-- Name: joueur_profiles joueur_profiles_pkey; Type: CONSTRAINT; Schema: public; Owner: example
+--
+
+ALTER TABLE ONLY public.joueur_profiles
+    ADD CONSTRAINT joueur_profiles_pkey PRIMARY KEY (joueur_id);
+
+
 --
 -- Name: joueurs joueurs_pkey; Type: CONSTRAINT; Schema: public; Owner: example
 --
@@ -2082,6 +2460,22 @@ ALTER TABLE ONLY public.joueurs
     ADD CONSTRAINT joueurs_pkey PRIMARY KEY (id);
 
 
+--
+-- Name: journal_deltas journal_deltas_pkey; Type: CONSTRAINT; Schema: public; Owner: example
+--
+
+ALTER TABLE ONLY public.journal_deltas
+    ADD CONSTRAINT journal_deltas_pkey PRIMARY KEY (operation_id, joueur_id);
+
+
+--
+-- Name: journal_operations journal_operations_pkey; Type: CONSTRAINT; Schema: public; Owner: example
+--
+
+ALTER TABLE ONLY public.journal_operations
+    ADD CONSTRAINT journal_operations_pkey PRIMARY KEY (id);
+
+
 --
 -- Name: league_movements league_movements_pkey; Type: CONSTRAINT; Schema: public; Owner: example
 --
@@ -2122,6 +2516,14 @@ ALTER TABLE ONLY public.saisons
     ADD CONSTRAINT saisons_slug_key UNIQUE (slug);
 
 
+--
+-- Name: tournoi_pointers tournoi_pointers_pkey; Type: CONSTRAINT; Schema: public; Owner: example
+--
+
+ALTER TABLE ONLY public.tournoi_pointers
+    ADD CONSTRAINT tournoi_pointers_pkey PRIMARY KEY (ligue_nom);
+
+
 --
 -- Name: tournois tournois_pkey; Type: CONSTRAINT; Schema: public; Owner: example
 --
@@ -2188,6 +2590,34 @@ CREATE INDEX idx_ghost_log_joueur_id ON public.ghost_log USING btree (joueur_id)
 CREATE INDEX idx_ghost_log_tournoi_id ON public.ghost_log USING btree (tournoi_id);
 
 
+--
+-- Name: idx_head_to_head_joueur_b; Type: INDEX; Schema: public; Owner: example
+--
+
+CREATE INDEX idx_head_to_head_joueur_b ON public.head_to_head USING btree (joueur_b);
+
+
+--
+-- Name: idx_jobs_pending; Type: INDEX; Schema: public; Owner: example
+--
+
+CREATE INDEX idx_jobs_pending ON public.jobs USING btree (id) WHERE ((status)::text = 'pending'::text);
+
+
+--
+-- Name: idx_joueur_profiles_dirty; Type: INDEX; Schema: public; Owner: example
+--
+
+CREATE INDEX idx_joueur_profiles_dirty ON public.joueur_profiles USING btree (joueur_id) WHERE dirty;
+
+
+--
+-- Name: idx_joueurs_classement; Type: INDEX; Schema: public; Owner: example
+--
+
+CREATE INDEX idx_joueurs_classement ON public.joueurs USING btree (score_trueskill DESC NULLS LAST, id);
+
+
 --
 -- Name: idx_joueurs_ligue_id; Type: INDEX; Schema: public; Owner: example
 --
@@ -2195,6 +2625,20 @@ CREATE INDEX idx_ghost_log_tournoi_id ON public.ghost_log USING btree (tournoi_i
 CREATE INDEX idx_joueurs_ligue_id ON public.joueurs USING btree (ligue_id);
 
 
+--
+-- Name: idx_journal_operations_kind_ref; Type: INDEX; Schema: public; Owner: example
+--
+
+CREATE INDEX idx_journal_operations_kind_ref ON public.journal_operations USING btree (kind, ref_id);
+
+
+--
+-- Name: idx_league_movements_saison_joueur; Type: INDEX; Schema: public; Owner: example
+--
+
+CREATE INDEX idx_league_movements_saison_joueur ON public.league_movements USING btree (saison_id, joueur_id);
+
+
 --
 -- Name: idx_participations_joueur_id; Type: INDEX; Schema: public; Owner: example
 --
@@ -2216,6 +2660,20 @@ CREATE INDEX idx_participations_tournoi_id ON public.participations USING btree
 CREATE INDEX idx_tournois_date ON public.tournois USING btree (date);
 
 
+--
+-- Name: idx_tournois_date_id; Type: INDEX; Schema: public; Owner: example
+--
+
+CREATE INDEX idx_tournois_date_id ON public.tournois USING btree (date, id);
+
+
+--
+-- Name: jobs_pending_dedupe_key; Type: INDEX; Schema: public; Owner: example
+--
+
+CREATE UNIQUE INDEX jobs_pending_dedupe_key ON public.jobs USING btree (dedupe_key) WHERE ((status)::text = 'pending'::text);
+
+
 --
 -- Name: awards_obtenus awards_obtenus_award_id_fkey; Type: FK CONSTRAINT; Schema: public; Owner: example
 --
@@ -2272,6 +2730,30 @@ ALTER TABLE ONLY public.ghost_log
     ADD CONSTRAINT ghost_log_tournoi_id_fkey FOREIGN KEY (tournoi_id) REFERENCES public.tournois(id) ON DELETE CASCADE;
 
 
+--
+-- Name: head_to_head head_to_head_joueur_a_fkey; Type: FK CONSTRAINT; Schema: public; Owner: example
+--
+
+ALTER TABLE ONLY public.head_to_head
+    ADD CONSTRAINT head_to_head_joueur_a_fkey FOREIGN KEY (joueur_a) REFERENCES public.joueurs(id) ON DELETE CASCADE;
+
+
+--
+-- Name: head_to_head head_to_head_joueur_b_fkey; Type: FK CONSTRAINT; Schema: public; Owner: example
+--
+
+ALTER TABLE ONLY public.head_to_head
+    ADD CONSTRAINT head_to_head_joueur_b_fkey FOREIGN KEY (joueur_b) REFERENCES public.joueurs(id) ON DELETE CASCADE;
+
+
+--
+-- Name: joueur_profiles joueur_profiles_joueur_id_fkey; Type: FK CONSTRAINT; Schema: public; Owner: example
+--
+
+ALTER TABLE ONLY public.joueur_profiles
+    ADD CONSTRAINT joueur_profiles_joueur_id_fkey FOREIGN KEY (joueur_id) REFERENCES public.joueurs(id) ON DELETE CASCADE;
+
+
 --
 -- Name: joueurs joueurs_ligue_id_fkey; Type: FK CONSTRAINT; Schema: public; Owner: example
 --
@@ -2280,6 +2762,22 @@ ALTER TABLE ONLY public.joueurs
     ADD CONSTRAINT joueurs_ligue_id_fkey FOREIGN KEY (ligue_id) REFERENCES public.ligues(id) ON DELETE SET NULL;
 
 
+--
+-- Name: journal_deltas journal_deltas_joueur_id_fkey; Type: FK CONSTRAINT; Schema: public; Owner: example
+--
+
+ALTER TABLE ONLY public.journal_deltas
+    ADD CONSTRAINT journal_deltas_joueur_id_fkey FOREIGN KEY (joueur_id) REFERENCES public.joueurs(id) ON DELETE CASCADE;
+
+
+--
+-- Name: journal_deltas journal_deltas_operation_id_fkey; Type: FK CONSTRAINT; Schema: public; Owner: example
+--
+
+ALTER TABLE ONLY public.journal_deltas
+    ADD CONSTRAINT journal_deltas_operation_id_fkey FOREIGN KEY (operation_id) REFERENCES public.journal_operations(id) ON DELETE CASCADE;
+
+
 --
 -- Name: league_movements league_movements_from_ligue_id_fkey; Type: FK CONSTRAINT; Schema: public; Owner: example
 --
@@ -2336,6 +2834,14 @@ ALTER TABLE ONLY public.saisons
     ADD CONSTRAINT saisons_ligue_id_fkey FOREIGN KEY (ligue_id) REFERENCES public.ligues(id) ON DELETE SET NULL;
 
 
+--
+-- Name: tournoi_pointers tournoi_pointers_tournoi_id_fkey; Type: FK CONSTRAINT; Schema: public; Owner: example
+--
+
+ALTER TABLE ONLY public.tournoi_pointers
+    ADD CONSTRAINT tournoi_pointers_tournoi_id_fkey FOREIGN KEY (tournoi_id) REFERENCES public.tournois(id) ON DELETE CASCADE;
+
+
 --
 -- Name: tournois tournois_ligue_id_fkey; Type: FK CONSTRAINT; Schema: public; Owner: example
 --
@@ -2344,9 +2850,19 @@ ALTER TABLE ONLY public.tournois
     ADD CONSTRAINT tournois_ligue_id_fkey FOREIGN KEY (ligue_id) REFERENCES public.ligues(id) ON DELETE SET NULL;
 
 
+--
+-- Name: tournois tournois_winner_id_fkey; Type: FK CONSTRAINT; Schema: public; Owner: example
+--
+
+ALTER TABLE ONLY public.tournois
+    ADD CONSTRAINT tournois_winner_id_fkey FOREIGN KEY (winner_id) REFERENCES public.joueurs(id) ON DELETE SET NULL;
+
+
 --
 -- PostgreSQL database dump complete
 --
 
+INSERT INTO public.data_version DEFAULT VALUES;
+
 \unrestrict 9HtESgqenHS5z8a6nzIoYlxu62xjcJ8yu3uJs1Jk82ZlS9nZlHWEvmTKFM0mOT5
 
@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import math
+from itertools import combinations
+from typing import Any, Iterable
+
+import psycopg2.extras
+
+from constants import TRUESKILL_BETA, REPLAY_BATCH_SIZE
+
+# Confrontations directes (table head_to_head), servies par
+# /stats/joueur/<nom>/h2h et /stats/ligue/<id>/h2h.
+#
+# Pour chaque paire de joueurs ayant partage au moins un lobby : nombre de
+# lobbies communs, nombre de fois ou chacun a fini devant l'autre, somme des
+# ecarts de position, et nombre de fois ou joueur_a etait attendu devant
+# d'apres les notes TrueSkill d'avant tournoi (old_mu / old_sigma, quand elles
+# sont connues : nb_predits).
+#
+# Une paire n'est stockee qu'une fois (joueur_a < joueur_b), les compteurs
+# etant du point de vue de joueur_a. Chaque ecriture applique la contribution
+# des tournois qu'elle touche, k * (k - 1) / 2 paires pour un lobby de k
+# joueurs : ajoutee apres insertion ou recalcul, retranchee avant suppression
+# ou recalcul (apply_head_to_head).
+
+
+# Probabilite TrueSkill que a finisse devant b, nuls ignores.
+def win_probability(mu_a: float, sigma_a: float, mu_b: float, sigma_b: float) -> float:
+    denom = math.sqrt(2 * (2 * TRUESKILL_BETA ** 2 + sigma_a ** 2 + sigma_b ** 2))
+    return 0.5 * (1 + math.erf((mu_a - mu_b) / denom))
+
+
+# Ajoute a deltas la contribution d'un lobby. parts : (joueur_id, position,
+# old_mu, old_sigma). Les joueurs sans position (lobby jamais note) sont
+# ignores.
+def _add_lobby_pairs(deltas: dict, parts: list[tuple]) -> None:
+    placed = sorted(p for p in parts if p[1] is not None)
+    for (ja, pos_a, mu_a, sig_a), (jb, pos_b, mu_b, sig_b) in combinations(placed, 2):
+        row = deltas.setdefault((ja, jb), [0, 0, 0, 0, 0, 0.0])
+        row[0] += 1
+        if pos_a < pos_b:
+            row[1] += 1
+        elif pos_b < pos_a:
+            row[2] += 1
+        row[3] += pos_a - pos_b
+        if None not in (mu_a, sig_a, mu_b, sig_b):
+            row[4] += 1
+            row[5] += win_probability(float(mu_a), float(sig_a), float(mu_b), float(sig_b))
+
+
+# Applique (sign = 1) ou retranche (sign = -1) la contribution des tournois
+# tournoi_ids, d'apres leurs participations telles qu'elles sont stockees. A
+# appeler apres l'ecriture des positions d'un tournoi ajoute ou recalcule, et
+# avant la suppression ou le recalcul d'un tournoi existant. Ne commit pas.
+def apply_head_to_head(cur: Any, tournoi_ids: Iterable[int], sign: int = 1) -> None:
+    ids = list(set(tournoi_ids))
+    if not ids:
+        return
+
+    cur.execute("""
+        SELECT tournoi_id, joueur_id, position, old_mu, old_sigma
+        FROM Participations
+        WHERE tournoi_id = ANY(%s)
+    """, (ids,))
+    lobbies = {}
+    for tid, *part in cur.fetchall():
+        lobbies.setdefault(tid, []).append(tuple(part))
+
+    deltas = {}
+    for parts in lobbies.values():
+        _add_lobby_pairs(deltas, parts)
+    if not deltas:
+        return
+
+    psycopg2.extras.execute_values(cur, """
+        INSERT INTO head_to_head AS h (joueur_a, joueur_b, nb_lobbies, a_devant, b_devant, somme_ecart, nb_predits, attendu_a)
+        VALUES %s
+        ON CONFLICT (joueur_a, joueur_b) DO UPDATE
+        SET nb_lobbies = h.nb_lobbies + EXCLUDED.nb_lobbies,
+            a_devant = h.a_devant + EXCLUDED.a_devant,
+            b_devant = h.b_devant + EXCLUDED.b_devant,
+            somme_ecart = h.somme_ecart + EXCLUDED.somme_ecart,
+            nb_predits = h.nb_predits + EXCLUDED.nb_predits,
+            attendu_a = h.attendu_a + EXCLUDED.attendu_a
+    """, [(ja, jb, *(sign * v for v in row)) for (ja, jb), row in deltas.items()])
+
+    if sign < 0:
+        cur.execute(
+            "DELETE FROM head_to_head WHERE joueur_a = ANY(%s) AND nb_lobbies <= 0",
+            (list({ja for ja, _ in deltas}),)
+        )
+
+
+# Reconstruit toute la table depuis les participations (tache de fond
+# 'rebuild_head_to_head'). Le verrou met en attente les ecritures
+# concurrentes, qui appliqueront leur tournoi apres la reconstruction.
+def rebuild_head_to_head(conn: Any) -> int:
+    with conn.cursor() as cur:
+        cur.execute("LOCK TABLE head_to_head IN EXCLUSIVE MODE")
+        cur.execute("DELETE FROM head_to_head")
+        cur.execute("SELECT id FROM Tournois ORDER BY id")
+        ids = [r[0] for r in cur.fetchall()]
+        for start in range(0, len(ids), REPLAY_BATCH_SIZE):
+            apply_head_to_head(cur, ids[start:start + REPLAY_BATCH_SIZE])
+    conn.commit()
+    return len(ids)
+
+
+def _h2h_entry(nom: str, color: str | None, nb_lobbies: int, devant: int, derriere: int, somme_ecart: int, nb_predits: int, attendu: float) -> dict:
+    return {
+        "adversaire": nom,
+        "color": color or "#FFFFFF",
+        "lobbies": nb_lobbies,
+        "devant": devant,
+        "derriere": derriere,
+        "egalites": nb_lobbies - devant - derriere,
+        "ecart_moyen": round(somme_ecart / nb_lobbies, 2),
+        "taux_devant": round(devant / nb_lobbies, 3),
+        "taux_attendu": round(attendu / nb_predits, 3) if nb_predits else None,
+    }
+
+
+# Bilan de joueur_id contre chacun de ses adversaires (ou le seul
+# adversaire_id), du point de vue de joueur_id : ecart_moyen negatif = il
+# finit en moyenne devant. Adversaires les plus souvent croises d'abord.
+def player_head_to_head(cur: Any, joueur_id: int, adversaire_id: int | None = None) -> list[dict]:
+    adv_filter = "" if adversaire_id is None else " AND h.adv = %s"
+    params = [joueur_id, joueur_id] + ([] if adversaire_id is None else [adversaire_id])
+    cur.execute(f"""
+        SELECT j.nom, j.color, h.nb_lobbies, h.devant, h.derriere, h.somme_ecart, h.nb_predits, h.attendu
+        FROM (
+            SELECT joueur_b AS adv, nb_lobbies, a_devant AS devant, b_devant AS derriere,
+                   somme_ecart, nb_predits, attendu_a AS attendu
+            FROM head_to_head WHERE joueur_a = %s
+            UNION ALL
+            SELECT joueur_a, nb_lobbies, b_devant, a_devant,
+                   -somme_ecart, nb_predits, nb_predits - attendu_a
+            FROM head_to_head WHERE joueur_b = %s
+        ) h
+        JOIN Joueurs j ON j.id = h.adv
+        WHERE h.nb_lobbies > 0{adv_filter}
+        ORDER BY h.nb_lobbies DESC, j.nom
+    """, params)
+    return [_h2h_entry(*row) for row in cur.fetchall()]
+
+
+# Matrice des confrontations entre les joueurs actuels d'une ligue, tries par
+# TrueSkill : lobbies[i][j] lobbies partages, devant[i][j] nombre de fois ou
+# le joueur i a fini devant le joueur j.
+def league_head_to_head(cur: Any, ligue_id: int) -> dict:
+    cur.execute("""
+        SELECT id, nom FROM Joueurs
+        WHERE ligue_id = %s
+        ORDER BY score_trueskill DESC NULLS LAST, id
+    """, (ligue_id,))
+    joueurs = cur.fetchall()
+    index = {jid: i for i, (jid, _) in enumerate(joueurs)}
+    n = len(joueurs)
+    lobbies = [[0] * n for _ in range(n)]
+    devant = [[0] * n for _ in range(n)]
+
+    if n > 1:
+        ids = list(index)
+        cur.execute("""
+            SELECT joueur_a, joueur_b, nb_lobbies, a_devant, b_devant
+            FROM head_to_head
+            WHERE joueur_a = ANY(%s) AND joueur_b = ANY(%s)
+        """, (ids, ids))
+        for ja, jb, nb, a_dev, b_dev in cur.fetchall():
+            a, b = index[ja], index[jb]
+            lobbies[a][b] = lobbies[b][a] = nb
+            devant[a][b], devant[b][a] = a_dev, b_dev
+
+    return {
+        "joueurs": [nom for _, nom in joueurs],
+        "lobbies": lobbies,
+        "devant": devant,
+    }
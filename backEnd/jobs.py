@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+from constants import JOB_CHANNEL
+
+# File de taches persistante (table jobs), consommee par worker.py.
+#
+# Une tache est inseree dans la meme transaction que l'ecriture qui la
+# declenche : elle n'existe que si l'ecriture est commitee, et un NOTIFY sur
+# JOB_CHANNEL (delivre lui aussi au commit) reveille le worker.
+#
+# dedupe_key regroupe les taches equivalentes : tant qu'une tache portant la
+# meme cle attend encore, une nouvelle demande la fusionne (derniere charge
+# utile conservee) au lieu d'en creer une seconde. Dix tournois saisis d'affilee
+# ne declenchent ainsi qu'un seul recalcul des tiers.
+# Seule exception, la liste op_ids (operations du journal a l'origine de la
+# tache) : celles des demandes fusionnees s'additionnent, aucune n'est perdue.
+
+
+def enqueue_job(cur: Any, kind: str, payload: dict | None = None, dedupe_key: str | None = None) -> int:
+    cur.execute("""
+        INSERT INTO jobs (kind, payload, dedupe_key)
+        VALUES (%s, %s, %s)
+        ON CONFLICT (dedupe_key) WHERE status = 'pending'
+        DO UPDATE SET payload = CASE
+            WHEN jobs.payload ? 'op_ids' OR EXCLUDED.payload ? 'op_ids'
+            THEN EXCLUDED.payload || jsonb_build_object('op_ids',
+                COALESCE(jobs.payload->'op_ids', '[]'::jsonb) || COALESCE(EXCLUDED.payload->'op_ids', '[]'::jsonb))
+            ELSE EXCLUDED.payload
+        END
+        RETURNING id
+    """, (kind, json.dumps(payload or {}), dedupe_key))
+    job_id = cur.fetchone()[0]
+    cur.execute("SELECT pg_notify(%s, %s)", (JOB_CHANNEL, str(job_id)))
+    return job_id
+
+
+# Reserve la plus ancienne tache en attente. SKIP LOCKED permet de lancer
+# plusieurs workers sans qu'ils se disputent la meme ligne.
+def claim_job(cur: Any) -> tuple[int, str, dict] | None:
+    cur.execute("""
+        UPDATE jobs SET status = 'running', started_at = now(), attempts = attempts + 1
+        WHERE id = (
+            SELECT id FROM jobs
+            WHERE status = 'pending'
+            ORDER BY id ASC
+            FOR UPDATE SKIP LOCKED
+            LIMIT 1
+        )
+        RETURNING id, kind, payload
+    """)
+    return cur.fetchone()
+
+
+def complete_job(cur: Any, job_id: int, result: dict | None = None) -> None:
+    cur.execute("""
+        UPDATE jobs SET status = 'done', result = %s, finished_at = now()
+        WHERE id = %s
+    """, (json.dumps(result or {}), job_id))
+
+
+def fail_job(cur: Any, job_id: int, error: str) -> None:
+    cur.execute("""
+        UPDATE jobs SET status = 'failed', error = %s, finished_at = now()
+        WHERE id = %s
+    """, (error, job_id))
+
+
+# Taches restees 'running' apres un arret brutal du worker : remises en
+# attente, sauf si une tache equivalente attend deja (elle fera le travail).
+def requeue_stale_jobs(cur: Any) -> int:
+    cur.execute("""
+        DELETE FROM jobs j
+        WHERE j.status = 'running' AND j.dedupe_key IS NOT NULL
+          AND EXISTS (
+              SELECT 1 FROM jobs p
+              WHERE p.status = 'pending' AND p.dedupe_key = j.dedupe_key
+          )
+    """)
+    cur.execute("UPDATE jobs SET status = 'pending', started_at = NULL WHERE status = 'running'")
+    return cur.rowcount
+
+
+def get_job(cur: Any, job_id: int) -> dict | None:
+    cur.execute("""
+        SELECT id, kind, status, result, error, created_at, finished_at
+        FROM jobs WHERE id = %s
+    """, (job_id,))
+    r = cur.fetchone()
+    if not r:
+        return None
+    return {
+        "id": r[0],
+        "kind": r[1],
+        "status": r[2],
+        "result": r[3],
+        "error": r[4],
+        "created_at": r[5].isoformat() if r[5] else None,
+        "finished_at": r[6].isoformat() if r[6] else None,
+    }
+
+
+def purge_finished_jobs(cur: Any, days: int) -> None:
+    cur.execute("""
+        DELETE FROM jobs
+        WHERE status IN ('done', 'failed') AND finished_at < now() - make_interval(days => %s)
+    """, (days,))
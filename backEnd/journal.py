@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+from typing import Any, Iterable
+
+from constants import JOURNAL_MAX_OPERATIONS
+
+# Colonnes de Joueurs qu'une operation journalisee peut modifier, avec leur
+# type SQL pour la restauration depuis le jsonb.
+JOURNAL_FIELDS = {
+    'mu': 'double precision',
+    'sigma': 'double precision',
+    'tier': 'character(1)',
+    'consecutive_missed': 'integer',
+    'is_ranked': 'boolean',
+    'ligue_id': 'integer',
+}
+
+
+# Ouvre une operation dans le journal et retourne son id. Les operations les
+# plus anciennes au-dela de JOURNAL_MAX_OPERATIONS sont purgees au passage :
+# l'annulation ne remonte jamais plus loin que cette fenetre.
+def journal_begin(cur: Any, kind: str, ref_id: int | None = None, label: str | None = None) -> int:
+    cur.execute("""
+        INSERT INTO journal_operations (kind, ref_id, label)
+        VALUES (%s, %s, %s)
+        RETURNING id
+    """, (kind, ref_id, label))
+    op_id = cur.fetchone()[0]
+    cur.execute("""
+        DELETE FROM journal_operations
+        WHERE id <= (
+            SELECT id FROM journal_operations ORDER BY id DESC OFFSET %s LIMIT 1
+        )
+    """, (JOURNAL_MAX_OPERATIONS,))
+    return op_id
+
+
+# Sauvegarde l'etat "avant" des champs donnes pour les joueurs concernes (tous
+# si joueur_ids vaut None). A appeler juste avant l'UPDATE correspondant.
+# Si le joueur a deja une ligne pour cette operation, les valeurs deja
+# enregistrees l'emportent : c'est toujours l'etat d'avant l'operation qui est
+# restaure, meme si elle modifie le joueur en plusieurs temps.
+def journal_snapshot(cur: Any, op_id: int | None, joueur_ids: Iterable[int] | None, fields: Iterable[str]) -> None:
+    if op_id is None:
+        return
+    fields = [f for f in fields if f in JOURNAL_FIELDS]
+    if not fields:
+        return
+    ids = None if joueur_ids is None else list(joueur_ids)
+    if ids is not None and not ids:
+        return
+
+    payload = ", ".join(f"'{f}', {f}" for f in fields)
+    where = "TRUE" if ids is None else "id = ANY(%s)"
+    params = (op_id,) if ids is None else (op_id, ids)
+    cur.execute(f"""
+        INSERT INTO journal_deltas (operation_id, joueur_id, before)
+        SELECT %s, id, jsonb_build_object({payload})
+        FROM Joueurs
+        WHERE {where}
+        ON CONFLICT (operation_id, joueur_id)
+        DO UPDATE SET before = EXCLUDED.before || journal_deltas.before
+    """, params)
+
+
+# Remet les joueurs dans leur etat d'avant l'operation. Seules les lignes
+# journalisees sont touchees, et pour chacune seuls les champs enregistres.
+# Retourne le nombre de joueurs restaures.
+def journal_restore(cur: Any, op_id: int) -> int:
+    assignments = ",\n            ".join(
+        f"{f} = CASE WHEN d.before ? '{f}' THEN (d.before->>'{f}')::{t} ELSE j.{f} END"
+        for f, t in JOURNAL_FIELDS.items()
+    )
+    cur.execute(f"""
+        UPDATE Joueurs AS j SET
+            {assignments}
+        FROM journal_deltas d
+        WHERE d.operation_id = %s AND j.id = d.joueur_id
+    """, (op_id,))
+    return cur.rowcount
+
+
+# Dernieres operations du journal, de la plus recente a la plus ancienne.
+def journal_last_operations(cur: Any, limit: int) -> list[dict]:
+    cur.execute("""
+        SELECT o.id, o.kind, o.ref_id, o.label, o.created_at,
+               (SELECT COUNT(*) FROM journal_deltas d WHERE d.operation_id = o.id)
+        FROM journal_operations o
+        ORDER BY o.id DESC
+        LIMIT %s
+    """, (limit,))
+    return [{
+        "id": r[0],
+        "kind": r[1],
+        "ref_id": r[2],
+        "label": r[3],
+        "created_at": r[4].isoformat() if r[4] else None,
+        "nb_joueurs": r[5],
+    } for r in cur.fetchall()]
+
+
+def journal_find(cur: Any, kind: str, ref_id: int) -> int | None:
+    cur.execute("""
+        SELECT id FROM journal_operations
+        WHERE kind = %s AND ref_id = %s
+        ORDER BY id DESC LIMIT 1
+    """, (kind, ref_id))
+    row = cur.fetchone()
+    return row[0] if row else None
+
+
+def journal_latest_id(cur: Any) -> int | None:
+    cur.execute("SELECT MAX(id) FROM journal_operations")
+    return cur.fetchone()[0]
+
+
+def journal_delete(cur: Any, op_id: int) -> None:
+    cur.execute("DELETE FROM journal_operations WHERE id = %s", (op_id,))
+
+
+# Une ecriture manuelle hors journal (edition d'un joueur, suppression d'un
+# tournoi arbitraire, changement de config...) rend les etats "avant" deja
+# enregistres inexacts : on vide le journal pour que l'annulation ne puisse
+# pas la traverser.
+def journal_clear(cur: Any) -> None:
+    cur.execute("DELETE FROM journal_operations")
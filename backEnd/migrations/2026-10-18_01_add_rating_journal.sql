@@ -0,0 +1,22 @@
+-- Journal des ecritures qui modifient les joueurs (tournoi, fantome, reset
+-- global, tiers, mouvements inter-ligues). Chaque operation enregistre, pour
+-- les seuls joueurs touches, l'etat "avant" des champs modifies : annuler les
+-- N dernieres operations revient a reappliquer ces deltas du plus recent au
+-- plus ancien, sans parcourir toute la table Joueurs.
+
+CREATE TABLE IF NOT EXISTS public.journal_operations (
+    id SERIAL PRIMARY KEY,
+    kind character varying(32) NOT NULL,
+    ref_id integer,
+    label character varying(255),
+    created_at timestamp without time zone DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS public.journal_deltas (
+    operation_id integer NOT NULL REFERENCES public.journal_operations(id) ON DELETE CASCADE,
+    joueur_id integer NOT NULL REFERENCES public.joueurs(id) ON DELETE CASCADE,
+    before jsonb NOT NULL,
+    CONSTRAINT journal_deltas_pkey PRIMARY KEY (operation_id, joueur_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_journal_operations_kind_ref ON public.journal_operations (kind, ref_id);
@@ -0,0 +1,24 @@
+-- File de taches de fond (cf jobs.py / worker.py). Les ecritures admin
+-- (tournoi, reset global, suppression, publication de saison) y deposent le
+-- travail de suivi (recalcul des tiers, agregations de saison) et rendent la
+-- main des le commit ; le worker le depile ensuite.
+--
+-- L'index unique partiel sur dedupe_key fusionne les demandes equivalentes
+-- tant qu'elles n'ont pas encore ete prises par le worker.
+
+CREATE TABLE IF NOT EXISTS public.jobs (
+    id SERIAL PRIMARY KEY,
+    kind character varying(50) NOT NULL,
+    payload jsonb NOT NULL DEFAULT '{}'::jsonb,
+    dedupe_key character varying(100),
+    status character varying(16) NOT NULL DEFAULT 'pending',
+    attempts integer NOT NULL DEFAULT 0,
+    result jsonb,
+    error text,
+    created_at timestamp without time zone DEFAULT now(),
+    started_at timestamp without time zone,
+    finished_at timestamp without time zone
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS jobs_pending_dedupe_key ON public.jobs (dedupe_key) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_jobs_pending ON public.jobs (id) WHERE status = 'pending';
@@ -0,0 +1,20 @@
+-- Profils joueurs materialises (cf profiles.py), servis par
+-- /stats/joueur/<nom> : historique, palmares, details et awards.
+--
+-- Une ecriture marque dirty les profils des joueurs qu'elle touche ; le
+-- worker les reconstruit, et une lecture d'un profil dirty ou absent le
+-- reconstruit a la volee. version protege d'une reconstruction concurrente.
+
+CREATE TABLE IF NOT EXISTS public.joueur_profiles (
+    joueur_id integer PRIMARY KEY REFERENCES public.joueurs(id) ON DELETE CASCADE,
+    payload jsonb,
+    dirty boolean NOT NULL DEFAULT true,
+    version integer NOT NULL DEFAULT 0,
+    built_at timestamp without time zone
+);
+
+CREATE INDEX IF NOT EXISTS idx_joueur_profiles_dirty ON public.joueur_profiles (joueur_id) WHERE dirty;
+
+-- Construction initiale de tous les profils par le worker.
+INSERT INTO public.jobs (kind, dedupe_key) VALUES ('rebuild_profiles', 'rebuild_profiles')
+ON CONFLICT DO NOTHING;
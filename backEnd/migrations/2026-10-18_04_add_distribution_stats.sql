@@ -0,0 +1,19 @@
+-- Distribution TrueSkill de la population classee, versionnee (cf
+-- save_distribution dans services.py). Ecrite par recalculate_tiers, lue par
+-- /classement, /tier-seuils et /stats/joueur/<nom> pour les percentiles et
+-- seuils de tier, sans relire la table Joueurs.
+
+CREATE TABLE IF NOT EXISTS public.distribution_stats (
+    version SERIAL PRIMARY KEY,
+    mean double precision,
+    stdev double precision,
+    count integer NOT NULL,
+    sigma_threshold double precision NOT NULL,
+    thresholds jsonb NOT NULL,
+    curve jsonb NOT NULL,
+    created_at timestamp without time zone DEFAULT now()
+);
+
+-- Premiere version calculee par le worker.
+INSERT INTO public.jobs (kind, dedupe_key) VALUES ('recalculate_tiers', 'recalculate_tiers')
+ON CONFLICT DO NOTHING;
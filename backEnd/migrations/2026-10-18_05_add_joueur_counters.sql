@@ -0,0 +1,24 @@
+-- Compteurs de tournois joues et de victoires par joueur, tenus a jour par
+-- refresh_player_counters (services.py) a chaque ecriture sur les
+-- participations. /classement les lit directement au lieu d'agreger
+-- Participations a chaque requete.
+--
+-- L'index (score_trueskill DESC NULLS LAST, id) suit l'ordre exact du
+-- classement et sert sa pagination par curseur.
+
+ALTER TABLE public.joueurs
+    ADD COLUMN IF NOT EXISTS nb_tournois integer NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS nb_victoires integer NOT NULL DEFAULT 0;
+
+UPDATE public.joueurs AS j
+SET nb_tournois = c.nb_tournois, nb_victoires = c.nb_victoires
+FROM (
+    SELECT j2.id, COUNT(p.tournoi_id) AS nb_tournois,
+           COUNT(*) FILTER (WHERE p.position = 1) AS nb_victoires
+    FROM public.joueurs j2
+    LEFT JOIN public.participations p ON p.joueur_id = j2.id
+    GROUP BY j2.id
+) AS c
+WHERE j.id = c.id;
+
+CREATE INDEX IF NOT EXISTS idx_joueurs_classement ON public.joueurs (score_trueskill DESC NULLS LAST, id);
@@ -0,0 +1,3 @@
+-- Pagination par curseur (date, id) de /stats/tournois.
+
+CREATE INDEX IF NOT EXISTS idx_tournois_date_id ON public.tournois (date, id);
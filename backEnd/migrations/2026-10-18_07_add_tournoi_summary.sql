@@ -0,0 +1,42 @@
+-- Resume de chaque tournoi stocke sur sa ligne : effectif, vainqueur, score
+-- moyen, somme et nombre des old_mu renseignes, et session. Tenu a jour par
+-- refresh_tournoi_summary (services.py) a chaque ecriture sur les
+-- participations, pour que /stats/tournois, les profils et les recaps de
+-- saison n'agregent plus Participations a chaque lecture.
+--
+-- La session regroupe les tournois d'une meme journee dans une meme ligue :
+-- elle vaut l'id du plus petit tournoi du groupe.
+
+ALTER TABLE public.tournois
+    ADD COLUMN IF NOT EXISTS nb_joueurs integer NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS winner_id integer REFERENCES public.joueurs(id) ON DELETE SET NULL,
+    ADD COLUMN IF NOT EXISTS avg_score double precision,
+    ADD COLUMN IF NOT EXISTS sum_old_mu double precision NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS nb_old_mu integer NOT NULL DEFAULT 0,
+    ADD COLUMN IF NOT EXISTS session_id integer;
+
+UPDATE public.tournois AS t
+SET nb_joueurs = s.nb_joueurs,
+    winner_id = s.winner_id,
+    avg_score = s.avg_score,
+    sum_old_mu = s.sum_old_mu,
+    nb_old_mu = s.nb_old_mu
+FROM (
+    SELECT p.tournoi_id,
+           COUNT(*) AS nb_joueurs,
+           (ARRAY_AGG(p.joueur_id ORDER BY p.score DESC, p.position ASC))[1] AS winner_id,
+           AVG(p.score)::double precision AS avg_score,
+           COALESCE(SUM(p.old_mu), 0) AS sum_old_mu,
+           COUNT(p.old_mu) AS nb_old_mu
+    FROM public.participations p
+    GROUP BY p.tournoi_id
+) AS s
+WHERE t.id = s.tournoi_id;
+
+UPDATE public.tournois AS t
+SET session_id = g.session_id
+FROM (
+    SELECT id, MIN(id) OVER (PARTITION BY date, ligue_id) AS session_id
+    FROM public.tournois
+) AS g
+WHERE t.id = g.id AND t.session_id IS NULL;
@@ -0,0 +1,16 @@
+-- Pointeur vers le tournoi le plus recent de chaque ligue, tenu a jour par
+-- refresh_tournoi_pointers (services.py) a chaque ajout ou suppression de
+-- tournoi. /dernier-tournoi le lit au lieu d'un DISTINCT ON sur tous les
+-- tournois.
+
+CREATE TABLE IF NOT EXISTS public.tournoi_pointers (
+    ligue_nom character varying(100) PRIMARY KEY,
+    tournoi_id integer NOT NULL REFERENCES public.tournois(id) ON DELETE CASCADE
+);
+
+INSERT INTO public.tournoi_pointers (ligue_nom, tournoi_id)
+SELECT DISTINCT ON (ligue_nom) ligue_nom, id
+FROM public.tournois
+WHERE ligue_nom IS NOT NULL AND ligue_nom != 'Mixte'
+ORDER BY ligue_nom, date DESC, id DESC
+ON CONFLICT (ligue_nom) DO UPDATE SET tournoi_id = EXCLUDED.tournoi_id;
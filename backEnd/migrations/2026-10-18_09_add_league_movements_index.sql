@@ -0,0 +1,4 @@
+-- Mouvements d'une saison par joueur, lus en une requete par la vue
+-- /stats/recap/<slug>/new-leagues.
+
+CREATE INDEX IF NOT EXISTS idx_league_movements_saison_joueur ON public.league_movements (saison_id, joueur_id);
@@ -0,0 +1,15 @@
+-- Version globale des donnees, incrementee a chaque ecriture par
+-- cache.invalidate_cache et servie comme ETag par les endpoints publics
+-- (304 si le client a deja la version courante).
+--
+-- Une seule ligne. La version demarre a l'horodatage de creation en
+-- millisecondes, pour qu'une base recreee ne redistribue pas une version deja
+-- connue des clients.
+
+CREATE TABLE IF NOT EXISTS public.data_version (
+    id boolean PRIMARY KEY DEFAULT true CHECK (id),
+    version bigint NOT NULL DEFAULT (extract(epoch FROM now()) * 1000)::bigint
+);
+
+INSERT INTO public.data_version DEFAULT VALUES
+ON CONFLICT (id) DO NOTHING;
@@ -0,0 +1,26 @@
+-- Confrontations directes par paire de joueurs (cf head_to_head.py), servies
+-- par /stats/joueur/<nom>/h2h et /stats/ligue/<id>/h2h.
+--
+-- Une ligne par paire (joueur_a < joueur_b), compteurs du point de vue de
+-- joueur_a. Chaque ajout, suppression ou recalcul de tournoi y applique ou
+-- retranche la contribution du lobby.
+
+CREATE TABLE IF NOT EXISTS public.head_to_head (
+    joueur_a integer NOT NULL REFERENCES public.joueurs(id) ON DELETE CASCADE,
+    joueur_b integer NOT NULL REFERENCES public.joueurs(id) ON DELETE CASCADE,
+    nb_lobbies integer NOT NULL DEFAULT 0,
+    a_devant integer NOT NULL DEFAULT 0,
+    b_devant integer NOT NULL DEFAULT 0,
+    somme_ecart integer NOT NULL DEFAULT 0,
+    nb_predits integer NOT NULL DEFAULT 0,
+    attendu_a double precision NOT NULL DEFAULT 0,
+    PRIMARY KEY (joueur_a, joueur_b),
+    CHECK (joueur_a < joueur_b)
+);
+
+CREATE INDEX IF NOT EXISTS idx_head_to_head_joueur_b ON public.head_to_head (joueur_b);
+
+-- Remplissage initial par le worker (la probabilite TrueSkill attendue se
+-- calcule en Python).
+INSERT INTO public.jobs (kind, dedupe_key) VALUES ('rebuild_head_to_head', 'rebuild_head_to_head')
+ON CONFLICT DO NOTHING;
@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import heapq
+from bisect import bisect_left
+
+from cache import get_cached, set_cached
+from db import get_db_connection
+from utils import slugify
+
+# Recherche de joueurs par nom (/joueurs/search), insensible a la casse et aux
+# accents : noms et requete sont normalises par utils.slugify.
+#
+# L'index est un tableau trie de tous les suffixes des noms normalises : une
+# recherche par sous-chaine y devient une recherche de prefixe, soit deux
+# bisections, et seules les entrees qui correspondent sont parcourues. Il est
+# construit une fois par processus et reconstruit a la premiere recherche qui
+# suit une ecriture (invalidate_cache).
+
+_INDEX_CACHE_KEY = "player_search_index"
+
+# Rang d'une correspondance, du plus au moins pertinent : nom exact, debut du
+# nom, debut d'un mot du nom, ailleurs dans le nom.
+_RANK_EXACT, _RANK_PREFIX, _RANK_WORD, _RANK_INNER = range(4)
+
+
+def _build_index() -> dict:
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT nom, ligue_id, score_trueskill FROM Joueurs")
+            rows = cur.fetchall()
+
+    players = []
+    slugs = []
+    scores = []
+    suffixes = []
+    for idx, (nom, ligue_id, score) in enumerate(rows):
+        slug = slugify(nom)
+        players.append({
+            "nom": nom,
+            "ligue_id": ligue_id,
+            "score_trueskill": round(float(score), 3) if score is not None else 0.0,
+        })
+        slugs.append(slug)
+        scores.append(float(score) if score is not None else float("-inf"))
+        for start in range(len(slug)):
+            suffixes.append((slug[start:], start, idx))
+    suffixes.sort()
+
+    return {
+        "players": players,
+        "slugs": slugs,
+        "scores": scores,
+        "keys": [s[0] for s in suffixes],
+        "suffixes": suffixes,
+    }
+
+
+def _get_index() -> dict:
+    index = get_cached(_INDEX_CACHE_KEY)
+    if index is None:
+        index = _build_index()
+        set_cached(_INDEX_CACHE_KEY, index)
+    return index
+
+
+def _match_rank(slug: str, start: int, query: str) -> int:
+    if start == 0:
+        return _RANK_EXACT if slug == query else _RANK_PREFIX
+    return _RANK_WORD if slug[start - 1] == "-" else _RANK_INNER
+
+
+# Les limit meilleurs joueurs dont le nom contient query, tries par
+# pertinence puis par TrueSkill decroissant. Requete vide : les limit
+# meilleurs TrueSkill.
+def search_players(query: str, limit: int, ligue_id: int | None = None) -> list[dict]:
+    index = _get_index()
+    players, slugs, scores = index["players"], index["slugs"], index["scores"]
+    q = slugify(query)
+
+    if q:
+        keys = index["keys"]
+        lo = bisect_left(keys, q)
+        hi = bisect_left(keys, q + "\x7f", lo)
+        ranks: dict[int, int] = {}
+        for _, start, idx in index["suffixes"][lo:hi]:
+            rank = _match_rank(slugs[idx], start, q)
+            if rank < ranks.get(idx, _RANK_INNER + 1):
+                ranks[idx] = rank
+    else:
+        ranks = dict.fromkeys(range(len(players)), _RANK_EXACT)
+
+    if ligue_id is not None:
+        ranks = {idx: rank for idx, rank in ranks.items() if players[idx]["ligue_id"] == ligue_id}
+
+    best = heapq.nsmallest(
+        limit, ranks.items(),
+        key=lambda item: (item[1], -scores[item[0]], players[item[0]]["nom"])
+    )
+    return [players[idx] for idx, _ in best]
@@ -0,0 +1,439 @@
+from __future__ import annotations
+
+import json
+import math
+from bisect import bisect_right
+from typing import Any, Iterable
+
+from jobs import enqueue_job
+
+# Profil materialise des joueurs (table joueur_profiles), servi par
+# /stats/joueur/<nom>.
+#
+# Seule la partie qui ne bouge qu'avec l'historique est stockee : historique
+# (tournois, absences, resets), statistiques de tournoi, palmares, details par
+# ligue / taille de lobby et awards. L'etat courant (mu, sigma, tier,
+# percentile...) reste lu en direct sur Joueurs a chaque requete.
+#
+# Les ecritures marquent "dirty" les profils des joueurs touches (dans leur
+# propre transaction) et demandent une reconstruction en tache de fond ; une
+# lecture d'un profil dirty ou absent le reconstruit a la volee. La colonne
+# version protege d'une reconstruction concurrente qui ecraserait un marquage
+# plus recent avec un profil perime.
+
+
+# Marque les profils a reconstruire (tous si joueur_ids vaut None) et demande
+# leur reconstruction au worker.
+def invalidate_profiles(cur: Any, joueur_ids: Iterable[int] | None = None) -> None:
+    if joueur_ids is None:
+        cur.execute("UPDATE joueur_profiles SET dirty = true, version = version + 1")
+    else:
+        ids = list(set(joueur_ids))
+        if not ids:
+            return
+        cur.execute("""
+            INSERT INTO joueur_profiles (joueur_id, dirty, version)
+            SELECT id, true, 1 FROM Joueurs WHERE id = ANY(%s)
+            ON CONFLICT (joueur_id) DO UPDATE
+            SET dirty = true, version = joueur_profiles.version + 1
+        """, (ids,))
+    enqueue_job(cur, 'rebuild_profiles', {}, dedupe_key='rebuild_profiles')
+
+
+def get_profile(cur: Any, joueur_id: int) -> dict:
+    cur.execute("SELECT payload, dirty, version FROM joueur_profiles WHERE joueur_id = %s", (joueur_id,))
+    row = cur.fetchone()
+    if row and not row[1]:
+        return row[0]
+    return rebuild_profile(cur, joueur_id, row[2] if row else 0)
+
+
+def rebuild_profile(cur: Any, joueur_id: int, version: int) -> dict:
+    payload = build_profile_payload(cur, joueur_id)
+    cur.execute("""
+        INSERT INTO joueur_profiles (joueur_id, payload, dirty, version, built_at)
+        VALUES (%s, %s, false, %s, now())
+        ON CONFLICT (joueur_id) DO UPDATE
+        SET payload = EXCLUDED.payload, dirty = false, built_at = now()
+        WHERE joueur_profiles.version = EXCLUDED.version
+    """, (joueur_id, json.dumps(payload), version))
+    return payload
+
+
+# Reconstruit les profils marques dirty, ainsi que ceux des joueurs qui n'en
+# ont pas encore. Execute par le worker (tache 'rebuild_profiles').
+def rebuild_dirty_profiles(conn: Any) -> int:
+    with conn.cursor() as cur:
+        cur.execute("""
+            SELECT j.id, COALESCE(p.version, 0)
+            FROM Joueurs j
+            LEFT JOIN joueur_profiles p ON p.joueur_id = j.id
+            WHERE p.joueur_id IS NULL OR p.dirty
+        """)
+        todo = cur.fetchall()
+    for joueur_id, version in todo:
+        with conn.cursor() as cur:
+            rebuild_profile(cur, joueur_id, version)
+        conn.commit()
+    return len(todo)
+
+
+def _new_bucket() -> dict:
+    return {"nb_tournois": 0, "victoires": 0, "gold": 0, "silver": 0, "bronze": 0,
+            "podiums": 0, "somme_score": 0.0, "somme_position": 0,
+            "meilleur_score": None, "pos_counts": {}}
+
+
+def _accumulate(bucket: dict, position: int, score: float) -> None:
+    bucket["nb_tournois"] += 1
+    bucket["somme_score"] += score
+    bucket["somme_position"] += position
+    if bucket["meilleur_score"] is None or score > bucket["meilleur_score"]:
+        bucket["meilleur_score"] = score
+    if position > 0:
+        bucket["pos_counts"][position] = bucket["pos_counts"].get(position, 0) + 1
+    if position == 1:
+        bucket["victoires"] += 1; bucket["gold"] += 1
+    elif position == 2:
+        bucket["silver"] += 1
+    elif position == 3:
+        bucket["bronze"] += 1
+    if position in (1, 2, 3):
+        bucket["podiums"] += 1
+
+
+def _finalize(bucket: dict) -> dict:
+    n = bucket["nb_tournois"]
+    defaites = n - bucket["victoires"]
+    return {
+        "nb_tournois": n,
+        "victoires": bucket["victoires"],
+        "defaites": defaites,
+        "gold": bucket["gold"], "silver": bucket["silver"], "bronze": bucket["bronze"],
+        "podiums": bucket["podiums"],
+        "taux_podium": round((bucket["podiums"] / n) * 100, 1) if n > 0 else 0,
+        "pos_counts": [[p, bucket["pos_counts"][p]] for p in sorted(bucket["pos_counts"])],
+        "ratio_vd": round((bucket["victoires"] / defaites), 2) if defaites > 0 else None,
+        "ratio_victoires": round((bucket["victoires"] / n) * 100, 1) if n > 0 else 0,
+        "score_moyen": round(bucket["somme_score"] / n, 1) if n > 0 else 0,
+        "position_moyenne": round(bucket["somme_position"] / n, 2) if n > 0 else 0,
+        "meilleur_score": bucket["meilleur_score"] if bucket["meilleur_score"] is not None else 0,
+    }
+
+
+def _build_awards(rows: list[tuple]) -> list[dict]:
+    awards_list = []
+    award_groups = {}
+    for r in rows:
+        emoji, nom, description, code, saison_nom, is_yearly = r[:6]
+        is_league_award, a_ligue_nom, a_ligue_couleur, a_ligue_id, cur_couleur, cur_nom = r[6:]
+
+        ligue_supprimee = is_league_award and a_ligue_id is None
+        ligue_nom_final = cur_nom if (is_league_award and not ligue_supprimee) else a_ligue_nom
+        ligue_couleur_final = cur_couleur if (is_league_award and not ligue_supprimee) else a_ligue_couleur
+
+        is_moai = 'moai' in code
+
+        if is_moai:
+            if is_yearly:
+                trophy_desc = description.replace("de l'année", "de l'année " + saison_nom.replace("Année ", ""))
+            else:
+                trophy_desc = description + " " + saison_nom
+            if is_league_award and ligue_nom_final:
+                trophy_desc += "\nObtenu en " + ligue_nom_final
+                if ligue_supprimee:
+                    trophy_desc += " (cette ligue n'existe plus)"
+            entry = {"emoji": emoji, "nom": nom, "description": trophy_desc, "count": 1}
+            if is_league_award:
+                entry["is_league_award"] = True
+                entry["ligue_nom"] = ligue_nom_final
+                entry["ligue_couleur"] = ligue_couleur_final
+                entry["ligue_supprimee"] = ligue_supprimee
+            awards_list.append(entry)
+        else:
+            group_key = (emoji, nom, description, bool(is_league_award),
+                         ligue_nom_final if is_league_award else None,
+                         ligue_couleur_final if is_league_award else None,
+                         ligue_supprimee if is_league_award else None)
+            if group_key not in award_groups:
+                desc = description
+                if is_league_award and ligue_nom_final:
+                    desc += "\nObtenu en " + ligue_nom_final
+                    if ligue_supprimee:
+                        desc += " (cette ligue n'existe plus)"
+                entry = {"emoji": emoji, "nom": nom, "description": desc, "count": 0}
+                if is_league_award:
+                    entry["is_league_award"] = True
+                    entry["ligue_nom"] = ligue_nom_final
+                    entry["ligue_couleur"] = ligue_couleur_final
+                    entry["ligue_supprimee"] = ligue_supprimee
+                award_groups[group_key] = entry
+            award_groups[group_key]["count"] += 1
+    awards_list.extend(award_groups.values())
+    return awards_list
+
+
+# Calcule la partie materialisee du profil d'un joueur. Toutes les requetes
+# sont filtrees sur le joueur (index sur joueur_id) ; l'effectif des lobbies
+# est lu sur le resume stocke dans Tournois.
+def build_profile_payload(cur: Any, joueur_id: int) -> dict:
+    cur.execute("SELECT mu FROM Joueurs WHERE id = %s", (joueur_id,))
+    row = cur.fetchone()
+    current_mu = row[0] if row else None
+
+    cur.execute("""
+        SELECT t.id, t.date, p.score, p.position, p.new_score_trueskill, p.mu, p.sigma,
+               COALESCE(t.ligue_nom, l.nom),
+               COALESCE(t.ligue_couleur, l.couleur),
+               COALESCE(t.ligue_id, l.id),
+               COALESCE(l2.niveau, 999),
+               t.nb_joueurs
+        FROM Participations p
+        JOIN Tournois t ON p.tournoi_id = t.id
+        LEFT JOIN Ligues l ON t.ligue_id = l.id
+        LEFT JOIN Ligues l2 ON COALESCE(t.ligue_id, l.id) = l2.id
+        WHERE p.joueur_id = %s
+        ORDER BY t.date DESC, t.id DESC
+    """, (joueur_id,))
+    raw_history = cur.fetchall()
+
+    cur.execute("""
+        SELECT date, old_sigma, new_sigma
+        FROM ghost_log
+        WHERE joueur_id = %s
+        ORDER BY date DESC
+    """, (joueur_id,))
+    raw_ghosts = cur.fetchall()
+
+    cur.execute("SELECT date, value_applied FROM global_resets ORDER BY date DESC")
+    raw_resets = cur.fetchall()
+
+    historique_data = []
+    scores_bruts = []
+    positions = []
+    victoires = 0
+
+    for tid, date, score, position, hist_ts, h_mu, h_sigma, hist_ligue_nom, hist_ligue_couleur, _, _, _ in raw_history:
+        s_val = float(score) if score is not None else 0.0
+        p_val = int(position) if position is not None else 0
+        ts_val = float(hist_ts) if hist_ts is not None else 0.0
+        scores_bruts.append(s_val)
+        positions.append(p_val)
+        if p_val == 1: victoires += 1
+
+        historique_data.append({
+            "type": "tournoi",
+            "id": tid,
+            "date": date.strftime("%d/%m/%Y"),
+            "date_sort": date.strftime("%Y-%m-%d"),
+            "score": s_val,
+            "position": p_val,
+            "score_trueskill": round(ts_val, 3),
+            "ligue": hist_ligue_nom if hist_ligue_nom else "N/A",
+            "ligue_couleur": hist_ligue_couleur if hist_ligue_couleur else None
+        })
+
+    # mu au moment d'une absence : celui du dernier tournoi joue a cette date
+    # ou avant (l'historique est deja trie), a defaut le mu actuel.
+    played = [(r[1], r[5]) for r in reversed(raw_history)]
+    played_dates = [d for d, _ in played]
+    for g_date, old_sig, new_sig in raw_ghosts:
+        idx = bisect_right(played_dates, g_date)
+        mu_at_ghost = played[idx - 1][1] if idx > 0 and played[idx - 1][1] is not None else current_mu
+        ts_ghost = float(mu_at_ghost) - 3 * float(new_sig)
+        penalty_val = round(float(new_sig) - float(old_sig), 3)
+        historique_data.append({
+            "type": "absence", "date": g_date.strftime("%d/%m/%Y"),
+            "date_sort": g_date.strftime("%Y-%m-%d"),
+            "score": 0, "position": "-", "score_trueskill": round(ts_ghost, 3),
+            "valeur": penalty_val, "ligue": "-"
+        })
+
+    # Score de reference d'un reset : celui de la derniere entree (tournoi ou
+    # absence, l'absence l'emportant a date egale) a sa date ou avant.
+    anchors = sorted(
+        ((e['date_sort'], 0 if e['type'] == 'tournoi' else 1, e['score_trueskill']) for e in historique_data),
+        key=lambda x: (x[0], x[1])
+    )
+    anchor_dates = [a[0] for a in anchors]
+    for r_date, val in raw_resets:
+        val_float = float(val)
+        r_date_only = r_date.date() if hasattr(r_date, 'date') else r_date
+        r_sort = r_date_only.strftime("%Y-%m-%d")
+        idx = bisect_right(anchor_dates, r_sort)
+        if idx == 0:
+            continue
+        reset_ts = anchors[idx - 1][2] - val_float * 3
+
+        historique_data.append({
+            "type": "reset", "date": r_date_only.strftime("%d/%m/%Y"),
+            "date_sort": r_sort,
+            "score": 0, "position": "-", "score_trueskill": round(reset_ts, 3),
+            "valeur": val_float, "ligue": "-"
+        })
+
+    type_order = {'tournoi': 0, 'absence': 1, 'reset': 2}
+    historique_data.sort(key=lambda x: (x['date_sort'], type_order.get(x['type'], 3)), reverse=True)
+
+    for i in range(len(historique_data)):
+        if i < len(historique_data) - 1:
+            historique_data[i]['ts_diff'] = round(historique_data[i]['score_trueskill'] - historique_data[i + 1]['score_trueskill'], 3)
+        else:
+            historique_data[i]['ts_diff'] = None
+
+    nb_tournois = len(scores_bruts)
+    if nb_tournois > 0:
+        score_moyen = sum(scores_bruts) / nb_tournois
+        meilleur_score = max(scores_bruts)
+        position_moyenne = sum(positions) / nb_tournois
+        ratio_victoires = (victoires / nb_tournois) * 100
+        variance = sum((x - score_moyen) ** 2 for x in scores_bruts) / nb_tournois
+        ecart_type_scores = math.sqrt(variance)
+    else:
+        score_moyen = 0; meilleur_score = 0; position_moyenne = 0; ratio_victoires = 0; ecart_type_scores = 0
+
+    progression_recente = 0
+    if nb_tournois >= 2:
+        tournois_only = [x for x in historique_data if x['type'] == 'tournoi']
+        if len(tournois_only) >= 2:
+            progression_recente = tournois_only[0]['score_trueskill'] - tournois_only[1]['score_trueskill']
+
+    cur.execute("""
+        SELECT t.emoji, t.nom, t.description, t.code, s.nom AS saison_nom, s.is_yearly,
+               o.is_league_award, o.ligue_nom, o.ligue_couleur, o.ligue_id,
+               l.couleur AS current_couleur, l.nom AS current_nom
+        FROM awards_obtenus o
+        JOIN types_awards t ON o.award_id = t.id
+        JOIN saisons s ON o.saison_id = s.id
+        LEFT JOIN ligues l ON o.ligue_id = l.id
+        WHERE o.joueur_id = %s
+        ORDER BY s.date_fin ASC
+    """, (joueur_id,))
+    awards_list = _build_awards(cur.fetchall())
+
+    palmares = {}
+    has_league_data = False
+    ligues_detail = {}
+    for row in raw_history:
+        d_pos, d_score = row[3], row[2]
+        d_nom, d_coul, d_lid, d_niv, d_nb = row[7], row[8], row[9], row[10], row[11]
+        pos_v = int(d_pos) if d_pos is not None else 0
+        score_v = float(d_score) if d_score is not None else 0.0
+
+        if pos_v in (1, 2, 3):
+            is_podium_league = bool(d_nom and d_lid)
+            p_key = d_nom if is_podium_league else "__classique__"
+            if is_podium_league:
+                has_league_data = True
+            if p_key not in palmares:
+                palmares[p_key] = {
+                    "ligue_nom": d_nom if is_podium_league else None,
+                    "ligue_couleur": d_coul if is_podium_league else None,
+                    "ligue_niveau": d_niv if (is_podium_league and d_niv) else 999,
+                    "gold": 0, "silver": 0, "bronze": 0
+                }
+            palmares[p_key][{1: "gold", 2: "silver", 3: "bronze"}[pos_v]] += 1
+
+        is_real_league = bool(d_nom)
+        key = d_nom if is_real_league else "__classique__"
+        nb_v = int(d_nb or 0)
+        if key not in ligues_detail:
+            ligues_detail[key] = {
+                "ligue_nom": d_nom if is_real_league else None,
+                "ligue_couleur": d_coul if is_real_league else None,
+                "ligue_niveau": d_niv if (is_real_league and d_niv) else 999,
+                "total": _new_bucket(),
+                "_tailles": {}
+            }
+        entry = ligues_detail[key]
+        _accumulate(entry["total"], pos_v, score_v)
+        if nb_v not in entry["_tailles"]:
+            entry["_tailles"][nb_v] = _new_bucket()
+        _accumulate(entry["_tailles"][nb_v], pos_v, score_v)
+
+    palmares_list = sorted(palmares.values(), key=lambda x: x["ligue_niveau"])
+
+    details_list = []
+    for entry in ligues_detail.values():
+        tailles = [
+            dict(_finalize(b), nb_joueurs=nb)
+            for nb, b in sorted(entry["_tailles"].items())
+        ]
+        details_list.append({
+            "ligue_nom": entry["ligue_nom"],
+            "ligue_couleur": entry["ligue_couleur"],
+            "ligue_niveau": entry["ligue_niveau"],
+            "total": _finalize(entry["total"]),
+            "tailles": tailles
+        })
+    details_list.sort(key=lambda x: x["ligue_niveau"])
+
+    return {
+        "stats": {
+            "nombre_tournois": nb_tournois,
+            "victoires": victoires,
+            "defaites": nb_tournois - victoires,
+            "ratio_vd": round(victoires / (nb_tournois - victoires), 2) if (nb_tournois - victoires) > 0 else None,
+            "ratio_victoires": round(ratio_victoires, 1),
+            "score_moyen": round(score_moyen, 3),
+            "meilleur_score": meilleur_score,
+            "ecart_type_scores": round(ecart_type_scores, 3),
+            "position_moyenne": round(position_moyenne, 1),
+            "progression_recente": round(progression_recente, 3),
+        },
+        "historique": historique_data,
+        "awards": awards_list,
+        "palmares": palmares_list,
+        "has_league_data": has_league_data,
+        "details": details_list
+    }
+
+
+# Largest-Triangle-Three-Buckets : indices des threshold points qui conservent
+# le mieux l'allure de la courbe (xs croissants). Le premier et le dernier
+# point sont toujours gardes ; les autres sont repartis en threshold - 2
+# paquets, dont on garde le point formant le plus grand triangle avec le
+# point retenu precedent et la moyenne du paquet suivant.
+def lttb_indices(xs: list[float], ys: list[float], threshold: int) -> list[int]:
+    n = len(ys)
+    if threshold >= n or threshold < 3:
+        return list(range(n))
+
+    every = (n - 2) / (threshold - 2)
+    selected = [0]
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = sum(xs[end:next_end]) / (next_end - end)
+        avg_y = sum(ys[end:next_end]) / (next_end - end)
+
+        best, best_area = start, -1.0
+        for j in range(start, end):
+            area = abs((xs[a] - avg_x) * (ys[j] - ys[a]) - (xs[a] - xs[j]) * (avg_y - ys[a]))
+            if area > best_area:
+                best, best_area = j, area
+        selected.append(best)
+        a = best
+    selected.append(n - 1)
+    return selected
+
+
+# Courbe TrueSkill du profil, du plus ancien au plus recent, ramenee a points
+# valeurs au plus (format colonnes). Les absences et resets sont toujours
+# gardes, l'echantillonnage ne portant que sur les tournois.
+def trueskill_series(historique: list[dict], points: int) -> dict:
+    chrono = historique[::-1]
+    markers = [i for i, e in enumerate(chrono) if e['type'] != 'tournoi']
+    ys = [e['score_trueskill'] or 0.0 for e in chrono]
+    kept = lttb_indices(list(range(len(chrono))), ys, max(points - len(markers), 3))
+    indices = sorted(set(kept).union(markers))
+
+    return {
+        "total": len(chrono),
+        "dates": [chrono[i]['date'] for i in indices],
+        "trueskill": [ys[i] for i in indices],
+        "types": [chrono[i]['type'] for i in indices],
+        "valeurs": [chrono[i].get('valeur') for i in indices],
+    }
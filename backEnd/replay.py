@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import logging
+from typing import Any
+
+import psycopg2.extras
+
+from constants import DEFAULT_TAU, DEFAULT_GHOST_PENALTY, GHOST_SIGMA_CAP, REPLAY_EPSILON, REPLAY_BATCH_SIZE
+from services import trueskill_env, rate_lobby, refresh_tournoi_summary
+from head_to_head import apply_head_to_head
+
+logger = logging.getLogger(__name__)
+
+
+# Resets globaux pas encore "traverses" par l'historique a partir de start_id.
+# Un reset ne peut etre cree que si aucun tournoi n'existe a sa date ou apres,
+# et aucun tournoi ne peut ensuite etre ajoute a sa date ou avant : il se place
+# donc juste avant le premier tournoi (par id) date apres lui. floor_date est
+# la derniere date deja jouee avant le point de depart.
+def _pending_resets(cur: Any, floor_date: Any) -> list[tuple[Any, float]]:
+    cur.execute("SELECT date::date, value_applied FROM global_resets ORDER BY date ASC, id ASC")
+    return [(d, float(v)) for d, v in cur.fetchall() if floor_date is None or d > floor_date]
+
+
+def _apply_resets(dirty: dict, resets: list[tuple[Any, float]], before_date: Any | None) -> list[tuple[Any, float]]:
+    remaining = []
+    for reset_date, val in resets:
+        if before_date is None or reset_date < before_date:
+            for jid, (mu, sigma) in dirty.items():
+                dirty[jid] = (mu, sigma + val)
+        else:
+            remaining.append((reset_date, val))
+    return remaining
+
+
+# Rejoue l'historique a partir du tournoi start_id (inclus), dans l'ordre des
+# id : c'est l'ordre dans lequel les notes ont ete calculees en direct, et donc
+# celui dans lequel old_mu / old_sigma s'enchainent.
+#
+# dirty : {joueur_id: (mu, sigma)} etat corrige des joueurs au point de depart,
+# pour ceux dont l'etat differe de ce qui est stocke. force_ids : tournois a
+# recalculer meme sans joueur modifie (correction de resultats).
+#
+# Seuls les lobbies comptant un joueur modifie sont recalcules, les autres
+# joueurs repartant de leurs old_mu / old_sigma stockes. Un joueur sort de
+# dirty des que sa nouvelle note retombe sur la note stockee (a REPLAY_EPSILON
+# pres), et le rejeu s'arrete des qu'il n'en reste plus aucun.
+#
+# Les decisions fantome enregistrees (qui a ete penalise, a quel tournoi) sont
+# conservees telles quelles : seule la penalite est recalculee a partir du
+# sigma corrige. Les grilles figees (grille_snapshots) des journees traversees
+# sont mises a jour pour les joueurs modifies. joueurs_touches liste tous les
+# joueurs dont l'historique a pu changer. Ne commit pas.
+def replay_from(cur: Any, start_id: int, dirty: dict[int, tuple[float, float]], force_ids: set[int] | None = None, floor_date: Any | None = None) -> dict:
+    dirty = dict(dirty)
+    force_ids = set(force_ids or ())
+
+    cur.execute("SELECT key, value FROM Configuration WHERE key IN ('tau', 'ghost_penalty')")
+    conf = dict(cur.fetchall())
+    ts_env = trueskill_env(float(conf.get('tau', DEFAULT_TAU)))
+    penalty_val = float(conf.get('ghost_penalty', DEFAULT_GHOST_PENALTY))
+
+    if floor_date is None:
+        cur.execute("SELECT MAX(date) FROM Tournois WHERE id < %s", (start_id,))
+        floor_date = cur.fetchone()[0]
+    else:
+        cur.execute("SELECT GREATEST(MAX(date), %s) FROM Tournois WHERE id < %s", (floor_date, start_id))
+        floor_date = cur.fetchone()[0] or floor_date
+    resets = _pending_resets(cur, floor_date)
+
+    participation_updates = []
+    ghost_updates = []
+    ghost_deletes = []
+    snapshot_updates = []
+    touched = set(dirty)
+    rerated = 0
+    last_id = start_id - 1
+
+    while dirty or force_ids:
+        cur.execute("""
+            SELECT id, date FROM Tournois
+            WHERE id > %s
+            ORDER BY id ASC
+            LIMIT %s
+        """, (last_id, REPLAY_BATCH_SIZE))
+        batch = cur.fetchall()
+        if not batch:
+            break
+        batch_ids = [tid for tid, _ in batch]
+        last_id = batch_ids[-1]
+
+        cur.execute("""
+            SELECT tournoi_id, joueur_id, score, old_mu, old_sigma, mu, sigma, exclude_from_ts
+            FROM Participations
+            WHERE tournoi_id = ANY(%s)
+        """, (batch_ids,))
+        parts_by_tournoi = {}
+        for row in cur.fetchall():
+            parts_by_tournoi.setdefault(row[0], []).append(row[1:])
+
+        cur.execute("""
+            SELECT tournoi_id, id, joueur_id
+            FROM ghost_log
+            WHERE tournoi_id = ANY(%s)
+        """, (batch_ids,))
+        ghosts_by_tournoi = {}
+        for tid, gid, jid in cur.fetchall():
+            ghosts_by_tournoi.setdefault(tid, []).append((gid, jid))
+
+        cur.execute("""
+            SELECT MIN(id) FROM Tournois
+            WHERE date = ANY(%s)
+            GROUP BY date
+        """, (list({d for _, d in batch}),))
+        first_of_day = {r[0] for r in cur.fetchall()}
+
+        for tid, tdate in batch:
+            if not dirty and not force_ids:
+                break
+
+            resets = _apply_resets(dirty, resets, tdate)
+
+            if tid in first_of_day:
+                snapshot_updates.extend((tdate, jid, mu, sigma) for jid, (mu, sigma) in dirty.items())
+
+            parts = parts_by_tournoi.get(tid, [])
+            if parts and (tid in force_ids or any(p[0] in dirty for p in parts)):
+                lobby = []
+                for jid, score, old_mu, old_sigma, _, _, exclude_ts in parts:
+                    mu, sigma = dirty.get(jid, (old_mu, old_sigma))
+                    lobby.append({'id': jid, 'score': score, 'mu': mu, 'sigma': sigma, 'exclude_from_ts': exclude_ts})
+
+                if any(e['mu'] is None or e['sigma'] is None for e in lobby):
+                    logger.warning(f"Rejeu : tournoi {tid} sans etat initial stocke, non recalcule")
+                else:
+                    results = rate_lobby(ts_env, lobby)
+                    rerated += 1
+                    for e in lobby:
+                        jid = e['id']
+                        new_mu, new_sigma, position = results[jid]
+                        participation_updates.append((tid, jid, e['mu'], e['sigma'], new_mu, new_sigma, new_mu - 3 * new_sigma, position))
+                        touched.add(jid)
+
+                    for jid, _, _, _, stored_mu, stored_sigma, _ in parts:
+                        new_mu, new_sigma, _ = results[jid]
+                        converged = (
+                            stored_mu is not None and stored_sigma is not None
+                            and abs(new_mu - stored_mu) <= REPLAY_EPSILON
+                            and abs(new_sigma - stored_sigma) <= REPLAY_EPSILON
+                        )
+                        if converged:
+                            dirty.pop(jid, None)
+                        else:
+                            dirty[jid] = (new_mu, new_sigma)
+            force_ids.discard(tid)
+
+            for gid, jid in ghosts_by_tournoi.get(tid, []):
+                if jid not in dirty:
+                    continue
+                mu, sigma = dirty[jid]
+                capped_sig = min(sigma + penalty_val, GHOST_SIGMA_CAP) if sigma < GHOST_SIGMA_CAP else sigma
+                applied = round(capped_sig - sigma, 6)
+                if applied > 0:
+                    ghost_updates.append((gid, sigma, capped_sig, applied))
+                    dirty[jid] = (mu, capped_sig)
+                else:
+                    ghost_deletes.append(gid)
+
+    if dirty:
+        _apply_resets(dirty, resets, None)
+
+    if participation_updates:
+        # Positions et notes d'avant tournoi changent : les confrontations
+        # des lobbies recalcules sont retranchees puis reappliquees.
+        rerated_ids = {u[0] for u in participation_updates}
+        apply_head_to_head(cur, rerated_ids, -1)
+        psycopg2.extras.execute_values(cur, """
+            UPDATE Participations AS p
+            SET old_mu = data.old_mu, old_sigma = data.old_sigma, mu = data.mu, sigma = data.sigma,
+                new_score_trueskill = data.ts, position = data.pos
+            FROM (VALUES %s) AS data(tid, jid, old_mu, old_sigma, mu, sigma, ts, pos)
+            WHERE p.tournoi_id = data.tid AND p.joueur_id = data.jid
+        """, participation_updates)
+        refresh_tournoi_summary(cur, rerated_ids)
+        apply_head_to_head(cur, rerated_ids)
+
+    if ghost_updates:
+        psycopg2.extras.execute_values(cur, """
+            UPDATE ghost_log AS g
+            SET old_sigma = data.old_sigma, new_sigma = data.new_sigma, penalty_applied = data.applied
+            FROM (VALUES %s) AS data(id, old_sigma, new_sigma, applied)
+            WHERE g.id = data.id
+        """, ghost_updates)
+    if ghost_deletes:
+        cur.execute("DELETE FROM ghost_log WHERE id = ANY(%s)", (ghost_deletes,))
+
+    if snapshot_updates:
+        psycopg2.extras.execute_values(cur, """
+            UPDATE grille_snapshots AS s SET mu = data.mu, sigma = data.sigma
+            FROM (VALUES %s) AS data(date, jid, mu, sigma)
+            WHERE s.date = data.date::date AND s.joueur_id = data.jid
+        """, snapshot_updates)
+
+    if dirty:
+        psycopg2.extras.execute_values(cur, """
+            UPDATE Joueurs AS j SET mu = data.mu, sigma = data.sigma
+            FROM (VALUES %s) AS data(id, mu, sigma)
+            WHERE j.id = data.id
+        """, [(jid, mu, sigma) for jid, (mu, sigma) in dirty.items()])
+
+    return {
+        "tournois_recalcules": rerated,
+        "joueurs_corriges": len(dirty),
+        "joueurs_touches": sorted(touched),
+    }
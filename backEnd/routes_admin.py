@@ -8,12 +8,11 @@ from typing import Any
 from datetime import datetime, timedelta
 
 import bcrypt
-import trueskill
 import psycopg2.extras
 from flask import Blueprint, jsonify, request, abort
 
 from constants import (
-    DEFAULT_MU, DEFAULT_SIGMA, TRUESKILL_BETA, TRUESKILL_DRAW_PROBABILITY,
+    DEFAULT_MU, DEFAULT_SIGMA,
     DEFAULT_TAU, DEFAULT_GHOST_PENALTY, DEFAULT_UNRANKED_THRESHOLD, DEFAULT_SIGMA_THRESHOLD,
     DEFAULT_GHOST_THRESHOLD_DAYS, DEFAULT_GHOST_INTERVAL_DAYS,
     GHOST_SIGMA_CAP, TOKEN_LIFETIME_MINUTES, IP_VERSION_DEFAULT,
@@ -21,11 +20,19 @@ from constants import (
 from db import get_db_connection, ADMIN_PASSWORD_HASH
 from auth import admin_required
 from cache import invalidate_cache
+from journal import (
+    journal_begin, journal_snapshot, journal_last_operations, journal_find,
+    journal_latest_id, journal_clear,
+)
 from utils import generate_unique_slug, extract_league_number
+from replay import replay_from
+from jobs import enqueue_job, get_job
+from profiles import invalidate_profiles
+from head_to_head import apply_head_to_head
 from services import (
-    recalculate_tiers, snapshot_grille, drop_grille_snapshot_if_orphan,
-    _aggregate_season_stats, _determine_winners, _save_awards_to_db,
-    _apply_inter_league_moves,
+    refresh_player_counters, refresh_tournoi_summary, refresh_tournoi_pointers, snapshot_grille, drop_grille_snapshot_if_orphan,
+    undo_journal_operations,
+    trueskill_env, rate_lobby,
 )
 
 logger = logging.getLogger(__name__)
@@ -113,8 +120,12 @@ def fix_db_structure():
                     WHERE t.ligue_id = l.id
                     AND (t.ligue_nom IS NULL OR t.ligue_nom = '');
                 """)
+                refresh_tournoi_pointers(cur)
+                invalidate_profiles(cur)
+                enqueue_job(cur, 'rebuild_head_to_head', {}, dedupe_key='rebuild_head_to_head')
 
             conn.commit()
+            invalidate_cache()
         return jsonify({"status": "success", "message": "Structure Tournois mise à jour et historique synchronisé."})
     except Exception as e:
         logger.error(f"Erreur serveur: {e}")
@@ -151,15 +162,19 @@ def apply_global_reset():
                         "error": f"Impossible : {conflict_count} tournoi(s) existent à cette date ou après. Le reset invaliderait leurs calculs."
                     }), 409
 
-                cur.execute("UPDATE Joueurs SET sigma = sigma + %s", (val,))
+                cur.execute("INSERT INTO global_resets (date, value_applied) VALUES (%s, %s) RETURNING id", (target_date, val))
+                reset_id = cur.fetchone()[0]
 
-                cur.execute("INSERT INTO global_resets (date, value_applied) VALUES (%s, %s)", (target_date, val))
+                op_id = journal_begin(cur, 'global_reset', reset_id, f"Reset global +{val} ({date_str})")
+                journal_snapshot(cur, op_id, None, ('sigma',))
+                cur.execute("UPDATE Joueurs SET sigma = sigma + %s", (val,))
+                invalidate_profiles(cur)
 
+                job_id = enqueue_job(cur, 'recalculate_tiers', {'op_ids': [op_id]}, dedupe_key='recalculate_tiers')
             conn.commit()
-            recalculate_tiers()
             invalidate_cache()
 
-        return jsonify({"status": "success", "message": f"Sigma augmenté de {val} pour tous les joueurs (Date: {date_str})."})
+        return jsonify({"status": "success", "message": f"Sigma augmenté de {val} pour tous les joueurs (Date: {date_str}).", "job_id": job_id})
     except Exception as e:
         logger.error(f"Erreur serveur: {e}")
         return jsonify({"error": "Erreur interne du serveur"}), 500
@@ -186,13 +201,25 @@ def revert_global_reset():
                         "error": f"Annulation impossible : {conflict_count} tournoi(s) ont été enregistrés depuis ce reset ({reset_date}). Annuler maintenant fausserait l'historique."
                     }), 409
 
-                cur.execute("UPDATE Joueurs SET sigma = sigma - %s", (val,))
-                cur.execute("DELETE FROM global_resets WHERE id = %s", (reset_id,))
+                op_id = journal_find(cur, 'global_reset', reset_id)
+                if op_id is not None:
+                    if op_id != journal_latest_id(cur):
+                        return jsonify({
+                            "error": "Annulation impossible : des opérations plus récentes existent. Utilisez l'historique d'annulation."
+                        }), 409
+                    undo_journal_operations(cur, journal_last_operations(cur, 1))
+                else:
+                    # Reset anterieur au journal : on retombe sur l'ancienne
+                    # methode, qui ne sait pas restaurer l'etat exact.
+                    cur.execute("UPDATE Joueurs SET sigma = sigma - %s", (val,))
+                    cur.execute("DELETE FROM global_resets WHERE id = %s", (reset_id,))
+                    invalidate_profiles(cur)
+                    journal_clear(cur)
+                job_id = enqueue_job(cur, 'recalculate_tiers', {}, dedupe_key='recalculate_tiers')
             conn.commit()
-            recalculate_tiers()
             invalidate_cache()
 
-        return jsonify({"status": "success", "message": "Dernier reset annulé."})
+        return jsonify({"status": "success", "message": "Dernier reset annulé.", "job_id": job_id})
     except Exception as e:
         logger.error(f"Erreur serveur: {e}")
         return jsonify({"error": "Erreur interne du serveur"}), 500
@@ -241,6 +268,7 @@ def update_config():
 
         with get_db_connection() as conn:
             with conn.cursor() as cur:
+                players_changed = False
                 configs = [
                     ('tau', str(tau)),
                     ('ghost_enabled', ghost),
@@ -257,7 +285,8 @@ def update_config():
                     configs.append(('league_mode_enabled', league_mode))
 
                     if league_mode == 'false':
-                        cur.execute("UPDATE Joueurs SET ligue_id = NULL")
+                        cur.execute("UPDATE Joueurs SET ligue_id = NULL WHERE ligue_id IS NOT NULL")
+                        players_changed = cur.rowcount > 0
 
                 if 'inter_league_moves' in data:
                     inter_league_moves = int(data.get('inter_league_moves', 0))
@@ -273,13 +302,18 @@ def update_config():
                 cur.execute("""
                     UPDATE Joueurs
                     SET is_ranked = (COALESCE(consecutive_missed, 0) < %s)
-                """, (unranked_threshold,))
+                    WHERE is_ranked IS DISTINCT FROM (COALESCE(consecutive_missed, 0) < %s)
+                """, (unranked_threshold, unranked_threshold))
+                players_changed = players_changed or cur.rowcount > 0
+
+                if players_changed:
+                    journal_clear(cur)
+                job_id = enqueue_job(cur, 'recalculate_tiers', {}, dedupe_key='recalculate_tiers')
 
             conn.commit()
-            recalculate_tiers()
             invalidate_cache()
 
-        return jsonify({"status": "success"})
+        return jsonify({"status": "success", "job_id": job_id})
     except Exception as e:
         logger.error(f"Erreur requête: {e}")
         return jsonify({"error": "Requête invalide"}), 400
@@ -329,10 +363,12 @@ def api_update_joueur(id):
         with get_db_connection() as conn:
             with conn.cursor() as cur:
                 cur.execute("UPDATE Joueurs SET nom=%s, mu=%s, sigma=%s, is_ranked=%s, consecutive_missed=%s, color=%s WHERE id=%s", (nom, mu, sigma, is_ranked, consecutive_missed, color, id))
+                invalidate_profiles(cur, [id])
+                journal_clear(cur)
+                job_id = enqueue_job(cur, 'recalculate_tiers', {}, dedupe_key='recalculate_tiers')
             conn.commit()
-            recalculate_tiers()
             invalidate_cache()
-        return jsonify({"status": "success"})
+        return jsonify({"status": "success", "job_id": job_id})
     except Exception as e:
         logger.error(f"Erreur requête: {e}")
         return jsonify({"error": "Requête invalide"}), 400
@@ -344,11 +380,22 @@ def api_delete_joueur(id):
     try:
         with get_db_connection() as conn:
             with conn.cursor() as cur:
+                cur.execute("SELECT tournoi_id FROM Participations WHERE joueur_id = %s", (id,))
+                tournoi_ids = [r[0] for r in cur.fetchall()]
+                # Les tournois du joueur perdent un participant : leur effectif
+                # change dans le profil de tous les autres participants.
+                cur.execute(
+                    "SELECT DISTINCT joueur_id FROM Participations WHERE tournoi_id = ANY(%s) AND joueur_id <> %s",
+                    (tournoi_ids, id)
+                )
+                co_participants = [r[0] for r in cur.fetchall()]
                 cur.execute("DELETE FROM Joueurs WHERE id=%s", (id,))
+                refresh_tournoi_summary(cur, tournoi_ids)
+                invalidate_profiles(cur, co_participants)
+                job_id = enqueue_job(cur, 'recalculate_tiers', {}, dedupe_key='recalculate_tiers')
             conn.commit()
-            recalculate_tiers()
             invalidate_cache()
-        return jsonify({"status": "success"})
+        return jsonify({"status": "success", "job_id": job_id})
     except Exception:
         return jsonify({"error": "Erreur serveur"}), 400
 
@@ -377,12 +424,12 @@ def api_add_joueur():
                        VALUES (%s, %s, %s, 'U', true, 0, %s)""",
                     (nom, mu, sigma, color)
                 )
+                job_id = enqueue_job(cur, 'recalculate_tiers', {}, dedupe_key='recalculate_tiers')
             conn.commit()
 
-            recalculate_tiers()
             invalidate_cache()
 
-        return jsonify({"status": "success", "message": "Joueur ajouté"}), 201
+        return jsonify({"status": "success", "message": "Joueur ajouté", "job_id": job_id}), 201
     except ValueError:
         return jsonify({"error": "Valeurs numériques invalides pour Mu ou Sigma"}), 400
     except Exception as e:
@@ -547,7 +594,10 @@ def delete_saison(saison_id):
 
                         cur.execute("UPDATE joueurs SET ligue_id = %s WHERE id = %s", (from_ligue_id, joueur_id))
 
-                cur.execute("DELETE FROM awards_obtenus WHERE saison_id = %s", (saison_id,))
+                    journal_clear(cur)
+
+                cur.execute("DELETE FROM awards_obtenus WHERE saison_id = %s RETURNING joueur_id", (saison_id,))
+                invalidate_profiles(cur, [r[0] for r in cur.fetchall()])
                 cur.execute("DELETE FROM saisons WHERE id = %s", (saison_id,))
             conn.commit()
             invalidate_cache()
@@ -625,196 +675,21 @@ def save_season_awards(id):
     data = request.get_json() or {}
     move_criterion = data.get('move_criterion')
 
-    with get_db_connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT date_debut, date_fin, config_awards, victory_condition, is_yearly, ligue_id, is_league_recap,
-                       include_league_stats, include_league_moves, ip_version
-                FROM saisons WHERE id = %s
-            """, (id,))
-            row = cur.fetchone()
-            if not row: return jsonify({'error': 'Saison introuvable'}), 404
-
-            d_debut, d_fin, config, vic_cond, is_yearly, saison_ligue_id, is_league_recap, include_league_stats, include_league_moves, ip_version = row
-            active_awards = config.get('active_awards', [])
-            movements = []
-
-            if is_league_recap:
-                cur.execute("""
-                    SELECT DISTINCT l.id, l.nom, l.niveau, l.couleur
-                    FROM Ligues l
-                    JOIN Tournois t ON t.ligue_id = l.id
-                    WHERE t.date >= %s AND t.date <= %s
-                    ORDER BY l.niveau ASC
-                """, (d_debut, d_fin))
-                ligues_rows = cur.fetchall()
-                ligues = [(r[0], r[1], r[3]) for r in ligues_rows]
-
-                if not ligues:
-                    return jsonify({'error': 'Aucun tournoi de ligue pendant cette période'}), 400
-
-                all_rankings = {}
-
-                cur.execute("DELETE FROM awards_obtenus WHERE saison_id = %s", (id,))
-                conn.commit()
-
-                for ligue_id, ligue_nom, ligue_couleur in ligues:
-                    ligue_stats = _aggregate_season_stats(d_debut, d_fin, 'league', ligue_id, ip_version)
-
-                    gm_list = ligue_stats['candidates'].get('grand_master', [])
-                    gm_sorted = sorted(gm_list, key=lambda x: x.get('final_score', 0), reverse=True)
-                    all_rankings[ligue_id] = {p['id']: rank for rank, p in enumerate(gm_sorted, 1)}
-
-                    top_3, winners_map = _determine_winners(
-                        ligue_stats['candidates'], vic_cond, active_awards, ligue_stats['total_tournois']
-                    )
-                    ligue_info = {'id': ligue_id, 'nom': ligue_nom, 'couleur': ligue_couleur}
-                    _save_awards_to_db(conn, id, top_3, winners_map, is_yearly, ligue_info=ligue_info)
-
-                if move_criterion:
-                    cur.execute("SELECT value FROM Configuration WHERE key = 'league_mode_enabled'")
-                    league_row = cur.fetchone()
-                    league_enabled = (league_row[0] == 'true') if league_row else False
-
-                    cur.execute("SELECT value FROM Configuration WHERE key = 'inter_league_moves'")
-                    moves_row = cur.fetchone()
-                    moves_count = int(moves_row[0]) if moves_row else 0
-
-                    if league_enabled and moves_count > 0:
-                        if move_criterion == "ip":
-                            movements = _apply_inter_league_moves(conn, moves_count, {}, rankings_by_ligue=all_rankings)
-                        else:
-                            cur.execute("SELECT id, score_trueskill FROM Joueurs WHERE ligue_id IS NOT NULL ORDER BY score_trueskill DESC")
-                            ranking_data = {r[0]: rank for rank, r in enumerate(cur.fetchall(), 1)}
-                            movements = _apply_inter_league_moves(conn, moves_count, ranking_data)
-
-                        for m in movements:
-                            cur.execute("SELECT id FROM Ligues WHERE nom = %s", (m['from'],))
-                            from_row = cur.fetchone()
-                            from_ligue_id = from_row[0] if from_row else None
-
-                            cur.execute("SELECT id FROM Ligues WHERE nom = %s", (m['to'],))
-                            to_row = cur.fetchone()
-                            to_ligue_id = to_row[0] if to_row else None
-
-                            cur.execute("""
-                                INSERT INTO league_movements (saison_id, joueur_id, from_ligue_id, to_ligue_id,
-                                    from_ligue_nom, to_ligue_nom, direction)
-                                VALUES (%s, %s, %s, %s, %s, %s, %s)
-                            """, (id, m['joueur_id'], from_ligue_id, to_ligue_id, m['from'], m['to'], m['direction']))
-
-                cur.execute("UPDATE saisons SET is_active = true WHERE id = %s", (id,))
-
-            elif saison_ligue_id:
-                cur.execute("""
-                    SELECT COUNT(*) FROM Tournois
-                    WHERE date >= %s AND date <= %s AND ligue_id = %s
-                """, (d_debut, d_fin, saison_ligue_id))
-                count = cur.fetchone()[0]
-                if count == 0:
-                    return jsonify({'error': 'Aucun tournoi pour cette ligue pendant cette période'}), 400
-                global_stats = _aggregate_season_stats(d_debut, d_fin, 'league', saison_ligue_id, ip_version)
-
-                top_3, winners_map = _determine_winners(
-                    global_stats['candidates'], vic_cond, active_awards, global_stats['total_tournois']
-                )
-                _save_awards_to_db(conn, id, top_3, winners_map, is_yearly)
-
-                if move_criterion:
-                    cur.execute("SELECT value FROM Configuration WHERE key = 'league_mode_enabled'")
-                    league_row = cur.fetchone()
-                    league_enabled = (league_row[0] == 'true') if league_row else False
-
-                    cur.execute("SELECT value FROM Configuration WHERE key = 'inter_league_moves'")
-                    moves_row = cur.fetchone()
-                    moves_count = int(moves_row[0]) if moves_row else 0
-
-                    if league_enabled and moves_count > 0:
-                        if move_criterion == "ip":
-                            gm_list = global_stats['candidates'].get('grand_master', [])
-                            gm_sorted = sorted(gm_list, key=lambda x: x.get('final_score', 0), reverse=True)
-                            ranking_data = {p['id']: rank for rank, p in enumerate(gm_sorted, 1)}
-                        else:
-                            cur.execute("SELECT id, score_trueskill FROM Joueurs WHERE ligue_id IS NOT NULL ORDER BY score_trueskill DESC")
-                            ranking_data = {r[0]: rank for rank, r in enumerate(cur.fetchall(), 1)}
-                        movements = _apply_inter_league_moves(conn, moves_count, ranking_data)
-            else:
-                cur.execute("""
-                    SELECT COUNT(*) FROM Tournois
-                    WHERE date >= %s AND date <= %s AND ligue_id IS NULL
-                """, (d_debut, d_fin))
-                count = cur.fetchone()[0]
-                if count == 0:
-                    return jsonify({'error': 'Aucun tournoi en mode classique pendant cette période'}), 400
-                global_stats = _aggregate_season_stats(d_debut, d_fin, 'classic', None, ip_version)
-
-                top_3, winners_map = _determine_winners(
-                    global_stats['candidates'], vic_cond, active_awards, global_stats['total_tournois']
-                )
-                _save_awards_to_db(conn, id, top_3, winners_map, is_yearly)
+    try:
+        with get_db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1 FROM saisons WHERE id = %s", (id,))
+                if not cur.fetchone():
+                    return jsonify({'error': 'Saison introuvable'}), 404
 
-                if include_league_stats or include_league_moves:
-                    cur.execute("""
-                        SELECT DISTINCT l.id, l.nom, l.niveau, l.couleur
-                        FROM Ligues l
-                        JOIN Tournois t ON t.ligue_id = l.id
-                        WHERE t.date >= %s AND t.date <= %s
-                        ORDER BY l.niveau ASC
-                    """, (d_debut, d_fin))
-                    ligues_rows = cur.fetchall()
-                    ligues = [(r[0], r[1], r[3]) for r in ligues_rows]
-
-                    if ligues:
-                        all_rankings = {}
-                        for ligue_id, ligue_nom, ligue_couleur in ligues:
-                            ligue_stats = _aggregate_season_stats(d_debut, d_fin, 'league', ligue_id, ip_version)
-                            gm_list = ligue_stats['candidates'].get('grand_master', [])
-                            gm_sorted = sorted(gm_list, key=lambda x: x.get('final_score', 0), reverse=True)
-                            all_rankings[ligue_id] = {p['id']: rank for rank, p in enumerate(gm_sorted, 1)}
-
-                        if include_league_moves and move_criterion:
-                            cur.execute("SELECT value FROM Configuration WHERE key = 'league_mode_enabled'")
-                            league_row = cur.fetchone()
-                            league_enabled = (league_row[0] == 'true') if league_row else False
-
-                            cur.execute("SELECT value FROM Configuration WHERE key = 'inter_league_moves'")
-                            moves_row = cur.fetchone()
-                            moves_count = int(moves_row[0]) if moves_row else 0
-
-                            if league_enabled and moves_count > 0:
-                                if move_criterion == "ip":
-                                    movements = _apply_inter_league_moves(conn, moves_count, {}, rankings_by_ligue=all_rankings)
-                                else:
-                                    cur.execute("SELECT id, score_trueskill FROM Joueurs WHERE ligue_id IS NOT NULL ORDER BY score_trueskill DESC")
-                                    ranking_data = {r[0]: rank for rank, r in enumerate(cur.fetchall(), 1)}
-                                    movements = _apply_inter_league_moves(conn, moves_count, ranking_data)
-
-                                for m in movements:
-                                    cur.execute("SELECT id FROM Ligues WHERE nom = %s", (m['from'],))
-                                    from_row = cur.fetchone()
-                                    from_ligue_id = from_row[0] if from_row else None
-
-                                    cur.execute("SELECT id FROM Ligues WHERE nom = %s", (m['to'],))
-                                    to_row = cur.fetchone()
-                                    to_ligue_id = to_row[0] if to_row else None
-
-                                    cur.execute("""
-                                        INSERT INTO league_movements (saison_id, joueur_id, from_ligue_id, to_ligue_id,
-                                            from_ligue_nom, to_ligue_nom, direction)
-                                        VALUES (%s, %s, %s, %s, %s, %s, %s)
-                                    """, (id, m['joueur_id'], from_ligue_id, to_ligue_id, m['from'], m['to'], m['direction']))
-
-                cur.execute("UPDATE saisons SET is_active = true WHERE id = %s", (id,))
-
-        conn.commit()
-        invalidate_cache()
-
-    response = {'status': 'success', 'message': 'Saison publiée et awards distribués !'}
-    if movements:
-        response['movements'] = movements
-        response['message'] += f' {len(movements)} mouvements inter-ligue effectués.'
-
-    return jsonify(response)
+                # Les agregations de saison peuvent prendre plusieurs secondes :
+                # la publication est confiee au worker (voir services.publish_season).
+                job_id = enqueue_job(cur, 'publish_season', {'saison_id': id, 'move_criterion': move_criterion}, dedupe_key=f"publish_season:{id}")
+            conn.commit()
+        return jsonify({'status': 'queued', 'job_id': job_id, 'message': 'Publication de la saison en cours...'}), 202
+    except Exception as e:
+        logger.error(f"Erreur serveur: {e}")
+        return jsonify({"error": "Erreur interne du serveur"}), 500
 
 
 
@@ -875,10 +750,10 @@ def add_tournament():
                     RETURNING id
                 """, (date_tournoi_str, ligue_id, ligue_nom_archive, ligue_couleur_archive))
                 tournoi_id = cur.fetchone()[0]
+                op_id = journal_begin(cur, 'tournament', tournoi_id, f"Tournoi du {date_tournoi_str}")
 
-                joueurs_ratings = {}
-                joueurs_ids_map = {}
-                joueurs_exclude_ts = {}
+                lobby = []
+                present_pids = []
 
                 for joueur in joueurs_data:
                     nom, score = joueur['nom'], joueur['score']
@@ -890,57 +765,22 @@ def add_tournament():
                     else:
                         cur.execute("INSERT INTO Joueurs (nom, mu, sigma, tier, is_ranked) VALUES (%s, %s, %s, 'U', true) RETURNING id", (nom, DEFAULT_MU, DEFAULT_SIGMA))
                         jid, mu, sigma = cur.fetchone()[0], DEFAULT_MU, DEFAULT_SIGMA
-                    joueurs_ratings[nom] = trueskill.Rating(mu=float(mu), sigma=float(sigma))
-                    joueurs_ids_map[nom] = jid
-                    joueurs_exclude_ts[nom] = exclude_ts
+                    lobby.append({'id': jid, 'score': score, 'mu': float(mu), 'sigma': float(sigma), 'exclude_from_ts': exclude_ts})
+                    present_pids.append(jid)
                     cur.execute("INSERT INTO Participations (tournoi_id, joueur_id, score, old_mu, old_sigma, exclude_from_ts) VALUES (%s, %s, %s, %s, %s, %s)", (tournoi_id, jid, score, float(mu), float(sigma), exclude_ts))
 
-                sorted_joueurs = sorted(joueurs_data, key=lambda x: x['score'], reverse=True)
-
-                ts_joueurs = [j for j in sorted_joueurs if not joueurs_exclude_ts.get(j['nom'], False)]
-                ts_ranks = []
-                last_s, rank = -1, 1
-                for i, j in enumerate(ts_joueurs):
-                    if j['score'] < last_s: rank = i + 1
-                    ts_ranks.append(rank)
-                    last_s = j['score']
-
                 cur.execute("SELECT value FROM Configuration WHERE key = 'tau'")
                 tau_val = float(cur.fetchone()[0])
-                ts_env = trueskill.TrueSkill(mu=DEFAULT_MU, sigma=DEFAULT_SIGMA, beta=TRUESKILL_BETA, tau=tau_val, draw_probability=TRUESKILL_DRAW_PROBABILITY)
-
-                new_ratings_map = {}
-                if ts_joueurs:
-                    new_ratings = ts_env.rate([[joueurs_ratings[j['nom']]] for j in ts_joueurs], ranks=ts_ranks)
-                    for i, j in enumerate(ts_joueurs):
-                        new_ratings_map[j['nom']] = new_ratings[i][0]
-
-                present_pids = []
-                all_ranks = []
-                last_s, rank = -1, 1
-                for i, j in enumerate(sorted_joueurs):
-                    if j['score'] < last_s: rank = i + 1
-                    all_ranks.append(rank)
-                    last_s = j['score']
+                results = rate_lobby(trueskill_env(tau_val), lobby)
 
                 joueur_updates = []
                 participation_updates = []
-
-                for i, j in enumerate(sorted_joueurs):
-                    nom = j['nom']
-                    jid = joueurs_ids_map[nom]
-                    present_pids.append(jid)
-
-                    if joueurs_exclude_ts.get(nom, False):
-                        old_rating = joueurs_ratings[nom]
-                        joueur_updates.append((jid, old_rating.mu, old_rating.sigma, 0, True))
-                        participation_updates.append((tournoi_id, jid, old_rating.mu, old_rating.sigma, old_rating.mu - 3 * old_rating.sigma, all_ranks[i]))
-                    else:
-                        nr = new_ratings_map[nom]
-                        joueur_updates.append((jid, nr.mu, nr.sigma, 0, True))
-                        participation_updates.append((tournoi_id, jid, nr.mu, nr.sigma, nr.mu - 3 * nr.sigma, all_ranks[i]))
+                for jid, (new_mu, new_sigma, position) in results.items():
+                    joueur_updates.append((jid, new_mu, new_sigma, 0, True))
+                    participation_updates.append((tournoi_id, jid, new_mu, new_sigma, new_mu - 3 * new_sigma, position))
 
                 if joueur_updates:
+                    journal_snapshot(cur, op_id, present_pids, ('mu', 'sigma', 'consecutive_missed', 'is_ranked'))
                     psycopg2.extras.execute_values(cur, """
                         UPDATE Joueurs AS j SET mu = data.mu, sigma = data.sigma, consecutive_missed = data.missed, is_ranked = data.ranked
                         FROM (VALUES %s) AS data(id, mu, sigma, missed, ranked)
@@ -953,6 +793,9 @@ def add_tournament():
                         FROM (VALUES %s) AS data(tid, jid, mu, sigma, ts, pos)
                         WHERE p.tournoi_id = data.tid AND p.joueur_id = data.jid
                     """, participation_updates)
+                refresh_tournoi_summary(cur, [tournoi_id])
+                refresh_tournoi_pointers(cur)
+                apply_head_to_head(cur, [tournoi_id])
 
                 cur.execute("SELECT key, value FROM Configuration WHERE key IN ('ghost_enabled', 'ghost_penalty', 'ghost_threshold_days', 'ghost_interval_days', 'unranked_threshold')")
                 conf = dict(cur.fetchall())
@@ -1052,17 +895,21 @@ def add_tournament():
                         VALUES %s
                     """, ghost_inserts)
                 if absent_updates:
+                    journal_snapshot(cur, op_id, absent_ids, ('sigma', 'consecutive_missed', 'is_ranked'))
                     psycopg2.extras.execute_values(cur, """
                         UPDATE Joueurs AS j SET sigma = data.sigma, consecutive_missed = data.missed, is_ranked = data.ranked
                         FROM (VALUES %s) AS data(id, sigma, missed, ranked)
                         WHERE j.id = data.id
                     """, absent_updates)
 
+                refresh_player_counters(cur, present_pids)
+                invalidate_profiles(cur, present_pids + [g[0] for g in ghost_inserts])
+                job_id = enqueue_job(cur, 'recalculate_tiers', {'op_ids': [op_id]}, dedupe_key='recalculate_tiers')
+
             conn.commit()
-            recalculate_tiers()
             invalidate_cache()
 
-            return jsonify({"status": "success", "tournoi_id": tournoi_id}), 201
+            return jsonify({"status": "success", "tournoi_id": tournoi_id, "job_id": job_id}), 201
     except Exception as e:
         logger.error(f"Erreur serveur: {e}")
         return jsonify({"error": "Erreur interne du serveur"}), 500
@@ -1079,6 +926,21 @@ def revert_last_tournament():
                 if not last: return jsonify({"message": "Aucun tournoi à annuler."}), 404
                 tid, tdate = last[0], last[1]
 
+                op_id = journal_find(cur, 'tournament', tid)
+                if op_id is not None:
+                    if op_id != journal_latest_id(cur):
+                        return jsonify({
+                            "status": "error",
+                            "message": "Des opérations plus récentes existent. Utilisez l'historique d'annulation."
+                        }), 409
+                    undo_journal_operations(cur, journal_last_operations(cur, 1))
+                    job_id = enqueue_job(cur, 'recalculate_tiers', {}, dedupe_key='recalculate_tiers')
+                    conn.commit()
+                    invalidate_cache()
+                    return jsonify({"status": "success", "message": "Annulé.", "job_id": job_id}), 200
+
+                # Tournoi anterieur au journal : restauration depuis old_mu /
+                # old_sigma des participations.
                 cur.execute("SELECT joueur_id, old_mu, old_sigma FROM Participations WHERE tournoi_id = %s", (tid,))
                 participants = cur.fetchall()
                 for jid, mu, sig in participants:
@@ -1101,14 +963,19 @@ def revert_last_tournament():
                     """, [(jid, sig) for jid, sig in ghost_rows])
 
                 cur.execute("UPDATE Joueurs SET consecutive_missed = GREATEST(0, consecutive_missed - 1)")
+                invalidate_profiles(cur, [jid for jid, _, _ in participants] + [jid for jid, _ in ghost_rows])
+                apply_head_to_head(cur, [tid], -1)
                 cur.execute("DELETE FROM ghost_log WHERE tournoi_id = %s", (tid,))
                 cur.execute("DELETE FROM Participations WHERE tournoi_id = %s", (tid,))
                 cur.execute("DELETE FROM Tournois WHERE id = %s", (tid,))
+                refresh_player_counters(cur, [jid for jid, _, _ in participants])
+                refresh_tournoi_pointers(cur)
                 drop_grille_snapshot_if_orphan(cur, tdate)
+                journal_clear(cur)
+                job_id = enqueue_job(cur, 'recalculate_tiers', {}, dedupe_key='recalculate_tiers')
             conn.commit()
-            recalculate_tiers()
             invalidate_cache()
-            return jsonify({"status": "success", "message": "Annulé."}), 200
+            return jsonify({"status": "success", "message": "Annulé.", "job_id": job_id}), 200
     except Exception as e:
         logger.error(f"Erreur serveur: {e}")
         return jsonify({"error": "Erreur interne du serveur"}), 500
@@ -1130,15 +997,42 @@ def delete_tournament(id):
 
                 cur.execute("SELECT joueur_id, old_sigma FROM ghost_log WHERE tournoi_id = %s", (id,))
                 ghost_rows = cur.fetchall()
-                if ghost_rows:
+
+                cur.execute("SELECT joueur_id, old_mu, old_sigma FROM Participations WHERE tournoi_id = %s", (id,))
+                part_rows = cur.fetchall()
+                parts = [r[0] for r in part_rows]
+
+                # Etat qu'auraient eu les joueurs sans ce tournoi : l'etat
+                # d'avant pour les participants, le sigma d'avant la penalite
+                # pour les fantomes (leur mu n'a pas bouge : c'est l'old_mu de
+                # leur participation suivante, ou leur mu actuel).
+                can_replay = tdate is not None and all(mu is not None and sig is not None for _, mu, sig in part_rows)
+                dirty = {}
+                if can_replay:
+                    dirty = {jid: (mu, sig) for jid, mu, sig in part_rows}
+                    ghost_ids = [jid for jid, _ in ghost_rows]
+                    if ghost_ids:
+                        cur.execute("""
+                            SELECT DISTINCT ON (p.joueur_id) p.joueur_id, p.old_mu
+                            FROM Participations p
+                            WHERE p.joueur_id = ANY(%s) AND p.tournoi_id > %s AND p.old_mu IS NOT NULL
+                            ORDER BY p.joueur_id, p.tournoi_id ASC
+                        """, (ghost_ids, id))
+                        mu_at = dict(cur.fetchall())
+                        cur.execute("SELECT id, mu FROM Joueurs WHERE id = ANY(%s)", (ghost_ids,))
+                        for jid, mu in cur.fetchall():
+                            mu_at.setdefault(jid, mu)
+                        for jid, old_sig in ghost_rows:
+                            if jid in mu_at:
+                                dirty[jid] = (mu_at[jid], old_sig)
+                elif ghost_rows:
+                    # Tournoi anterieur au stockage de old_mu : pas de rejeu
+                    # possible, on se contente de rendre le sigma des fantomes.
                     psycopg2.extras.execute_values(cur, """
                         UPDATE Joueurs AS j SET sigma = data.sigma
                         FROM (VALUES %s) AS data(id, sigma)
                         WHERE j.id = data.id
                     """, [(pid, old_sig) for pid, old_sig in ghost_rows])
-
-                cur.execute("SELECT joueur_id FROM Participations WHERE tournoi_id = %s", (id,))
-                parts = [r[0] for r in cur.fetchall()]
                 q_abs = f"SELECT id, consecutive_missed, is_ranked FROM Joueurs WHERE id NOT IN ({','.join(['%s']*len(parts))})" if parts else "SELECT id, consecutive_missed, is_ranked FROM Joueurs"
                 cur.execute(q_abs, tuple(parts))
 
@@ -1155,13 +1049,147 @@ def delete_tournament(id):
                         WHERE j.id = data.id
                     """, batch_updates)
 
+                apply_head_to_head(cur, [id], -1)
                 cur.execute("DELETE FROM Tournois WHERE id = %s", (id,))
+                refresh_tournoi_pointers(cur)
                 if tdate is not None:
                     drop_grille_snapshot_if_orphan(cur, tdate)
+
+                replay = None
+                touched = parts + [jid for jid, _ in ghost_rows]
+                if can_replay and dirty:
+                    replay = replay_from(cur, id + 1, dirty, floor_date=tdate)
+                    touched += replay.pop("joueurs_touches")
+                refresh_player_counters(cur, touched)
+                invalidate_profiles(cur, touched)
+                journal_clear(cur)
+                job_id = enqueue_job(cur, 'recalculate_tiers', {}, dedupe_key='recalculate_tiers')
+            conn.commit()
+            invalidate_cache()
+        response = {"status": "success", "job_id": job_id}
+        if replay:
+            response["replay"] = replay
+        return jsonify(response)
+    except Exception as e:
+        logger.error(f"Erreur serveur: {e}")
+        return jsonify({"error": "Erreur interne du serveur"}), 500
+
+
+
+@admin_bp.route('/admin/tournoi/<int:id>/resultats', methods=['PUT'])
+@admin_required
+def update_tournament_results(id):
+    data = request.get_json() or {}
+    joueurs_data = data.get('joueurs')
+    if not joueurs_data:
+        return jsonify({"error": "Données incomplètes"}), 400
+
+    try:
+        corrections = {
+            j['nom']: (int(j['score']), bool(j.get('exclude_from_ts', False)))
+            for j in joueurs_data
+        }
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"error": "Scores invalides"}), 400
+
+    try:
+        with get_db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1 FROM Tournois WHERE id = %s", (id,))
+                if not cur.fetchone():
+                    return jsonify({"error": "Tournoi introuvable"}), 404
+
+                cur.execute("""
+                    SELECT j.nom, p.joueur_id, p.old_mu
+                    FROM Participations p
+                    JOIN Joueurs j ON j.id = p.joueur_id
+                    WHERE p.tournoi_id = %s
+                """, (id,))
+                participants = cur.fetchall()
+
+                if {nom for nom, _, _ in participants} != set(corrections):
+                    return jsonify({"error": "La correction doit porter sur les mêmes joueurs que le tournoi."}), 400
+                if any(old_mu is None for _, _, old_mu in participants):
+                    return jsonify({"status": "error", "message": "Trop ancien"}), 400
+
+                psycopg2.extras.execute_values(cur, """
+                    UPDATE Participations AS p SET score = data.score, exclude_from_ts = data.exclude
+                    FROM (VALUES %s) AS data(tid, jid, score, exclude)
+                    WHERE p.tournoi_id = data.tid AND p.joueur_id = data.jid
+                """, [
+                    (id, jid, corrections[nom][0], corrections[nom][1]) for nom, jid, _ in participants
+                ])
+
+                replay = replay_from(cur, id, {}, force_ids={id})
+                touched = replay.pop("joueurs_touches")
+                refresh_player_counters(cur, touched)
+                invalidate_profiles(cur, touched)
+                journal_clear(cur)
+                job_id = enqueue_job(cur, 'recalculate_tiers', {}, dedupe_key='recalculate_tiers')
+            conn.commit()
+            invalidate_cache()
+        return jsonify({"status": "success", "replay": replay, "job_id": job_id})
+    except Exception as e:
+        logger.error(f"Erreur serveur: {e}")
+        return jsonify({"error": "Erreur interne du serveur"}), 500
+
+@admin_bp.route('/admin/jobs/<int:job_id>', methods=['GET'])
+@admin_required
+def get_job_status(job_id):
+    try:
+        with get_db_connection() as conn:
+            with conn.cursor() as cur:
+                job = get_job(cur, job_id)
+        if not job:
+            return jsonify({"error": "Tâche introuvable"}), 404
+        return jsonify(job)
+    except Exception as e:
+        logger.error(f"Erreur serveur: {e}")
+        return jsonify({"error": "Erreur interne du serveur"}), 500
+
+
+@admin_bp.route('/api/admin/journal', methods=['GET'])
+@admin_required
+def get_journal():
+    limit = request.args.get('limit', 20, type=int)
+    limit = max(1, min(limit, 200))
+    try:
+        with get_db_connection() as conn:
+            with conn.cursor() as cur:
+                operations = journal_last_operations(cur, limit)
+        return jsonify(operations)
+    except Exception as e:
+        logger.error(f"Erreur serveur: {e}")
+        return jsonify({"error": "Erreur interne du serveur"}), 500
+
+
+@admin_bp.route('/api/admin/journal/undo', methods=['POST'])
+@admin_required
+def undo_journal():
+    data = request.get_json() or {}
+    try:
+        count = int(data.get('count', 1))
+    except (TypeError, ValueError):
+        return jsonify({"error": "Nombre d'opérations invalide"}), 400
+    if count < 1:
+        return jsonify({"error": "Nombre d'opérations invalide"}), 400
+
+    try:
+        with get_db_connection() as conn:
+            with conn.cursor() as cur:
+                operations = journal_last_operations(cur, count)
+                if not operations:
+                    return jsonify({"error": "Aucune opération à annuler"}), 404
+                undone = undo_journal_operations(cur, operations)
+                job_id = enqueue_job(cur, 'recalculate_tiers', {}, dedupe_key='recalculate_tiers')
             conn.commit()
-            recalculate_tiers()
             invalidate_cache()
-        return jsonify({"status": "success"})
+        return jsonify({
+            "status": "success",
+            "message": f"{len(undone)} opération(s) annulée(s).",
+            "operations": undone,
+            "job_id": job_id
+        })
     except Exception as e:
         logger.error(f"Erreur serveur: {e}")
         return jsonify({"error": "Erreur interne du serveur"}), 500
@@ -1228,7 +1256,11 @@ def setup_ligues():
                 else:
                     cur.execute("UPDATE Joueurs SET ligue_id = NULL")
 
+                invalidate_profiles(cur)
+                journal_clear(cur)
+
             conn.commit()
+            invalidate_cache()
             return jsonify({"status": "success", "message": "Configuration des ligues sauvegardée"})
 
     except Exception as e:
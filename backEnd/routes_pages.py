@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import logging
+
+from flask import Blueprint, jsonify, request
+
+from db import get_db_connection
+from cache import get_cached, set_cached
+from services import current_distribution
+from routes_public import (
+    check_data_version, add_data_version, _evolution_format,
+    _dernier_tournoi_payload, _classement_cache_key, _classement_payload, _classement_saison_payload,
+    _ligues_payload,
+    _recap_parts, _new_leagues_payload,
+)
+
+logger = logging.getLogger(__name__)
+
+# Modeles de page : une route par page du frontend, qui renvoie en un appel
+# tout ce dont son template a besoin. Les morceaux sont ceux des routes
+# generiques (memes calculs, memes cles de cache), mais les intermediaires
+# communs ne sont calcules qu'une fois : distribution TrueSkill du classement
+# et des seuils de tier, contexte de saison du resume et des awards.
+# Memes ETag / 304 que les routes publiques.
+pages_bp = Blueprint('pages', __name__, url_prefix='/page')
+pages_bp.before_request(check_data_version)
+pages_bp.after_request(add_data_version)
+
+
+@pages_bp.route('/index')
+def page_index():
+    try:
+        return jsonify({"resultats": _dernier_tournoi_payload()})
+    except Exception as e:
+        logger.error(f"Erreur page index: {e}")
+        return jsonify({"error": "Erreur serveur"}), 500
+
+
+# Joueurs classes d'abord, puis par TrueSkill decroissant.
+def _classement_sort_key(joueur: dict) -> tuple[bool, float]:
+    is_ranked = joueur.get('tier', '').strip() not in ('U', '?', 'Unranked')
+    try:
+        score = float(joueur.get('score_trueskill', 0))
+    except (ValueError, TypeError):
+        score = 0.0
+    return is_ranked, score
+
+
+# Classement (?tier=, ?ligue=), ligues, seuils de tier et, avec ?vue=saison,
+# classement IP de la saison en cours (?ligue_id=, ?format=).
+@pages_bp.route('/classement')
+def page_classement():
+    tier_filtre = request.args.get('tier')
+    ligue_filtre = request.args.get('ligue')
+    evo_format = _evolution_format()
+    if evo_format is None:
+        return jsonify({"error": "Format invalide"}), 400
+
+    try:
+        cache_key = _classement_cache_key(tier_filtre, ligue_filtre)
+        classement = get_cached(cache_key)
+        with get_db_connection() as conn:
+            with conn.cursor() as cur:
+                dist = current_distribution(cur)
+                if classement is None:
+                    classement = _classement_payload(cur, dist, tier_filtre, ligue_filtre)
+                    set_cached(cache_key, classement)
+                ligues = _ligues_payload(cur)
+
+        saison = None
+        if request.args.get('vue') == 'saison':
+            saison = _classement_saison_payload(request.args.get('ligue_id', type=int), evo_format)
+
+        return jsonify({
+            "joueurs": sorted(classement["joueurs"], key=_classement_sort_key, reverse=True),
+            "distribution_data": classement["distribution_data"],
+            "ligues": ligues,
+            "seuils": dist["thresholds"],
+            "saison": saison,
+        })
+    except Exception as e:
+        logger.error(f"Erreur page classement: {e}")
+        return jsonify({"error": "Erreur serveur"}), 500
+
+
+# Haut du recap d'une saison (resume et awards, ?ligue_id=) et, avec
+# ?view=new-leagues, la vue des nouvelles ligues si la saison en a. Les
+# graphiques restent charges a la demande par la page.
+@pages_bp.route('/recap/<slug>')
+def page_recap(slug):
+    evo_format = _evolution_format()
+    if evo_format is None:
+        return jsonify({"error": "Format invalide"}), 400
+
+    try:
+        saison = _recap_parts(slug, request.args.get('ligue_id', type=int), evo_format, ('summary', 'awards'))
+        if saison is None:
+            return jsonify({"error": "Saison introuvable"}), 404
+
+        new_leagues = None
+        if request.args.get('view') == 'new-leagues' and saison.get('include_league_moves'):
+            new_leagues, _ = _new_leagues_payload(slug)
+
+        return jsonify({"saison": saison, "new_leagues": new_leagues})
+    except Exception as e:
+        logger.error(f"Erreur page recap: {e}")
+        return jsonify({"error": "Erreur serveur"}), 500
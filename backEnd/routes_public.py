@@ -2,17 +2,24 @@ from __future__ import annotations
 
 import math
 import logging
+from datetime import date, datetime
 from typing import Any
 
-from flask import Blueprint, jsonify, request, abort, render_template
+from flask import Blueprint, jsonify, request, abort, render_template, g, current_app
 
-from constants import DEFAULT_MU, DEFAULT_SIGMA, DEFAULT_SIGMA_THRESHOLD, DEFAULT_PAGE_SIZE, IP_VERSION_DEFAULT
+from constants import (
+    DEFAULT_MU, DEFAULT_SIGMA, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, IP_VERSION_DEFAULT, EVOLUTION_FORMATS,
+    SEARCH_DEFAULT_LIMIT, SEARCH_MAX_LIMIT, TS_SERIES_DEFAULT_POINTS, TS_SERIES_MAX_POINTS,
+)
 from db import get_db_connection
-from cache import get_cached, set_cached
+from cache import get_cached, set_cached, current_data_version
+from profiles import get_profile, trueskill_series
+from player_search import search_players
+from head_to_head import player_head_to_head, league_head_to_head
 from services import (
     _aggregate_season_stats, _determine_winners,
-    trueskill_score, has_tier, compute_distribution_stats,
-    tier_thresholds, normal_top_percent, build_distribution,
+    trueskill_score, has_tier, current_distribution, distribution_ref_stats,
+    normal_top_percent, build_distribution,
     compute_ip_evolution, compute_position_evolution, compute_position_breakdown,
 )
 
@@ -20,6 +27,36 @@ logger = logging.getLogger(__name__)
 
 public_bp = Blueprint('public', __name__)
 
+# Endpoints dont la reponse ne depend pas que des donnees : jamais d'ETag.
+_UNVERSIONED_ENDPOINTS = {'public.health'}
+
+
+# GET conditionnel : toutes les reponses publiques ne dependent que des donnees
+# et de l'URL, leur ETag est donc la version globale des donnees (cf
+# cache.current_data_version). Si le client a deja cette version, on repond
+# 304 avant d'executer la vue.
+@public_bp.before_request
+def check_data_version():
+    if request.method != 'GET' or request.endpoint in _UNVERSIONED_ENDPOINTS:
+        return None
+    try:
+        g.data_version = current_data_version()
+    except Exception as e:
+        logger.error(f"Erreur lecture data_version: {e}")
+        return None
+    if request.if_none_match.contains_weak(str(g.data_version)):
+        return current_app.response_class(status=304)
+    return None
+
+
+@public_bp.after_request
+def add_data_version(response):
+    version = g.get('data_version')
+    if version is not None and response.status_code in (200, 304):
+        response.set_etag(str(version), weak=True)
+        response.headers['X-Data-Version'] = str(version)
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 @public_bp.route('/saisons', methods=['GET'])
 def get_public_saisons():
@@ -67,334 +104,450 @@ def recap_list():
     return render_template('recap_list.html', saisons=saisons)
 
 
-@public_bp.route('/stats/recap/<slug>')
-def get_recap(slug):
-    ligue_id_param = request.args.get('ligue_id', type=int)
+# Format des courbes d'evolution (cf compute_ip_evolution) : "rows" par
+# defaut, "columns" sur demande. None si la valeur est inconnue.
+def _evolution_format() -> str | None:
+    fmt = request.args.get('format', EVOLUTION_FORMATS[0])
+    return fmt if fmt in EVOLUTION_FORMATS else None
+
+
+# Contexte commun aux sous-ressources du recap : la saison et la ligue
+# affichee (recap de ligue, saison d'une ligue ou vue hybride via ligue_id).
+# None si la saison n'existe pas.
+def _load_recap_context(cur, slug: str, ligue_id_param: int | None) -> dict | None:
+    cur.execute("""
+        SELECT id, nom, date_debut, date_fin, slug,
+               config_awards, victory_condition, is_yearly, is_league_recap, ligue_id,
+               include_league_stats, include_league_moves, ip_version
+        FROM saisons
+        WHERE slug = %s
+    """, (slug,))
+    saison_row = cur.fetchone()
+    if not saison_row:
+        return None
 
-    with get_db_connection() as conn:
-        with conn.cursor() as cur:
-            cur.execute("""
-                SELECT id, nom, date_debut, date_fin, slug,
-                       config_awards, victory_condition, is_yearly, is_league_recap, ligue_id,
-                       include_league_stats, include_league_moves, ip_version
-                FROM saisons
-                WHERE slug = %s
-            """, (slug,))
-            saison_row = cur.fetchone()
-            if not saison_row:
-                return jsonify({"error": "Saison introuvable"}), 404
+    saison_id, nom, d_debut, d_fin, slug_bdd, config, vic_cond, is_yearly, is_league_recap, saison_ligue_id, include_league_stats, include_league_moves, ip_version = saison_row
 
-            saison_id, nom, d_debut, d_fin, slug_bdd, config, vic_cond, is_yearly, is_league_recap, saison_ligue_id, include_league_stats, include_league_moves, ip_version = saison_row
-            ip_version = ip_version or IP_VERSION_DEFAULT
+    ligues_disponibles = []
+    if is_league_recap or include_league_stats or include_league_moves:
+        cur.execute("""
+            SELECT DISTINCT l.id, l.nom, l.couleur, l.niveau
+            FROM Ligues l
+            JOIN Tournois t ON t.ligue_id = l.id
+            WHERE t.date >= %s AND t.date <= %s
+            ORDER BY l.niveau ASC
+        """, (d_debut, d_fin))
+        ligues_disponibles = [
+            {"id": r[0], "nom": r[1], "couleur": r[2], "niveau": r[3]}
+            for r in cur.fetchall()
+        ]
 
-            ligues_disponibles = []
-            ligue_courante = None
-            is_hybrid_league_view = False
+    ligue_courante = None
+    is_hybrid_league_view = False
+    evo_mode = 'classic'
+    evo_ligue_id = None
+
+    if is_league_recap:
+        if ligue_id_param:
+            ligue_courante = next((l for l in ligues_disponibles if l["id"] == ligue_id_param), None)
+        if not ligue_courante and ligues_disponibles:
+            ligue_courante = ligues_disponibles[0]
+        evo_mode = 'league'
+        if ligue_courante:
+            evo_ligue_id = ligue_courante["id"]
+    elif saison_ligue_id:
+        evo_mode, evo_ligue_id = 'league', saison_ligue_id
+    elif (include_league_stats or include_league_moves) and ligue_id_param:
+        ligue_courante = next((l for l in ligues_disponibles if l["id"] == ligue_id_param), None)
+        if ligue_courante:
+            evo_mode, evo_ligue_id = 'league', ligue_courante["id"]
+            is_hybrid_league_view = True
 
-            evo_mode = 'classic'
-            evo_ligue_id = None
+    return {
+        "slug": slug,
+        "ligue_id_param": ligue_id_param,
+        "saison_id": saison_id,
+        "nom": nom,
+        "date_debut": d_debut,
+        "date_fin": d_fin,
+        "config": config,
+        "victory_condition": vic_cond,
+        "is_yearly": is_yearly,
+        "is_league_recap": bool(is_league_recap),
+        "saison_ligue_id": saison_ligue_id,
+        "include_league_stats": bool(include_league_stats),
+        "include_league_moves": bool(include_league_moves),
+        "ip_version": ip_version or IP_VERSION_DEFAULT,
+        "ligues_disponibles": ligues_disponibles,
+        "ligue_courante": ligue_courante,
+        "is_hybrid_league_view": is_hybrid_league_view,
+        "evo_mode": evo_mode,
+        "evo_ligue_id": evo_ligue_id,
+    }
 
-            if is_league_recap:
-                cur.execute("""
-                    SELECT DISTINCT l.id, l.nom, l.couleur, l.niveau
-                    FROM Ligues l
-                    JOIN Tournois t ON t.ligue_id = l.id
-                    WHERE t.date >= %s AND t.date <= %s
-                    ORDER BY l.niveau ASC
-                """, (d_debut, d_fin))
-                ligues_rows = cur.fetchall()
-                ligues_disponibles = [
-                    {"id": r[0], "nom": r[1], "couleur": r[2], "niveau": r[3]}
-                    for r in ligues_rows
-                ]
 
-                if ligue_id_param:
-                    ligue_courante = next((l for l in ligues_disponibles if l["id"] == ligue_id_param), None)
-                if not ligue_courante and ligues_disponibles:
-                    ligue_courante = ligues_disponibles[0]
+# Statistiques agregees de la saison, partagees par le resume, les awards
+# calcules et la distribution : mises en cache a part pour n'etre calculees
+# qu'une fois quelle que soit la sous-ressource demandee en premier.
+def _recap_season_stats(ctx: dict) -> dict:
+    cache_key = f"recap:{ctx['slug']}:{ctx['ligue_id_param']}:stats"
+    stats = get_cached(cache_key)
+    if stats is None:
+        stats = _aggregate_season_stats(
+            ctx["date_debut"], ctx["date_fin"], ctx["evo_mode"], ctx["evo_ligue_id"], ctx["ip_version"]
+        )
+        set_cached(cache_key, stats)
+    return stats
+
+
+def _recap_summary(cur, ctx: dict, evo_format: str) -> dict:
+    global_stats = _recap_season_stats(ctx)
+    data = {
+        "nom_saison": ctx["nom"],
+        "classement_points": global_stats["classement_points"],
+        "classement_moyenne": global_stats["classement_moyenne"],
+        "total_tournois": global_stats["total_tournois"],
+        "victory_condition": ctx["victory_condition"],
+        "is_league_recap": ctx["is_league_recap"],
+        "include_league_stats": ctx["include_league_stats"],
+        "include_league_moves": ctx["include_league_moves"],
+    }
 
-                evo_mode = 'league'
-                if ligue_courante:
-                    evo_ligue_id = ligue_courante["id"]
-                    global_stats = _aggregate_season_stats(d_debut, d_fin, 'league', ligue_courante["id"], ip_version)
-                else:
-                    global_stats = _aggregate_season_stats(d_debut, d_fin, 'league', None, ip_version)
-            elif saison_ligue_id:
-                evo_mode, evo_ligue_id = 'league', saison_ligue_id
-                global_stats = _aggregate_season_stats(d_debut, d_fin, 'league', saison_ligue_id, ip_version)
-            elif (include_league_stats or include_league_moves) and ligue_id_param:
-                cur.execute("""
-                    SELECT DISTINCT l.id, l.nom, l.couleur, l.niveau
-                    FROM Ligues l
-                    JOIN Tournois t ON t.ligue_id = l.id
-                    WHERE t.date >= %s AND t.date <= %s
-                    ORDER BY l.niveau ASC
-                """, (d_debut, d_fin))
-                ligues_rows = cur.fetchall()
-                ligues_disponibles = [
-                    {"id": r[0], "nom": r[1], "couleur": r[2], "niveau": r[3]}
-                    for r in ligues_rows
-                ]
-                ligue_courante = next((l for l in ligues_disponibles if l["id"] == ligue_id_param), None)
-                if ligue_courante:
-                    evo_mode, evo_ligue_id = 'league', ligue_courante["id"]
-                    global_stats = _aggregate_season_stats(d_debut, d_fin, 'league', ligue_courante["id"], ip_version)
-                    is_hybrid_league_view = True
-                else:
-                    global_stats = _aggregate_season_stats(d_debut, d_fin, 'classic', None, ip_version)
-            else:
-                global_stats = _aggregate_season_stats(d_debut, d_fin, 'classic', None, ip_version)
-
-            cur.execute("SELECT code, nom, emoji, description, id FROM types_awards")
-            types_ref = {
-                r[0]: {"nom": r[1], "emoji": r[2], "desc": r[3], "id": r[4]}
-                for r in cur.fetchall()
+    if ctx["is_league_recap"] or ctx["is_hybrid_league_view"]:
+        data["ligues_disponibles"] = ctx["ligues_disponibles"]
+        data["ligue_courante"] = ctx["ligue_courante"]
+    elif (ctx["include_league_stats"] or ctx["include_league_moves"]) and not ctx["ligue_id_param"]:
+        data["ligues_disponibles"] = ctx["ligues_disponibles"]
+
+    return data
+
+
+def _recap_awards(cur, ctx: dict, evo_format: str) -> dict:
+    awards_data = {}
+    if ctx["is_hybrid_league_view"]:
+        return {"awards": awards_data}
+
+    is_league_recap = ctx["is_league_recap"]
+    ligue_courante = ctx["ligue_courante"]
+
+    award_ligue_filter = ""
+    award_params = [ctx["saison_id"]]
+    if is_league_recap and ligue_courante:
+        award_ligue_filter = " AND a.ligue_id = %s"
+        award_params.append(ligue_courante["id"])
+    elif is_league_recap:
+        award_ligue_filter = " AND a.ligue_id IS NOT NULL"
+
+    cur.execute(f"""
+        SELECT t.code, t.nom, t.emoji, t.description, j.nom, a.valeur,
+               a.is_league_award, a.ligue_id, a.ligue_nom, a.ligue_couleur,
+               l.couleur AS current_ligue_couleur, l.nom AS current_ligue_nom
+        FROM awards_obtenus a
+        JOIN types_awards t ON a.award_id = t.id
+        JOIN joueurs j ON a.joueur_id = j.id
+        LEFT JOIN ligues l ON a.ligue_id = l.id
+        WHERE a.saison_id = %s{award_ligue_filter}
+    """, award_params)
+    saved_rows = cur.fetchall()
+
+    if saved_rows:
+        for row in saved_rows:
+            code, award_name, emoji, desc, player_name, valeur = row[:6]
+            is_league_award, a_ligue_id, a_ligue_nom, a_ligue_couleur, cur_ligue_couleur, cur_ligue_nom = row[6:]
+
+            award_entry = {
+                "nom": player_name,
+                "val": valeur,
+                "emoji": emoji,
+                "award_name": award_name,
+                "description": desc
             }
 
-            awards_data = {}
-
-            if not is_hybrid_league_view:
-                award_ligue_filter = ""
-                award_params = [saison_id]
-                if is_league_recap and ligue_courante:
-                    award_ligue_filter = " AND a.ligue_id = %s"
-                    award_params.append(ligue_courante["id"])
-                elif is_league_recap:
-                    award_ligue_filter = " AND a.ligue_id IS NOT NULL"
-
-                cur.execute(f"""
-                    SELECT t.code, t.nom, t.emoji, t.description, j.nom, a.valeur,
-                           a.is_league_award, a.ligue_id, a.ligue_nom, a.ligue_couleur,
-                           l.couleur AS current_ligue_couleur, l.nom AS current_ligue_nom
-                    FROM awards_obtenus a
-                    JOIN types_awards t ON a.award_id = t.id
-                    JOIN joueurs j ON a.joueur_id = j.id
-                    LEFT JOIN ligues l ON a.ligue_id = l.id
-                    WHERE a.saison_id = %s{award_ligue_filter}
-                """, award_params)
-                saved_rows = cur.fetchall()
-
-                if saved_rows:
-                    for row in saved_rows:
-                        code, award_name, emoji, desc, player_name, valeur = row[:6]
-                        is_league_award, a_ligue_id, a_ligue_nom, a_ligue_couleur, cur_ligue_couleur, cur_ligue_nom = row[6:]
-
-                        award_entry = {
-                            "nom": player_name,
-                            "val": valeur,
-                            "emoji": emoji,
-                            "award_name": award_name,
-                            "description": desc
-                        }
-
-                        if is_league_award:
-                            ligue_supprimee = a_ligue_id is None
-                            award_entry["is_league_award"] = True
-                            award_entry["ligue_nom"] = cur_ligue_nom if not ligue_supprimee else a_ligue_nom
-                            award_entry["ligue_couleur"] = cur_ligue_couleur if not ligue_supprimee else a_ligue_couleur
-                            award_entry["ligue_supprimee"] = ligue_supprimee
-
-                        awards_data.setdefault(code, []).append(award_entry)
-                else:
-                    active_list = config.get('active_awards', [])
-                    top_3, winners_map = _determine_winners(
-                        global_stats['candidates'],
-                        vic_cond,
-                        active_list,
-                        global_stats['total_tournois']
-                    )
-
-                    moai_codes = (
-                        ['super_gold_moai', 'super_silver_moai', 'super_bronze_moai']
-                        if is_yearly else
-                        ['gold_moai', 'silver_moai', 'bronze_moai']
-                    )
-
-                    for i in range(min(3, len(top_3))):
-                        p = top_3[i]
-                        code = moai_codes[i]
-                        if code in types_ref:
-                            ref = types_ref[code]
-                            awards_data.setdefault(code, []).append({
-                                "nom": p.get("nom", "?"),
-                                "val": f"{p.get('final_score', 0):.3f}",
-                                "emoji": ref["emoji"],
-                                "award_name": ref["nom"],
-                                "description": ref["desc"]
-                            })
-
-                    for code, winners in winners_map.items():
-                        if code in types_ref:
-                            ref = types_ref[code]
-                            for w in winners:
-                                val_fmt = (
-                                    str(int(w["val"]))
-                                    if code in ['ez', 'pas_loin', 'stakhanov']
-                                    else str(round(w["val"], 3))
-                                )
-                                awards_data.setdefault(code, []).append({
-                                    "nom": w["nom"],
-                                    "val": val_fmt,
-                                    "emoji": ref["emoji"],
-                                    "award_name": ref["nom"],
-                                    "description": ref["desc"]
-                                })
-
-            if (is_league_recap and ligue_courante) or is_hybrid_league_view:
-                cur.execute("""
-                    SELECT id, date
-                    FROM Tournois
-                    WHERE date >= %s AND date <= %s AND ligue_id = %s
-                    ORDER BY date ASC
-                """, (d_debut, d_fin, ligue_courante["id"]))
-            elif saison_ligue_id:
-                cur.execute("""
-                    SELECT id, date
-                    FROM Tournois
-                    WHERE date >= %s AND date <= %s AND ligue_id = %s
-                    ORDER BY date ASC
-                """, (d_debut, d_fin, saison_ligue_id))
-            else:
-                cur.execute("""
-                    SELECT id, date
-                    FROM Tournois
-                    WHERE date >= %s AND date <= %s AND ligue_id IS NULL
-                    ORDER BY date ASC
-                """, (d_debut, d_fin))
-            tournois = cur.fetchall()
+            if is_league_award:
+                ligue_supprimee = a_ligue_id is None
+                award_entry["is_league_award"] = True
+                award_entry["ligue_nom"] = cur_ligue_nom if not ligue_supprimee else a_ligue_nom
+                award_entry["ligue_couleur"] = cur_ligue_couleur if not ligue_supprimee else a_ligue_couleur
+                award_entry["ligue_supprimee"] = ligue_supprimee
 
-            labels = [t[1].strftime("%d/%m") for t in tournois]
-            tournoi_ids = [t[0] for t in tournois]
+            awards_data.setdefault(code, []).append(award_entry)
+        return {"awards": awards_data}
 
-            cur.execute("SELECT id, nom, color FROM Joueurs")
-            player_colors = {
-                r[0]: {"nom": r[1], "color": r[2] or "#FFFFFF"}
-                for r in cur.fetchall()
-            }
+    cur.execute("SELECT code, nom, emoji, description, id FROM types_awards")
+    types_ref = {
+        r[0]: {"nom": r[1], "emoji": r[2], "desc": r[3], "id": r[4]}
+        for r in cur.fetchall()
+    }
 
-            datasets = []
+    global_stats = _recap_season_stats(ctx)
+    active_list = ctx["config"].get('active_awards', [])
+    top_3, winners_map = _determine_winners(
+        global_stats['candidates'],
+        ctx["victory_condition"],
+        active_list,
+        global_stats['total_tournois']
+    )
+
+    moai_codes = (
+        ['super_gold_moai', 'super_silver_moai', 'super_bronze_moai']
+        if ctx["is_yearly"] else
+        ['gold_moai', 'silver_moai', 'bronze_moai']
+    )
+
+    for i in range(min(3, len(top_3))):
+        p = top_3[i]
+        code = moai_codes[i]
+        if code in types_ref:
+            ref = types_ref[code]
+            awards_data.setdefault(code, []).append({
+                "nom": p.get("nom", "?"),
+                "val": f"{p.get('final_score', 0):.3f}",
+                "emoji": ref["emoji"],
+                "award_name": ref["nom"],
+                "description": ref["desc"]
+            })
 
-            if tournoi_ids:
-                cur.execute("""
-                    SELECT joueur_id, tournoi_id, new_score_trueskill, old_mu, old_sigma
-                    FROM Participations
-                    WHERE tournoi_id = ANY(%s)
-                """, (tournoi_ids,))
-                all_parts = cur.fetchall()
-
-                tid_index = {tid: idx for idx, tid in enumerate(tournoi_ids)}
-
-                players_data = {}
-                for jid, tid, new_score, old_mu, old_sigma in all_parts:
-                    if jid not in players_data:
-                        players_data[jid] = {'parts_map': {}, 'first_idx': 9999, 'initial_score': None}
-                    pd = players_data[jid]
-                    pd['parts_map'][tid] = float(new_score)
-                    idx = tid_index.get(tid)
-                    if idx is not None and idx < pd['first_idx'] and old_mu is not None and old_sigma is not None:
-                        pd['first_idx'] = idx
-                        pd['initial_score'] = float(old_mu) - 3 * float(old_sigma)
-
-                tournoi_dates = {t[0]: t[1] for t in tournois}
-
-                for jid, pd in players_data.items():
-                    p_info = player_colors.get(jid)
-                    if not p_info:
-                        continue
-
-                    data = []
-                    points = []
-                    current = pd['initial_score']
-
-                    for tid in tournoi_ids:
-                        if tid in pd['parts_map']:
-                            current = round(pd['parts_map'][tid], 2)
-                            data.append(current)
-                            points.append({
-                                "date": tournoi_dates[tid].strftime("%d/%m/%Y"),
-                                "trueskill": current,
-                            })
-                        else:
-                            data.append(round(current, 2) if current is not None else None)
-                            points.append(None)
-
-                    datasets.append({
-                        "label": p_info["nom"],
-                        "data": data,
-                        "points": points,
-                        "borderColor": p_info["color"],
-                        "backgroundColor": p_info["color"],
-                        "borderWidth": 2,
-                        "fill": False,
-                        "tension": 0.3,
-                        "pointRadius": 0,
-                        "spanGaps": True
+    for code, winners in winners_map.items():
+        if code in types_ref:
+            ref = types_ref[code]
+            for w in winners:
+                val_fmt = (
+                    str(int(w["val"]))
+                    if code in ['ez', 'pas_loin', 'stakhanov']
+                    else str(round(w["val"], 3))
+                )
+                awards_data.setdefault(code, []).append({
+                    "nom": w["nom"],
+                    "val": val_fmt,
+                    "emoji": ref["emoji"],
+                    "award_name": ref["nom"],
+                    "description": ref["desc"]
+                })
+
+    return {"awards": awards_data}
+
+
+# Courbes TrueSkill de la saison et distribution des scores de fin de saison.
+def _recap_trueskill_charts(cur, ctx: dict, evo_format: str) -> dict:
+    d_debut, d_fin = ctx["date_debut"], ctx["date_fin"]
+    ligue_courante = ctx["ligue_courante"]
+
+    if (ctx["is_league_recap"] and ligue_courante) or ctx["is_hybrid_league_view"]:
+        cur.execute("""
+            SELECT id, date
+            FROM Tournois
+            WHERE date >= %s AND date <= %s AND ligue_id = %s
+            ORDER BY date ASC
+        """, (d_debut, d_fin, ligue_courante["id"]))
+    elif ctx["saison_ligue_id"]:
+        cur.execute("""
+            SELECT id, date
+            FROM Tournois
+            WHERE date >= %s AND date <= %s AND ligue_id = %s
+            ORDER BY date ASC
+        """, (d_debut, d_fin, ctx["saison_ligue_id"]))
+    else:
+        cur.execute("""
+            SELECT id, date
+            FROM Tournois
+            WHERE date >= %s AND date <= %s AND ligue_id IS NULL
+            ORDER BY date ASC
+        """, (d_debut, d_fin))
+    tournois = cur.fetchall()
+
+    labels = [t[1].strftime("%d/%m") for t in tournois]
+    tournoi_ids = [t[0] for t in tournois]
+
+    cur.execute("SELECT id, nom, color FROM Joueurs")
+    player_colors = {
+        r[0]: {"nom": r[1], "color": r[2] or "#FFFFFF"}
+        for r in cur.fetchall()
+    }
+
+    datasets = []
+
+    if tournoi_ids:
+        cur.execute("""
+            SELECT joueur_id, tournoi_id, new_score_trueskill, old_mu, old_sigma
+            FROM Participations
+            WHERE tournoi_id = ANY(%s)
+        """, (tournoi_ids,))
+        all_parts = cur.fetchall()
+
+        tid_index = {tid: idx for idx, tid in enumerate(tournoi_ids)}
+
+        players_data = {}
+        for jid, tid, new_score, old_mu, old_sigma in all_parts:
+            if jid not in players_data:
+                players_data[jid] = {'parts_map': {}, 'first_idx': 9999, 'initial_score': None}
+            pd = players_data[jid]
+            pd['parts_map'][tid] = float(new_score)
+            idx = tid_index.get(tid)
+            if idx is not None and idx < pd['first_idx'] and old_mu is not None and old_sigma is not None:
+                pd['first_idx'] = idx
+                pd['initial_score'] = float(old_mu) - 3 * float(old_sigma)
+
+        tournoi_dates = {t[0]: t[1] for t in tournois}
+
+        for jid, pd in players_data.items():
+            p_info = player_colors.get(jid)
+            if not p_info:
+                continue
+
+            data = []
+            points = []
+            current = pd['initial_score']
+
+            for tid in tournoi_ids:
+                if tid in pd['parts_map']:
+                    current = round(pd['parts_map'][tid], 2)
+                    data.append(current)
+                    points.append({
+                        "date": tournoi_dates[tid].strftime("%d/%m/%Y"),
+                        "trueskill": current,
                     })
+                else:
+                    data.append(round(current, 2) if current is not None else None)
+                    points.append(None)
+
+            datasets.append({
+                "label": p_info["nom"],
+                "data": data,
+                "points": points,
+                "borderColor": p_info["color"],
+                "backgroundColor": p_info["color"],
+                "borderWidth": 2,
+                "fill": False,
+                "tension": 0.3,
+                "pointRadius": 0,
+                "spanGaps": True
+            })
 
-                datasets.sort(
-                    key=lambda d: next((v for v in reversed(d["data"]) if v is not None), 0),
-                    reverse=True
-                )
+        datasets.sort(
+            key=lambda d: next((v for v in reversed(d["data"]) if v is not None), 0),
+            reverse=True
+        )
+
+    global_stats = _recap_season_stats(ctx)
+    colors_by_name = {info["nom"]: info["color"] for info in player_colors.values()}
+    recap_players = [
+        {
+            "nom": p["nom"],
+            "color": colors_by_name.get(p["nom"], "#FFFFFF"),
+            "final_trueskill": p["final_trueskill"],
+        }
+        for p in global_stats["classement_points"]
+        if p["matchs"] > 0
+    ]
 
-            colors_by_name = {info["nom"]: info["color"] for info in player_colors.values()}
-            recap_players = [
-                {
-                    "nom": p["nom"],
-                    "color": colors_by_name.get(p["nom"], "#FFFFFF"),
-                    "final_trueskill": p["final_trueskill"],
-                }
-                for p in global_stats["classement_points"]
-                if p["matchs"] > 0
-            ]
-            dist_data = build_distribution(recap_players, lambda p: p["final_trueskill"])
-
-            ip_evolution = compute_ip_evolution(d_debut, d_fin, evo_mode, evo_ligue_id, ip_version)
-            position_evolution = compute_position_evolution(d_debut, d_fin, evo_mode, evo_ligue_id)
-            position_breakdown = compute_position_breakdown(d_debut, d_fin, evo_mode, evo_ligue_id)
-
-            response_data = {
-                "nom_saison": nom,
-                "classement_points": global_stats["classement_points"],
-                "classement_moyenne": global_stats["classement_moyenne"],
-                "total_tournois": global_stats["total_tournois"],
-                "awards": awards_data,
-                "victory_condition": vic_cond,
-                "chart_data": {
-                    "labels": labels,
-                    "datasets": datasets
-                },
-                "distribution_data": dist_data,
-                "ip_evolution": ip_evolution,
-                "position_evolution": position_evolution,
-                "position_breakdown": position_breakdown,
-                "is_league_recap": is_league_recap if is_league_recap else False,
-                "include_league_stats": include_league_stats if include_league_stats else False,
-                "include_league_moves": include_league_moves if include_league_moves else False
-            }
+    return {
+        "chart_data": {
+            "labels": labels,
+            "datasets": datasets
+        },
+        "distribution_data": build_distribution(recap_players, lambda p: p["final_trueskill"]),
+    }
 
-            if is_league_recap or is_hybrid_league_view:
-                response_data["ligues_disponibles"] = ligues_disponibles
-                response_data["ligue_courante"] = ligue_courante
 
-            if not is_league_recap and (include_league_stats or include_league_moves) and not ligue_id_param:
-                cur.execute("""
-                    SELECT DISTINCT l.id, l.nom, l.couleur, l.niveau
-                    FROM Ligues l
-                    JOIN Tournois t ON t.ligue_id = l.id
-                    WHERE t.date >= %s AND t.date <= %s
-                    ORDER BY l.niveau ASC
-                """, (d_debut, d_fin))
-                ligues_rows = cur.fetchall()
-                response_data["ligues_disponibles"] = [
-                    {"id": r[0], "nom": r[1], "couleur": r[2], "niveau": r[3]}
-                    for r in ligues_rows
-                ]
+def _recap_ip_charts(cur, ctx: dict, evo_format: str) -> dict:
+    return {"ip_evolution": compute_ip_evolution(
+        ctx["date_debut"], ctx["date_fin"], ctx["evo_mode"], ctx["evo_ligue_id"], ctx["ip_version"], evo_format
+    )}
 
-            return jsonify(response_data)
 
+def _recap_position_charts(cur, ctx: dict, evo_format: str) -> dict:
+    return {"position_evolution": compute_position_evolution(
+        ctx["date_debut"], ctx["date_fin"], ctx["evo_mode"], ctx["evo_ligue_id"], evo_format
+    )}
+
+
+def _recap_breakdown(cur, ctx: dict, evo_format: str) -> dict:
+    return {"position_breakdown": compute_position_breakdown(
+        ctx["date_debut"], ctx["date_fin"], ctx["evo_mode"], ctx["evo_ligue_id"]
+    )}
+
+
+# Sous-ressources du recap, dans l'ordre de la page. Chacune est calculee et
+# mise en cache separement : la page n'attend que le resume (et les awards),
+# les graphiques et le tableau des positions sont charges a la demande.
+_RECAP_PARTS = {
+    'summary': _recap_summary,
+    'awards': _recap_awards,
+    'charts/trueskill': _recap_trueskill_charts,
+    'charts/ip': _recap_ip_charts,
+    'charts/positions': _recap_position_charts,
+    'breakdown': _recap_breakdown,
+}
+
+# Seules les courbes d'evolution dependent du parametre format.
+_RECAP_FORMATTED_PARTS = {'charts/ip', 'charts/positions'}
+
+
+# Sous-ressources parts du recap, lues en cache ou calculees. None si la
+# saison n'existe pas.
+def _recap_parts(slug: str, ligue_id_param: int | None, evo_format: str, parts) -> dict | None:
+    response_data = {}
+    missing = []
+    for part in parts:
+        cache_key = f"recap:{slug}:{ligue_id_param}:{part}"
+        if part in _RECAP_FORMATTED_PARTS:
+            cache_key += f":{evo_format}"
+        cached = get_cached(cache_key)
+        if cached is None:
+            missing.append((part, cache_key))
+        else:
+            response_data.update(cached)
+
+    if missing:
+        with get_db_connection() as conn:
+            with conn.cursor() as cur:
+                ctx = _load_recap_context(cur, slug, ligue_id_param)
+                if ctx is None:
+                    return None
+                for part, cache_key in missing:
+                    data = _RECAP_PARTS[part](cur, ctx, evo_format)
+                    set_cached(cache_key, data)
+                    response_data.update(data)
+
+    return response_data
+
+
+def _recap_response(slug: str, parts):
+    evo_format = _evolution_format()
+    if evo_format is None:
+        return jsonify({"error": "Format invalide"}), 400
+    data = _recap_parts(slug, request.args.get('ligue_id', type=int), evo_format, parts)
+    if data is None:
+        return jsonify({"error": "Saison introuvable"}), 404
+    return jsonify(data)
+
+
+# Recap complet (toutes les sous-ressources), garde pour les clients existants.
+@public_bp.route('/stats/recap/<slug>')
+def get_recap(slug):
+    return _recap_response(slug, _RECAP_PARTS)
+
+
+@public_bp.route('/stats/recap/<slug>/summary', defaults={'part': 'summary'})
+@public_bp.route('/stats/recap/<slug>/awards', defaults={'part': 'awards'})
+@public_bp.route('/stats/recap/<slug>/charts/trueskill', defaults={'part': 'charts/trueskill'})
+@public_bp.route('/stats/recap/<slug>/charts/ip', defaults={'part': 'charts/ip'})
+@public_bp.route('/stats/recap/<slug>/charts/positions', defaults={'part': 'charts/positions'})
+@public_bp.route('/stats/recap/<slug>/breakdown', defaults={'part': 'breakdown'})
+def get_recap_part(slug, part):
+    return _recap_response(slug, [part])
+
+
+# Vue des nouvelles ligues apres la saison : (payload, None), ou (None,
+# (message, statut)) si elle n'existe pas.
+def _new_leagues_payload(slug: str) -> tuple[dict | None, tuple[str, int] | None]:
+    # Les mouvements publies ne changent plus : la vue est mise en cache par
+    # saison, jusqu'a la prochaine ecriture (invalidate_cache).
+    cache_key = f"new_leagues:{slug}"
+    cached = get_cached(cache_key)
+    if cached is not None:
+        return cached, None
 
-@public_bp.route('/stats/recap/<slug>/new-leagues')
-def get_new_leagues(slug):
     with get_db_connection() as conn:
         with conn.cursor() as cur:
             cur.execute("""
@@ -403,266 +556,391 @@ def get_new_leagues(slug):
             """, (slug,))
             row = cur.fetchone()
             if not row:
-                return jsonify({"error": "Saison introuvable"}), 404
+                return None, ("Saison introuvable", 404)
 
             saison_id, is_league_recap, is_active, include_league_moves = row
 
             if not include_league_moves:
-                return jsonify({"error": "Mouvements inter-ligue non activés pour cette saison"}), 400
+                return None, ("Mouvements inter-ligue non activés pour cette saison", 400)
 
+            # Effectif de chaque ligue et mouvement de la saison de chaque joueur
+            # en une requete. Si un joueur a plusieurs mouvements, le dernier
+            # enregistre l'emporte.
             cur.execute("""
-                SELECT joueur_id, from_ligue_nom, to_ligue_nom, direction
-                FROM league_movements
-                WHERE saison_id = %s
+                SELECT l.id, l.nom, l.couleur, l.niveau,
+                       j.id, j.nom, m.id, m.from_ligue_nom, m.to_ligue_nom, m.direction
+                FROM Ligues l
+                LEFT JOIN Joueurs j ON j.ligue_id = l.id
+                LEFT JOIN LATERAL (
+                    SELECT id, from_ligue_nom, to_ligue_nom, direction
+                    FROM league_movements
+                    WHERE saison_id = %s AND joueur_id = j.id
+                    ORDER BY id DESC
+                    LIMIT 1
+                ) m ON TRUE
+                ORDER BY l.niveau ASC, l.id, j.score_trueskill DESC
             """, (saison_id,))
-            movements_rows = cur.fetchall()
-
-            movements_by_player = {}
-            for joueur_id, from_nom, to_nom, direction in movements_rows:
-                movements_by_player[joueur_id] = {
-                    "from": from_nom,
-                    "to": to_nom,
-                    "direction": direction
-                }
+            rows = cur.fetchall()
 
-            cur.execute("SELECT id, nom, couleur, niveau FROM Ligues ORDER BY niveau ASC")
-            ligues_rows = cur.fetchall()
+    ligues_data = []
+    mouvements_summary = []
+    ligues_by_id = {}
+
+    for ligue_id, ligue_nom, ligue_couleur, niveau, jid, jnom, mouvement_id, from_nom, to_nom, direction in rows:
+        ligue = ligues_by_id.get(ligue_id)
+        if ligue is None:
+            ligue = {
+                "id": ligue_id,
+                "nom": ligue_nom,
+                "couleur": ligue_couleur,
+                "niveau": niveau,
+                "joueurs": []
+            }
+            ligues_by_id[ligue_id] = ligue
+            ligues_data.append(ligue)
 
-            ligues_data = []
-            mouvements_summary = []
+        if jid is None:
+            continue
 
-            for ligue_id, ligue_nom, ligue_couleur, niveau in ligues_rows:
-                cur.execute("""
-                    SELECT id, nom FROM Joueurs
-                    WHERE ligue_id = %s
-                    ORDER BY score_trueskill DESC
-                """, (ligue_id,))
-                joueurs = cur.fetchall()
-
-                joueurs_list = []
-                for jid, jnom in joueurs:
-                    mouvement_info = movements_by_player.get(jid)
-                    joueurs_list.append({
-                        "id": jid,
-                        "nom": jnom,
-                        "mouvement": mouvement_info["direction"] if mouvement_info else None
-                    })
-
-                    if mouvement_info:
-                        mouvements_summary.append({
-                            "nom": jnom,
-                            "from": mouvement_info["from"],
-                            "to": mouvement_info["to"],
-                            "direction": mouvement_info["direction"]
-                        })
-
-                ligues_data.append({
-                    "id": ligue_id,
-                    "nom": ligue_nom,
-                    "couleur": ligue_couleur,
-                    "niveau": niveau,
-                    "joueurs": joueurs_list
-                })
+        ligue["joueurs"].append({
+            "id": jid,
+            "nom": jnom,
+            "mouvement": direction
+        })
 
-            return jsonify({
-                "ligues": ligues_data,
-                "mouvements_summary": mouvements_summary,
-                "is_published": is_active
+        if mouvement_id is not None:
+            mouvements_summary.append({
+                "nom": jnom,
+                "from": from_nom,
+                "to": to_nom,
+                "direction": direction
             })
 
+    payload = {
+        "ligues": ligues_data,
+        "mouvements_summary": mouvements_summary,
+        "is_published": is_active
+    }
+    set_cached(cache_key, payload)
+    return payload, None
+
 
-@public_bp.route('/dernier-tournoi')
-def dernier_tournoi():
-    try:
-        cached = get_cached("dernier_tournoi")
-        if cached is not None:
-            return jsonify(cached)
+@public_bp.route('/stats/recap/<slug>/new-leagues')
+def get_new_leagues(slug):
+    payload, error = _new_leagues_payload(slug)
+    if error is not None:
+        return jsonify({"error": error[0]}), error[1]
+    return jsonify(payload)
 
-        with get_db_connection() as conn:
-            with conn.cursor() as cur:
-                cur.execute("SELECT ligue_id, ligue_nom, date FROM Tournois ORDER BY date DESC, id DESC LIMIT 1")
-                last_record = cur.fetchone()
-
-                if not last_record:
-                    return jsonify([])
-
-                last_ligue_id, last_ligue_nom, last_date = last_record
-                is_league_latest = (last_ligue_id is not None) or (last_ligue_nom is not None and last_ligue_nom != 'Mixte')
-
-                final_data = []
-
-                if is_league_latest:
-                    cur.execute("""
-                        SELECT DISTINCT ON (t.ligue_nom)
-                            t.id, t.date,
-                            t.ligue_nom,
-                            COALESCE(t.ligue_couleur, l.couleur)
-                        FROM Tournois t
-                        LEFT JOIN Ligues l ON t.ligue_id = l.id
-                        WHERE t.ligue_nom IS NOT NULL AND t.ligue_nom != 'Mixte'
-                        ORDER BY t.ligue_nom, t.date DESC
-                    """)
-                    rows = cur.fetchall()
-
-                    tournois_to_fetch = []
-                    for tid, tdate, lnom, lcoul in rows:
-                        tournois_to_fetch.append({
-                            "id": tid,
-                            "date": tdate.strftime("%d/%m/%Y"),
-                            "date_sort": tdate.strftime("%Y-%m-%d"),
-                            "ligue_nom": lnom,
-                            "ligue_couleur": lcoul if lcoul else "#FFFFFF",
-                            "type": "ligue"
-                        })
-
-                    tournois_to_fetch.sort(key=lambda x: x['date_sort'], reverse=True)
 
-                else:
-                    cur.execute("""
-                        SELECT id, date
-                        FROM Tournois
-                        WHERE ligue_id IS NULL
-                          AND (ligue_nom IS NULL OR ligue_nom = 'Mixte')
-                          AND date_trunc('week', date) = date_trunc('week', %s::date)
-                        ORDER BY date DESC, id DESC
-                    """, (last_date,))
-                    tournois_to_fetch = [{
-                        "id": tid,
-                        "date": tdate.strftime("%d/%m/%Y"),
-                        "date_sort": tdate.strftime("%Y-%m-%d"),
-                        "type": "standard"
-                    } for tid, tdate in cur.fetchall()]
-
-                for t in tournois_to_fetch:
-                    cur.execute("""
-                        SELECT Joueurs.nom, Participations.score
-                        FROM Participations
-                        JOIN Joueurs ON Participations.joueur_id = Joueurs.id
-                        WHERE Participations.tournoi_id = %s
-                        ORDER BY Participations.score DESC
-                    """, (t['id'],))
-
-                    resultats = [{"nom": nom, "score": score} for nom, score in cur.fetchall()]
-
-                    final_data.append({
-                        "meta": t,
-                        "resultats": resultats
+# Resultats du ou des derniers tournois, pour la page d'accueil.
+def _dernier_tournoi_payload() -> list:
+    cached = get_cached("dernier_tournoi")
+    if cached is not None:
+        return cached
+
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            # Le dernier tournoi decide du mode : ligue (dernier tournoi de
+            # chaque ligue, via tournoi_pointers) ou standard (tournois hors
+            # ligue de la meme semaine). Une seule requete pour les deux.
+            cur.execute("""
+                WITH dernier AS (
+                    SELECT date,
+                           (ligue_id IS NOT NULL OR (ligue_nom IS NOT NULL AND ligue_nom != 'Mixte')) AS is_ligue,
+                           date_trunc('week', date)::date AS semaine
+                    FROM Tournois
+                    ORDER BY date DESC, id DESC
+                    LIMIT 1
+                )
+                SELECT t.id, t.date, t.ligue_nom, COALESCE(t.ligue_couleur, l.couleur), TRUE
+                FROM dernier d
+                JOIN tournoi_pointers tp ON d.is_ligue
+                JOIN Tournois t ON t.id = tp.tournoi_id
+                LEFT JOIN Ligues l ON t.ligue_id = l.id
+                UNION ALL
+                SELECT t.id, t.date, NULL, NULL, FALSE
+                FROM dernier d
+                JOIN Tournois t ON NOT d.is_ligue
+                    AND t.date >= d.semaine AND t.date < d.semaine + 7
+                WHERE t.ligue_id IS NULL
+                  AND (t.ligue_nom IS NULL OR t.ligue_nom = 'Mixte')
+                ORDER BY 2 DESC, 3, 1 DESC
+            """)
+            selected = cur.fetchall()
+
+            if not selected:
+                return []
+
+            tournois_to_fetch = []
+            for tid, tdate, lnom, lcoul, is_ligue in selected:
+                meta = {
+                    "id": tid,
+                    "date": tdate.strftime("%d/%m/%Y"),
+                    "date_sort": tdate.strftime("%Y-%m-%d"),
+                }
+                if is_ligue:
+                    meta.update({
+                        "ligue_nom": lnom,
+                        "ligue_couleur": lcoul if lcoul else "#FFFFFF",
+                        "type": "ligue"
                     })
+                else:
+                    meta["type"] = "standard"
+                tournois_to_fetch.append(meta)
 
-        set_cached("dernier_tournoi", final_data)
-        return jsonify(final_data)
+            cur.execute("""
+                SELECT p.tournoi_id, j.nom, p.score
+                FROM Participations p
+                JOIN Joueurs j ON p.joueur_id = j.id
+                WHERE p.tournoi_id = ANY(%s)
+                ORDER BY p.tournoi_id, p.score DESC
+            """, ([t['id'] for t in tournois_to_fetch],))
+            resultats = {t['id']: [] for t in tournois_to_fetch}
+            for tid, nom, score in cur.fetchall():
+                resultats[tid].append({"nom": nom, "score": score})
+
+            final_data = [{"meta": t, "resultats": resultats[t['id']]} for t in tournois_to_fetch]
+
+    set_cached("dernier_tournoi", final_data)
+    return final_data
+
+
+@public_bp.route('/dernier-tournoi')
+def dernier_tournoi():
+    try:
+        return jsonify(_dernier_tournoi_payload())
     except Exception as e:
         logger.error(f"Erreur dernier_tournoi: {e}")
         return jsonify({"error": "Erreur serveur"}), 500
 
 
+# Curseur de pagination du classement : "<score_trueskill>:<id>" du dernier
+# joueur de la page precedente (ordre score decroissant, puis id croissant).
+# Les joueurs sans score (mu ou sigma NULL) ferment la marche, classes par id :
+# leur curseur est "null:<id>".
+def _classement_cursor(score: float | None, joueur_id: int) -> str:
+    if score is None:
+        return f"null:{joueur_id}"
+    return f"{float(score)!r}:{joueur_id}"
+
+
+def _parse_classement_cursor(cursor: str) -> tuple[float | None, int]:
+    score, joueur_id = cursor.rsplit(':', 1)
+    return (None if score == 'null' else float(score)), int(joueur_id)
+
+
+# Courbe de distribution du classement general : joueurs ayant un tier,
+# places sur la courbe persistee de dist (cf current_distribution).
+def _classement_distribution(dist: dict, population: list[dict]) -> dict:
+    threshold = dist["sigma_threshold"]
+    tiered = [j for j in population if has_tier(j["is_ranked"], j["sigma"], threshold)]
+    return build_distribution(
+        tiered, lambda j: trueskill_score(j["mu"], j["sigma"]),
+        stats=distribution_ref_stats(dist), curve=dist["curve"]
+    )
+
+
+# Lignes du classement filtrees par conditions, dans l'ordre order.
+def _classement_rows(cur, conditions: list[str], params: list[Any], order: str,
+                     count: int | None = None, offset: int = 0) -> list[tuple]:
+    query = """
+        SELECT j.id, j.nom, j.mu, j.sigma, j.score_trueskill, j.tier,
+               j.nb_tournois, j.nb_victoires, j.color, j.is_ranked
+        FROM Joueurs j
+    """
+    query_params = list(params)
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY " + order
+    if count is not None:
+        query += " LIMIT %s"
+        query_params.append(count)
+    if offset:
+        query += " OFFSET %s"
+        query_params.append(offset)
+    cur.execute(query, query_params)
+    return cur.fetchall()
+
+
+# Classement des joueurs (cf /classement), d'apres la distribution dist deja
+# lue. Pagine si page ou after_key est fourni : une page ne lit alors que ses
+# limit + 1 lignes, sans courbe de distribution (servie a part par
+# /classement/distribution) ; le total n'est compte que si with_total.
+def _classement_payload(cur, dist: dict, tier_filtre: str | None, ligue_filtre: str | None,
+                        page: int | None = None, after_key: tuple[float | None, int] | None = None,
+                        limit: int = DEFAULT_PAGE_SIZE, with_total: bool = False) -> dict:
+    paginated = page is not None or after_key is not None
+
+    params: list[Any] = []
+    conditions = []
+
+    if tier_filtre and tier_filtre.upper() in ['S', 'A', 'B', 'C']:
+        conditions.append("j.tier = %s")
+        params.append(tier_filtre.upper())
+
+    if ligue_filtre:
+        try:
+            ligue_id_int = int(ligue_filtre)
+            conditions.append("j.ligue_id = %s")
+            params.append(ligue_id_int)
+        except ValueError:
+            pass
+
+    where = (" WHERE " + " AND ".join(conditions)) if conditions else ""
+
+    # Apres un curseur, chaque requete part de sa position dans
+    # idx_joueurs_classement (score <= x, puis score IS NULL et id > y) au
+    # lieu de relire l'index depuis le haut. Les joueurs sans score, en fin de
+    # classement, completent la page par une seconde requete.
+    if after_key is None:
+        offset = (max(page, 1) - 1) * limit if page is not None else 0
+        rows = _classement_rows(cur, conditions, params, "j.score_trueskill DESC NULLS LAST, j.id ASC",
+                                limit + 1 if paginated else None, offset)
+    else:
+        score, last_id = after_key
+        rows = []
+        if score is not None:
+            rows = _classement_rows(
+                cur, conditions + ["j.score_trueskill <= %s", "(j.score_trueskill < %s OR j.id > %s)"],
+                params + [score, score, last_id], "j.score_trueskill DESC NULLS LAST, j.id ASC", limit + 1
+            )
+        if len(rows) <= limit:
+            null_conds, null_params = ["j.score_trueskill IS NULL"], []
+            if score is None:
+                null_conds.append("j.id > %s")
+                null_params.append(last_id)
+            rows += _classement_rows(cur, conditions + null_conds, params + null_params,
+                                     "j.id ASC", limit + 1 - len(rows))
+
+    joueurs = []
+    next_cursor = None
+    threshold = dist["sigma_threshold"]
+    ref_stats = distribution_ref_stats(dist)
+
+    if paginated and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = _classement_cursor(rows[-1][4], rows[-1][0])
+    for row in rows:
+        _, nom, mu, sigma, score_trueskill, tier, nb_tournois, victoires, color, is_ranked = row
+        score_ts = round(float(score_trueskill), 3) if score_trueskill is not None else 0.000
+        nb = int(nb_tournois or 0)
+        vic = int(victoires or 0)
+        ratio = round((vic / nb * 100), 1) if nb > 0 else 0
+
+        if ref_stats is not None and has_tier(is_ranked, sigma, threshold):
+            top_percent = normal_top_percent(trueskill_score(mu, sigma), *ref_stats)
+        else:
+            top_percent = "?"
+
+        joueurs.append({
+            "nom": nom,
+            "mu": float(mu),
+            "sigma": float(sigma),
+            "score_trueskill": score_ts,
+            "tier": tier.strip() if tier else "?",
+            "nombre_tournois": nb,
+            "victoires": vic,
+            "ratio_victoires": ratio,
+            "percentile_trueskill": top_percent,
+            "color": color if color else "#FFFFFF",
+            "is_ranked": is_ranked
+        })
+
+    if paginated:
+        payload = {"data": joueurs, "limit": limit, "next_cursor": next_cursor}
+        if after_key is None:
+            payload["page"] = max(page, 1)
+        if with_total:
+            cur.execute("SELECT COUNT(*) FROM Joueurs j" + where, params)
+            total_joueurs = cur.fetchone()[0]
+            payload.update({"total": total_joueurs, "pages": math.ceil(total_joueurs / limit)})
+        return payload
+
+    distribution_data = {"curve": [], "players": []}
+    if not tier_filtre and not ligue_filtre:
+        distribution_data = _classement_distribution(dist, joueurs)
+    return {"joueurs": joueurs, "distribution_data": distribution_data}
+
+
+# Cle de cache du classement : filtres ramenes a leurs valeurs effectives
+# (tier S/A/B/C, ligue entiere), pour qu'un ?tier= ou ?ligue= invente ne cree
+# pas d'entree supplementaire.
+def _classement_cache_key(tier_filtre: str | None, ligue_filtre: str | None) -> str:
+    tier = tier_filtre.upper() if tier_filtre and tier_filtre.upper() in ['S', 'A', 'B', 'C'] else None
+    try:
+        ligue = int(ligue_filtre) if ligue_filtre else None
+    except ValueError:
+        ligue = None
+    return f"classement:{tier}:{ligue}"
+
+
+# Classement complet, ou une page avec ?page= / ?after=<curseur> (&limit=).
+# Une page ne porte ni la courbe de distribution (cf /classement/distribution)
+# ni, sauf ?total=true, le nombre total de joueurs et de pages.
+# Seule la premiere page est mise en cache : les suivantes et les curseurs
+# prennent des valeurs arbitraires qui rempliraient le cache jusqu'a la
+# prochaine ecriture, et ne coutent de toute facon que limit + 1 lignes.
 @public_bp.route('/classement')
 def classement():
     try:
         tier_filtre = request.args.get('tier', None)
         ligue_filtre = request.args.get('ligue', None)
         page = request.args.get('page', type=int)
-        limit = request.args.get('limit', DEFAULT_PAGE_SIZE, type=int)
-
-        cache_key = f"classement:{tier_filtre}:{ligue_filtre}"
-        cached = get_cached(cache_key)
-        if cached is not None and page is None:
-            return jsonify(cached)
-
-        query = """
-            SELECT
-                j.nom, j.mu, j.sigma, j.score_trueskill, j.tier,
-                COUNT(p.tournoi_id) as nb_tournois,
-                SUM(CASE WHEN p.position = 1 THEN 1 ELSE 0 END) as victoires,
-                j.color, j.is_ranked
-            FROM Joueurs j
-            LEFT JOIN Participations p ON j.id = p.joueur_id
-        """
-        params: list[Any] = []
-        conditions = []
-
-        if tier_filtre and tier_filtre.upper() in ['S', 'A', 'B', 'C']:
-            conditions.append("j.tier = %s")
-            params.append(tier_filtre.upper())
+        after = request.args.get('after')
+        limit = max(1, min(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), MAX_PAGE_SIZE))
+        with_total = request.args.get('total') == 'true'
+        paginated = page is not None or after is not None
 
-        if ligue_filtre:
+        after_key = None
+        if after:
             try:
-                ligue_id_int = int(ligue_filtre)
-                conditions.append("j.ligue_id = %s")
-                params.append(ligue_id_int)
+                after_key = _parse_classement_cursor(after)
             except ValueError:
-                pass
+                return jsonify({"error": "Curseur invalide"}), 400
 
-        if conditions:
-            query += " WHERE " + " AND ".join(conditions)
-
-        query += " GROUP BY j.id, j.nom, j.mu, j.sigma, j.score_trueskill, j.tier, j.color, j.is_ranked"
-        query += " ORDER BY j.score_trueskill DESC NULLS LAST"
+        cacheable = after_key is None and (page is None or page <= 1)
+        cache_key = _classement_cache_key(tier_filtre, ligue_filtre)
+        if paginated:
+            cache_key += f":1:{limit}:{with_total}"
+        cached = get_cached(cache_key) if cacheable else None
+        if cached is not None:
+            return jsonify(cached)
 
-        joueurs = []
         with get_db_connection() as conn:
             with conn.cursor() as cur:
-                cur.execute("SELECT value FROM Configuration WHERE key = 'sigma_threshold'")
-                res_conf = cur.fetchone()
-                threshold = float(res_conf[0]) if res_conf else DEFAULT_SIGMA_THRESHOLD
-                cur.execute("SELECT mu, sigma, is_ranked FROM Joueurs")
-                ref_scores = [
-                    trueskill_score(m, s)
-                    for m, s, r in cur.fetchall()
-                    if has_tier(r, s, threshold)
-                ]
-                ref_stats = compute_distribution_stats(ref_scores)
-
-                cur.execute(query, params)
-                rows = cur.fetchall()
-                total_joueurs = len(rows)
-                for row in rows:
-                    nom, mu, sigma, score_trueskill, tier, nb_tournois, victoires, color, is_ranked = row
-                    score_ts = round(float(score_trueskill), 3) if score_trueskill is not None else 0.000
-                    nb = int(nb_tournois)
-                    vic = int(victoires) if victoires else 0
-                    ratio = round((vic / nb * 100), 1) if nb > 0 else 0
-
-                    if ref_stats is not None and has_tier(is_ranked, sigma, threshold):
-                        top_percent = normal_top_percent(trueskill_score(mu, sigma), *ref_stats)
-                    else:
-                        top_percent = "?"
-
-                    joueurs.append({
-                        "nom": nom,
-                        "mu": float(mu),
-                        "sigma": float(sigma),
-                        "score_trueskill": score_ts,
-                        "tier": tier.strip() if tier else "?",
-                        "nombre_tournois": nb,
-                        "victoires": vic,
-                        "ratio_victoires": ratio,
-                        "percentile_trueskill": top_percent,
-                        "color": color if color else "#FFFFFF",
-                        "is_ranked": is_ranked
-                    })
+                payload = _classement_payload(cur, current_distribution(cur), tier_filtre, ligue_filtre,
+                                              page, after_key, limit, with_total)
+        if cacheable:
+            set_cached(cache_key, payload)
+        return jsonify(payload)
+    except Exception:
+        return jsonify({"error": "Erreur serveur"}), 500
 
-        distribution_data = {"curve": [], "players": []}
-        if not tier_filtre and not ligue_filtre:
-            tiered = [j for j in joueurs if has_tier(j["is_ranked"], j["sigma"], threshold)]
-            distribution_data = build_distribution(tiered, lambda j: trueskill_score(j["mu"], j["sigma"]))
 
-        if page is None:
-            payload = {"joueurs": joueurs, "distribution_data": distribution_data}
-            set_cached(cache_key, payload)
-            return jsonify(payload)
+# Courbe de distribution du classement general, servie a part des pages de
+# /classement : elle porte sur toute la population et ne change qu'avec les
+# donnees, une lecture complete par invalidation du cache suffit.
+@public_bp.route('/classement/distribution')
+def classement_distribution():
+    try:
+        cached = get_cached("classement_distribution")
+        if cached is not None:
+            return jsonify(cached)
 
-        offset = (page - 1) * limit
-        paginated = joueurs[offset:offset + limit]
-        return jsonify({
-            "data": paginated,
-            "total": total_joueurs,
-            "page": page,
-            "limit": limit,
-            "pages": math.ceil(total_joueurs / limit) if limit > 0 else 1,
-            "distribution_data": distribution_data
-        })
-    except Exception:
+        with get_db_connection() as conn:
+            with conn.cursor() as cur:
+                dist = current_distribution(cur)
+                cur.execute("SELECT nom, mu, sigma, color, is_ranked FROM Joueurs")
+                population = [
+                    {"nom": n, "mu": float(m), "sigma": float(sg), "color": c or "#FFFFFF", "is_ranked": r}
+                    for n, m, sg, c, r in cur.fetchall()
+                ]
+        payload = _classement_distribution(dist, population)
+        set_cached("classement_distribution", payload)
+        return jsonify(payload)
+    except Exception as e:
+        logger.error(f"Erreur classement_distribution: {e}")
         return jsonify({"error": "Erreur serveur"}), 500
 
 
@@ -703,92 +981,98 @@ def _find_active_season(cur) -> dict | None:
     }
 
 
-@public_bp.route('/classement/saison')
-def classement_saison():
-    try:
-        ligue_id_param = request.args.get('ligue_id', type=int)
+# Classement IP de la saison en cours (cf /classement/saison).
+def _classement_saison_payload(ligue_id_param: int | None, evo_format: str) -> dict:
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            saison = _find_active_season(cur)
+            if saison is None:
+                return {"saison": None}
 
-        with get_db_connection() as conn:
-            with conn.cursor() as cur:
-                saison = _find_active_season(cur)
-                if saison is None:
-                    return jsonify({"saison": None})
-
-                d_debut, d_fin = saison["date_debut"], saison["date_fin"]
-                is_league = saison["is_league"]
-
-                ligues_disponibles = []
-                ligue_courante = None
-                if is_league:
-                    cur.execute("""
-                        SELECT DISTINCT l.id, l.nom, l.couleur, l.niveau
-                        FROM Ligues l
-                        JOIN Tournois t ON t.ligue_id = l.id
-                        WHERE t.date >= %s AND t.date <= %s
-                        ORDER BY l.niveau ASC
-                    """, (d_debut, d_fin))
-                    ligues_disponibles = [
-                        {"id": r[0], "nom": r[1], "couleur": r[2], "niveau": r[3]}
-                        for r in cur.fetchall()
-                    ]
-                    if ligue_id_param:
-                        ligue_courante = next((l for l in ligues_disponibles if l["id"] == ligue_id_param), None)
-                    if not ligue_courante and ligues_disponibles:
-                        ligue_courante = ligues_disponibles[0]
-
-                cur.execute("SELECT value FROM Configuration WHERE key = 'ip_version_live'")
-                live_row = cur.fetchone()
-                ip_version = live_row[0] if live_row else IP_VERSION_DEFAULT
-
-        if is_league and ligue_courante:
-            recap_mode, specific_ligue_id = 'league', ligue_courante["id"]
-        elif is_league:
-            recap_mode, specific_ligue_id = 'league', None
-        else:
-            recap_mode, specific_ligue_id = 'classic', None
+            d_debut, d_fin = saison["date_debut"], saison["date_fin"]
+            is_league = saison["is_league"]
 
-        cache_key = f"classement_saison:{d_debut}:{d_fin}:{recap_mode}:{specific_ligue_id}"
-        cached = get_cached(cache_key)
-        if cached is not None:
-            return jsonify(cached)
+            ligues_disponibles = []
+            ligue_courante = None
+            if is_league:
+                cur.execute("""
+                    SELECT DISTINCT l.id, l.nom, l.couleur, l.niveau
+                    FROM Ligues l
+                    JOIN Tournois t ON t.ligue_id = l.id
+                    WHERE t.date >= %s AND t.date <= %s
+                    ORDER BY l.niveau ASC
+                """, (d_debut, d_fin))
+                ligues_disponibles = [
+                    {"id": r[0], "nom": r[1], "couleur": r[2], "niveau": r[3]}
+                    for r in cur.fetchall()
+                ]
+                if ligue_id_param:
+                    ligue_courante = next((l for l in ligues_disponibles if l["id"] == ligue_id_param), None)
+                if not ligue_courante and ligues_disponibles:
+                    ligue_courante = ligues_disponibles[0]
 
-        stats = _aggregate_season_stats(d_debut, d_fin, recap_mode, specific_ligue_id, ip_version)
-        evo = compute_ip_evolution(d_debut, d_fin, recap_mode, specific_ligue_id, ip_version)
+            cur.execute("SELECT value FROM Configuration WHERE key = 'ip_version_live'")
+            live_row = cur.fetchone()
+            ip_version = live_row[0] if live_row else IP_VERSION_DEFAULT
 
-        recap_players = [
-            {"nom": p["nom"], "color": "#FFFFFF", "score_gm": p["score_gm"]}
-            for p in stats["classement_moyenne"]
-            if p["matchs"] > 0 and p["score_gm"] is not None
-        ]
-        dist = build_distribution(recap_players, lambda p: p["score_gm"])
-
-        eligibles = [p for p in stats["classement_moyenne"] if p.get("is_eligible_gm")]
-        leader = eligibles[0]["nom"] if eligibles else None
-
-        payload = {
-            "saison": {
-                "nom": saison["nom"],
-                "slug": saison["slug"],
-                "date_debut": d_debut.strftime("%d/%m/%Y"),
-                "date_fin": d_fin.strftime("%d/%m/%Y"),
-                "victory_condition": saison["victory_condition"],
-            },
-            "is_league": is_league,
-            "classement_ip": stats["classement_moyenne"],
-            "ip_evolution": evo,
-            "distribution_data": dist,
-            "recap_stats": {
-                "total_tournois": stats["total_tournois"],
-                "nb_participants": len([p for p in stats["classement_moyenne"] if p["matchs"] > 0]),
-                "leader": leader,
-            },
-        }
-        if is_league:
-            payload["ligues_disponibles"] = ligues_disponibles
-            payload["ligue_courante"] = ligue_courante
+    if is_league and ligue_courante:
+        recap_mode, specific_ligue_id = 'league', ligue_courante["id"]
+    elif is_league:
+        recap_mode, specific_ligue_id = 'league', None
+    else:
+        recap_mode, specific_ligue_id = 'classic', None
+
+    cache_key = f"classement_saison:{d_debut}:{d_fin}:{recap_mode}:{specific_ligue_id}:{evo_format}"
+    cached = get_cached(cache_key)
+    if cached is not None:
+        return cached
+
+    stats = _aggregate_season_stats(d_debut, d_fin, recap_mode, specific_ligue_id, ip_version)
+    evo = compute_ip_evolution(d_debut, d_fin, recap_mode, specific_ligue_id, ip_version, evo_format)
+
+    recap_players = [
+        {"nom": p["nom"], "color": "#FFFFFF", "score_gm": p["score_gm"]}
+        for p in stats["classement_moyenne"]
+        if p["matchs"] > 0 and p["score_gm"] is not None
+    ]
+    dist = build_distribution(recap_players, lambda p: p["score_gm"])
+
+    eligibles = [p for p in stats["classement_moyenne"] if p.get("is_eligible_gm")]
+    leader = eligibles[0]["nom"] if eligibles else None
+
+    payload = {
+        "saison": {
+            "nom": saison["nom"],
+            "slug": saison["slug"],
+            "date_debut": d_debut.strftime("%d/%m/%Y"),
+            "date_fin": d_fin.strftime("%d/%m/%Y"),
+            "victory_condition": saison["victory_condition"],
+        },
+        "is_league": is_league,
+        "classement_ip": stats["classement_moyenne"],
+        "ip_evolution": evo,
+        "distribution_data": dist,
+        "recap_stats": {
+            "total_tournois": stats["total_tournois"],
+            "nb_participants": len([p for p in stats["classement_moyenne"] if p["matchs"] > 0]),
+            "leader": leader,
+        },
+    }
+    if is_league:
+        payload["ligues_disponibles"] = ligues_disponibles
+        payload["ligue_courante"] = ligue_courante
 
-        set_cached(cache_key, payload)
-        return jsonify(payload)
+    set_cached(cache_key, payload)
+    return payload
+
+
+@public_bp.route('/classement/saison')
+def classement_saison():
+    try:
+        evo_format = _evolution_format()
+        if evo_format is None:
+            return jsonify({"error": "Format invalide"}), 400
+        return jsonify(_classement_saison_payload(request.args.get('ligue_id', type=int), evo_format))
     except Exception as e:
         logger.error(f"Erreur classement_saison: {e}")
         return jsonify({"error": "Erreur serveur"}), 500
@@ -799,30 +1083,20 @@ def tier_seuils():
     try:
         with get_db_connection() as conn:
             with conn.cursor() as cur:
-                cur.execute("SELECT value FROM Configuration WHERE key = 'sigma_threshold'")
-                res = cur.fetchone()
-                threshold = float(res[0]) if res else DEFAULT_SIGMA_THRESHOLD
-
-                cur.execute("SELECT mu, sigma, is_ranked FROM Joueurs")
-                valid_scores = [
-                    trueskill_score(mu, sigma)
-                    for mu, sigma, is_ranked in cur.fetchall()
-                    if has_tier(is_ranked, sigma, threshold)
-                ]
-                return jsonify(tier_thresholds(valid_scores))
+                return jsonify(current_distribution(cur)["thresholds"])
     except Exception:
         return jsonify({"error": "Erreur serveur"}), 500
 
 
+# ?historique=<n> ne renvoie que les n entrees les plus recentes de
+# l'historique ; historique_total en donne la taille, la suite se lit sur
+# /stats/joueur/<nom>/historique.
 @public_bp.route('/stats/joueur/<nom>')
 def get_joueur_stats(nom):
+    historique_limit = request.args.get('historique', type=int)
     try:
         with get_db_connection() as conn:
             with conn.cursor() as cur:
-                cur.execute("SELECT value FROM Configuration WHERE key = 'sigma_threshold'")
-                res_conf = cur.fetchone()
-                threshold = float(res_conf[0]) if res_conf else DEFAULT_SIGMA_THRESHOLD
-
                 cur.execute("""
                     SELECT j.id, j.mu, j.sigma, j.score_trueskill, j.tier, j.is_ranked, j.consecutive_missed, j.color,
                            l.nom, l.couleur
@@ -842,360 +1116,151 @@ def get_joueur_stats(nom):
                 missed_val = int(consecutive_missed) if consecutive_missed is not None else 0
 
                 top_percent = "?"
-                if has_tier(is_ranked, sigma_val, threshold):
-                    cur.execute("SELECT mu, sigma, is_ranked FROM Joueurs")
-                    ref_scores = [
-                        trueskill_score(m, s)
-                        for m, s, r in cur.fetchall()
-                        if has_tier(r, s, threshold)
-                    ]
-                    ref_stats = compute_distribution_stats(ref_scores)
-                    if ref_stats is not None:
-                        top_percent = normal_top_percent(trueskill_score(mu, sigma_val), *ref_stats)
-
-                cur.execute("""
-                    SELECT t.id, t.date, p.score, p.position, p.new_score_trueskill, p.mu, p.sigma,
-                           COALESCE(t.ligue_nom, l.nom),
-                           COALESCE(t.ligue_couleur, l.couleur)
-                    FROM Participations p
-                    JOIN Tournois t ON p.tournoi_id = t.id
-                    JOIN Joueurs j ON p.joueur_id = j.id
-                    LEFT JOIN Ligues l ON t.ligue_id = l.id
-                    WHERE j.nom = %s
-                    ORDER BY t.date DESC
-                """, (nom,))
-                raw_history = cur.fetchall()
-
-                cur.execute("""
-                    SELECT g.date, g.old_sigma, g.new_sigma,
-                           COALESCE(
-                               (SELECT p2.mu FROM Participations p2
-                                JOIN Tournois t2 ON p2.tournoi_id = t2.id
-                                WHERE p2.joueur_id = g.joueur_id AND t2.date <= g.date
-                                ORDER BY t2.date DESC, t2.id DESC LIMIT 1),
-                               j.mu
-                           ) as mu_at_ghost
-                    FROM ghost_log g
-                    JOIN Joueurs j ON g.joueur_id = j.id
-                    WHERE j.nom = %s
-                    ORDER BY g.date DESC
-                """, (nom,))
-                raw_ghosts = cur.fetchall()
-
-                cur.execute("SELECT date, value_applied FROM global_resets ORDER BY date DESC")
-                raw_resets = cur.fetchall()
-
-                historique_data = []
-                scores_bruts = []
-                positions = []
-                victoires = 0
-
-                for tid, date, score, position, hist_ts, h_mu, h_sigma, hist_ligue_nom, hist_ligue_couleur in raw_history:
-                    s_val = float(score) if score is not None else 0.0
-                    p_val = int(position) if position is not None else 0
-                    ts_val = float(hist_ts) if hist_ts is not None else 0.0
-                    scores_bruts.append(s_val)
-                    positions.append(p_val)
-                    if p_val == 1: victoires += 1
-
-                    historique_data.append({
-                        "type": "tournoi",
-                        "id": tid,
-                        "date": date.strftime("%d/%m/%Y"),
-                        "date_sort": date.strftime("%Y-%m-%d"),
-                        "score": s_val,
-                        "position": p_val,
-                        "score_trueskill": round(ts_val, 3),
-                        "ligue": hist_ligue_nom if hist_ligue_nom else "N/A",
-                        "ligue_couleur": hist_ligue_couleur if hist_ligue_couleur else None
-                    })
-
-                for g_date, old_sig, new_sig, current_mu in raw_ghosts:
-                    ts_ghost = float(current_mu) - 3 * float(new_sig)
-                    penalty_val = round(float(new_sig) - float(old_sig), 3)
-                    historique_data.append({
-                        "type": "absence", "date": g_date.strftime("%d/%m/%Y"),
-                        "date_sort": g_date.strftime("%Y-%m-%d"),
-                        "score": 0, "position": "-", "score_trueskill": round(ts_ghost, 3),
-                        "valeur": penalty_val, "ligue": "-"
-                    })
-
-                for r_date, val in raw_resets:
-                    val_float = float(val)
-                    r_date_only = r_date.date() if hasattr(r_date, 'date') else r_date
-                    reset_ts = None
-                    best_date = None
-                    for entry in historique_data:
-                        if entry['date_sort'] <= r_date_only.strftime("%Y-%m-%d") and entry['score_trueskill'] is not None:
-                            if best_date is None or entry['date_sort'] >= best_date:
-                                best_date = entry['date_sort']
-                                reset_ts = entry['score_trueskill'] - val_float * 3
-
-                    if reset_ts is None:
-                        continue
-
-                    historique_data.append({
-                        "type": "reset", "date": r_date_only.strftime("%d/%m/%Y"),
-                        "date_sort": r_date_only.strftime("%Y-%m-%d"),
-                        "score": 0, "position": "-", "score_trueskill": round(reset_ts, 3),
-                        "valeur": val_float, "ligue": "-"
-                    })
-
-                type_order = {'tournoi': 0, 'absence': 1, 'reset': 2}
-                historique_data.sort(key=lambda x: (x['date_sort'], type_order.get(x['type'], 3)), reverse=True)
-
-                for i in range(len(historique_data)):
-                    if i < len(historique_data) - 1:
-                        historique_data[i]['ts_diff'] = round(historique_data[i]['score_trueskill'] - historique_data[i + 1]['score_trueskill'], 3)
-                    else:
-                        historique_data[i]['ts_diff'] = None
-
-                nb_tournois = len(scores_bruts)
-                if nb_tournois > 0:
-                    score_moyen = sum(scores_bruts) / nb_tournois
-                    meilleur_score = max(scores_bruts)
-                    position_moyenne = sum(positions) / nb_tournois
-                    ratio_victoires = (victoires / nb_tournois) * 100
-                    variance = sum((x - score_moyen) ** 2 for x in scores_bruts) / nb_tournois
-                    ecart_type_scores = math.sqrt(variance)
-                else:
-                    score_moyen = 0; meilleur_score = 0; position_moyenne = 0; ratio_victoires = 0; ecart_type_scores = 0
-
-                progression_recente = 0
-                if nb_tournois >= 2:
-                    tournois_only = [x for x in historique_data if x['type'] == 'tournoi']
-                    if len(tournois_only) >= 2:
-                        current_ts_val = tournois_only[0]['score_trueskill']
-                        prev_ts_val = tournois_only[1]['score_trueskill']
-                        progression_recente = current_ts_val - prev_ts_val
-
-                cur.execute("""
-                    SELECT t.emoji, t.nom, t.description, t.code, s.nom AS saison_nom, s.is_yearly,
-                           o.is_league_award, o.ligue_nom, o.ligue_couleur, o.ligue_id,
-                           l.couleur AS current_couleur, l.nom AS current_nom
-                    FROM awards_obtenus o
-                    JOIN types_awards t ON o.award_id = t.id
-                    JOIN saisons s ON o.saison_id = s.id
-                    LEFT JOIN ligues l ON o.ligue_id = l.id
-                    WHERE o.joueur_id = %s
-                    ORDER BY s.date_fin ASC
-                """, (jid,))
-                awards_list = []
-                award_groups = {}
-                for r in cur.fetchall():
-                    emoji, nom, description, code, saison_nom, is_yearly = r[:6]
-                    is_league_award, a_ligue_nom, a_ligue_couleur, a_ligue_id, cur_couleur, cur_nom = r[6:]
-
-                    ligue_supprimee = is_league_award and a_ligue_id is None
-                    ligue_nom_final = cur_nom if (is_league_award and not ligue_supprimee) else a_ligue_nom
-                    ligue_couleur_final = cur_couleur if (is_league_award and not ligue_supprimee) else a_ligue_couleur
-
-                    is_moai = 'moai' in code
-
-                    if is_moai:
-                        if is_yearly:
-                            trophy_desc = description.replace("de l'année", "de l'année " + saison_nom.replace("Année ", ""))
-                        else:
-                            trophy_desc = description + " " + saison_nom
-                        if is_league_award and ligue_nom_final:
-                            trophy_desc += "\nObtenu en " + ligue_nom_final
-                            if ligue_supprimee:
-                                trophy_desc += " (cette ligue n'existe plus)"
-                        entry = {"emoji": emoji, "nom": nom, "description": trophy_desc, "count": 1}
-                        if is_league_award:
-                            entry["is_league_award"] = True
-                            entry["ligue_nom"] = ligue_nom_final
-                            entry["ligue_couleur"] = ligue_couleur_final
-                            entry["ligue_supprimee"] = ligue_supprimee
-                        awards_list.append(entry)
-                    else:
-                        group_key = (emoji, nom, description, bool(is_league_award),
-                                     ligue_nom_final if is_league_award else None,
-                                     ligue_couleur_final if is_league_award else None,
-                                     ligue_supprimee if is_league_award else None)
-                        if group_key not in award_groups:
-                            desc = description
-                            if is_league_award and ligue_nom_final:
-                                desc += "\nObtenu en " + ligue_nom_final
-                                if ligue_supprimee:
-                                    desc += " (cette ligue n'existe plus)"
-                            entry = {"emoji": emoji, "nom": nom, "description": desc, "count": 0}
-                            if is_league_award:
-                                entry["is_league_award"] = True
-                                entry["ligue_nom"] = ligue_nom_final
-                                entry["ligue_couleur"] = ligue_couleur_final
-                                entry["ligue_supprimee"] = ligue_supprimee
-                            award_groups[group_key] = entry
-                        award_groups[group_key]["count"] += 1
-                awards_list.extend(award_groups.values())
-
-                cur.execute("""
-                    SELECT p.position,
-                           COALESCE(t.ligue_nom, l.nom) AS ligue_nom,
-                           COALESCE(t.ligue_couleur, l.couleur) AS ligue_couleur,
-                           COALESCE(t.ligue_id, l.id) AS ligue_id,
-                           COALESCE(l2.niveau, 999) AS ligue_niveau
-                    FROM Participations p
-                    JOIN Tournois t ON p.tournoi_id = t.id
-                    LEFT JOIN Ligues l ON t.ligue_id = l.id
-                    LEFT JOIN Ligues l2 ON COALESCE(t.ligue_id, l.id) = l2.id
-                    WHERE p.joueur_id = %s AND p.position IN (1, 2, 3)
-                    ORDER BY ligue_niveau
-                """, (jid,))
-                podium_rows = cur.fetchall()
-
-                palmares = {}
-                has_league_data = False
-                for pos, l_nom, l_coul, l_id, l_niv in podium_rows:
-                    is_real_league = bool(l_nom and l_id)
-                    key = l_nom if is_real_league else "__classique__"
-                    if is_real_league:
-                        has_league_data = True
-                    if key not in palmares:
-                        palmares[key] = {
-                            "ligue_nom": l_nom if is_real_league else None,
-                            "ligue_couleur": l_coul if is_real_league else None,
-                            "ligue_niveau": l_niv if (is_real_league and l_niv) else 999,
-                            "gold": 0, "silver": 0, "bronze": 0
-                        }
-                    if pos == 1:
-                        palmares[key]["gold"] += 1
-                    elif pos == 2:
-                        palmares[key]["silver"] += 1
-                    elif pos == 3:
-                        palmares[key]["bronze"] += 1
-
-                palmares_list = sorted(palmares.values(), key=lambda x: x["ligue_niveau"])
-
-                cur.execute("""
-                    SELECT COALESCE(t.ligue_nom, l.nom) AS ligue_nom,
-                           COALESCE(t.ligue_couleur, l.couleur) AS ligue_couleur,
-                           COALESCE(l2.niveau, 999) AS ligue_niveau,
-                           cnt.nb_joueurs,
-                           p.position,
-                           p.score
-                    FROM Participations p
-                    JOIN Tournois t ON p.tournoi_id = t.id
-                    LEFT JOIN Ligues l ON t.ligue_id = l.id
-                    LEFT JOIN Ligues l2 ON COALESCE(t.ligue_id, l.id) = l2.id
-                    JOIN (
-                        SELECT tournoi_id, COUNT(*) AS nb_joueurs
-                        FROM Participations GROUP BY tournoi_id
-                    ) cnt ON cnt.tournoi_id = p.tournoi_id
-                    WHERE p.joueur_id = %s
-                """, (jid,))
-                detail_rows = cur.fetchall()
-
-                def _new_bucket():
-                    return {"nb_tournois": 0, "victoires": 0, "gold": 0, "silver": 0, "bronze": 0,
-                            "podiums": 0, "somme_score": 0.0, "somme_position": 0,
-                            "meilleur_score": None, "pos_counts": {}}
-
-                def _accumulate(bucket, position, score):
-                    bucket["nb_tournois"] += 1
-                    bucket["somme_score"] += score
-                    bucket["somme_position"] += position
-                    if bucket["meilleur_score"] is None or score > bucket["meilleur_score"]:
-                        bucket["meilleur_score"] = score
-                    if position > 0:
-                        bucket["pos_counts"][position] = bucket["pos_counts"].get(position, 0) + 1
-                    if position == 1:
-                        bucket["victoires"] += 1; bucket["gold"] += 1
-                    elif position == 2:
-                        bucket["silver"] += 1
-                    elif position == 3:
-                        bucket["bronze"] += 1
-                    if position in (1, 2, 3):
-                        bucket["podiums"] += 1
-
-                ligues_detail = {}
-                for d_nom, d_coul, d_niv, d_nb, d_pos, d_score in detail_rows:
-                    is_real_league = bool(d_nom)
-                    key = d_nom if is_real_league else "__classique__"
-                    pos_v = int(d_pos) if d_pos is not None else 0
-                    score_v = float(d_score) if d_score is not None else 0.0
-                    nb_v = int(d_nb)
-
-                    if key not in ligues_detail:
-                        ligues_detail[key] = {
-                            "ligue_nom": d_nom if is_real_league else None,
-                            "ligue_couleur": d_coul if is_real_league else None,
-                            "ligue_niveau": d_niv if (is_real_league and d_niv) else 999,
-                            "total": _new_bucket(),
-                            "_tailles": {}
-                        }
-                    entry = ligues_detail[key]
-                    _accumulate(entry["total"], pos_v, score_v)
-                    if nb_v not in entry["_tailles"]:
-                        entry["_tailles"][nb_v] = _new_bucket()
-                    _accumulate(entry["_tailles"][nb_v], pos_v, score_v)
-
-                def _finalize(bucket):
-                    n = bucket["nb_tournois"]
-                    defaites = n - bucket["victoires"]
-                    return {
-                        "nb_tournois": n,
-                        "victoires": bucket["victoires"],
-                        "defaites": defaites,
-                        "gold": bucket["gold"], "silver": bucket["silver"], "bronze": bucket["bronze"],
-                        "podiums": bucket["podiums"],
-                        "taux_podium": round((bucket["podiums"] / n) * 100, 1) if n > 0 else 0,
-                        "pos_counts": [[p, bucket["pos_counts"][p]] for p in sorted(bucket["pos_counts"])],
-                        "ratio_vd": round((bucket["victoires"] / defaites), 2) if defaites > 0 else None,
-                        "ratio_victoires": round((bucket["victoires"] / n) * 100, 1) if n > 0 else 0,
-                        "score_moyen": round(bucket["somme_score"] / n, 1) if n > 0 else 0,
-                        "position_moyenne": round(bucket["somme_position"] / n, 2) if n > 0 else 0,
-                        "meilleur_score": bucket["meilleur_score"] if bucket["meilleur_score"] is not None else 0,
-                    }
+                dist = current_distribution(cur)
+                ref_stats = distribution_ref_stats(dist)
+                if ref_stats is not None and has_tier(is_ranked, sigma_val, dist["sigma_threshold"]):
+                    top_percent = normal_top_percent(trueskill_score(mu, sigma_val), *ref_stats)
 
-                details_list = []
-                for entry in ligues_detail.values():
-                    tailles = [
-                        dict(_finalize(b), nb_joueurs=nb)
-                        for nb, b in sorted(entry["_tailles"].items())
-                    ]
-                    details_list.append({
-                        "ligue_nom": entry["ligue_nom"],
-                        "ligue_couleur": entry["ligue_couleur"],
-                        "ligue_niveau": entry["ligue_niveau"],
-                        "total": _finalize(entry["total"]),
-                        "tailles": tailles
-                    })
-                details_list.sort(key=lambda x: x["ligue_niveau"])
+                profile = get_profile(cur, jid)
+            conn.commit()
 
         return jsonify({
             "stats": {
+                **profile["stats"],
                 "mu": round(float(mu), 3) if mu else DEFAULT_MU,
                 "sigma": round(float(sigma), 3) if sigma else DEFAULT_SIGMA,
                 "score_trueskill": round(safe_ts, 3),
                 "tier": tier.strip() if tier else '?',
                 "is_ranked": is_ranked,
                 "consecutive_missed": missed_val,
-                "nombre_tournois": nb_tournois,
-                "victoires": victoires,
-                "defaites": nb_tournois - victoires,
-                "ratio_vd": round(victoires / (nb_tournois - victoires), 2) if (nb_tournois - victoires) > 0 else None,
-                "ratio_victoires": round(ratio_victoires, 1),
-                "score_moyen": round(score_moyen, 3),
-                "meilleur_score": meilleur_score,
-                "ecart_type_scores": round(ecart_type_scores, 3),
-                "position_moyenne": round(position_moyenne, 1),
-                "progression_recente": round(progression_recente, 3),
                 "percentile_trueskill": top_percent,
                 "color": color if color else "#FFFFFF",
                 "ligue": {"nom": ligue_nom, "couleur": ligue_color} if ligue_nom else None
             },
-            "historique": historique_data,
-            "awards": awards_list,
-            "palmares": palmares_list,
-            "has_league_data": has_league_data,
-            "details": details_list
+            "historique": profile["historique"][:historique_limit] if historique_limit else profile["historique"],
+            "historique_total": len(profile["historique"]),
+            "awards": profile["awards"],
+            "palmares": profile["palmares"],
+            "has_league_data": profile["has_league_data"],
+            "details": profile["details"]
+        })
+    except Exception as e:
+        logger.error(f"Erreur serveur: {e}")
+        return jsonify({"error": "Erreur interne du serveur"}), 500
+
+
+def _load_joueur_profile(nom: str) -> dict | None:
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("SELECT id FROM Joueurs WHERE nom = %s", (nom,))
+            row = cur.fetchone()
+            if not row:
+                return None
+            profile = get_profile(cur, row[0])
+        conn.commit()
+    return profile
+
+
+# Courbe TrueSkill du joueur ramenee a ?points= valeurs (cf
+# profiles.trueskill_series), pour le graphique du profil.
+@public_bp.route('/stats/joueur/<nom>/trueskill')
+def get_joueur_trueskill(nom):
+    points = max(3, min(request.args.get('points', TS_SERIES_DEFAULT_POINTS, type=int), TS_SERIES_MAX_POINTS))
+    cache_key = f"ts_series:{nom}:{points}"
+    cached = get_cached(cache_key)
+    if cached is not None:
+        return jsonify(cached)
+
+    try:
+        profile = _load_joueur_profile(nom)
+        if profile is None:
+            return jsonify({"error": "Joueur non trouvé"}), 404
+        data = {"joueur": nom, **trueskill_series(profile["historique"], points)}
+        set_cached(cache_key, data)
+        return jsonify(data)
+    except Exception as e:
+        logger.error(f"Erreur serveur: {e}")
+        return jsonify({"error": "Erreur interne du serveur"}), 500
+
+
+# Historique complet du joueur, du plus recent au plus ancien, par pages de
+# ?limit= entrees a partir de ?offset=.
+@public_bp.route('/stats/joueur/<nom>/historique')
+def get_joueur_historique(nom):
+    offset = max(0, request.args.get('offset', 0, type=int))
+    limit = max(1, min(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int), MAX_PAGE_SIZE))
+    try:
+        profile = _load_joueur_profile(nom)
+        if profile is None:
+            return jsonify({"error": "Joueur non trouvé"}), 404
+        historique = profile["historique"]
+        next_offset = offset + limit
+        return jsonify({
+            "data": historique[offset:next_offset],
+            "next_offset": next_offset if next_offset < len(historique) else None,
+            "total": len(historique),
         })
     except Exception as e:
         logger.error(f"Erreur serveur: {e}")
         return jsonify({"error": "Erreur interne du serveur"}), 500
 
 
+# Bilan du joueur contre chacun de ses adversaires, ou contre le seul
+# ?adversaire=<nom>.
+@public_bp.route('/stats/joueur/<nom>/h2h')
+def get_joueur_h2h(nom):
+    adversaire = request.args.get('adversaire')
+    cache_key = f"h2h:{nom}:{adversaire}"
+    cached = get_cached(cache_key)
+    if cached is not None:
+        return jsonify(cached)
+
+    try:
+        with get_db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT id FROM Joueurs WHERE nom = %s", (nom,))
+                row = cur.fetchone()
+                if not row:
+                    return jsonify({"error": "Joueur non trouvé"}), 404
+                adversaire_id = None
+                if adversaire:
+                    cur.execute("SELECT id FROM Joueurs WHERE nom = %s", (adversaire,))
+                    adv_row = cur.fetchone()
+                    if not adv_row:
+                        return jsonify({"error": "Adversaire non trouvé"}), 404
+                    adversaire_id = adv_row[0]
+                data = {"joueur": nom, "adversaires": player_head_to_head(cur, row[0], adversaire_id)}
+        set_cached(cache_key, data)
+        return jsonify(data)
+    except Exception as e:
+        logger.error(f"Erreur serveur: {e}")
+        return jsonify({"error": "Erreur interne du serveur"}), 500
+
+
+# Matrice des confrontations entre les joueurs d'une ligue (cf
+# head_to_head.league_head_to_head).
+@public_bp.route('/stats/ligue/<int:ligue_id>/h2h')
+def get_ligue_h2h(ligue_id):
+    cache_key = f"h2h_ligue:{ligue_id}"
+    cached = get_cached(cache_key)
+    if cached is not None:
+        return jsonify(cached)
+
+    try:
+        with get_db_connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute("SELECT nom FROM Ligues WHERE id = %s", (ligue_id,))
+                row = cur.fetchone()
+                if not row:
+                    return jsonify({"error": "Ligue introuvable"}), 404
+                data = {"ligue": row[0], **league_head_to_head(cur, ligue_id)}
+        set_cached(cache_key, data)
+        return jsonify(data)
+    except Exception as e:
+        logger.error(f"Erreur serveur: {e}")
+        return jsonify({"error": "Erreur interne du serveur"}), 500
+
+
 @public_bp.route('/joueurs/noms')
 def get_joueur_names():
     try:
@@ -1215,6 +1280,20 @@ def get_joueur_names():
         return jsonify({"error": "Erreur serveur"}), 500
 
 
+# Autocompletion des noms de joueurs : les limit meilleures correspondances de
+# q (cf player_search), eventuellement restreintes a une ligue.
+@public_bp.route('/joueurs/search')
+def search_joueurs():
+    query = request.args.get('q', '')
+    limit = max(1, min(request.args.get('limit', SEARCH_DEFAULT_LIMIT, type=int), SEARCH_MAX_LIMIT))
+    ligue_id = request.args.get('ligue_id', type=int)
+    try:
+        return jsonify(search_players(query, limit, ligue_id))
+    except Exception as e:
+        logger.error(f"Erreur recherche joueurs: {e}")
+        return jsonify({"error": "Erreur serveur"}), 500
+
+
 @public_bp.route('/stats/joueurs', methods=['GET'])
 def stats_joueurs():
     try:
@@ -1267,36 +1346,101 @@ def stats_joueurs():
         return jsonify({"error": "Erreur interne du serveur"}), 500
 
 
+def _parse_tournois_cursor(cursor: str) -> tuple[date, int]:
+    d, tid = cursor.rsplit(':', 1)
+    return datetime.strptime(d, '%Y-%m-%d').date(), int(tid)
+
+
+# Historique des tournois, du plus recent au plus ancien.
+# Sans limit ni after : liste complete (ancien format). Sinon, une page de
+# limit tournois suivant le curseur after ("<date>:<id>" du dernier tournoi de
+# la page precedente), au format {"data": [...], "next_cursor": ...}.
+# Filtres : date_debut / date_fin (YYYY-MM-DD), ligue (id, ou "classique").
+# fields=light omet participants et vainqueur. Effectif et vainqueur sont lus
+# sur le resume stocke dans Tournois (cf refresh_tournoi_summary).
 @public_bp.route('/stats/tournois')
 def get_tournois_list():
     try:
+        after = request.args.get('after')
+        limit_arg = request.args.get('limit', type=int)
+        paginated = after is not None or limit_arg is not None
+        limit = max(1, min(limit_arg or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE))
+        light = request.args.get('fields') == 'light'
+        ligue_filtre = request.args.get('ligue')
+
+        conditions = []
+        params: list[Any] = []
+        try:
+            for arg, op in (('date_debut', '>='), ('date_fin', '<=')):
+                if request.args.get(arg):
+                    conditions.append(f"t.date {op} %s")
+                    params.append(datetime.strptime(request.args[arg], '%Y-%m-%d').date())
+        except ValueError:
+            return jsonify({"error": "Format de date invalide"}), 400
+
+        if ligue_filtre == 'classique':
+            conditions.append("t.ligue_id IS NULL AND t.ligue_nom IS NULL")
+        elif ligue_filtre:
+            try:
+                conditions.append("t.ligue_id = %s")
+                params.append(int(ligue_filtre))
+            except ValueError:
+                return jsonify({"error": "Ligue invalide"}), 400
+
+        if after:
+            try:
+                conditions.append("(t.date, t.id) < (%s, %s)")
+                params.extend(_parse_tournois_cursor(after))
+            except ValueError:
+                return jsonify({"error": "Curseur invalide"}), 400
+
+        cache_key = f"tournois:{paginated and limit}:{after}:{ligue_filtre}:{light}:" + ":".join(str(p) for p in params)
+        cached = get_cached(cache_key)
+        if cached is not None:
+            return jsonify(cached)
+
+        query = """
+            SELECT t.id, t.date,
+                   COALESCE(t.ligue_nom, l.nom),
+                   COALESCE(t.ligue_couleur, l.couleur),
+                   t.nb_joueurs, w.nom
+            FROM Tournois t
+            LEFT JOIN Ligues l ON t.ligue_id = l.id
+            LEFT JOIN Joueurs w ON w.id = t.winner_id
+            WHERE t.nb_joueurs > 0
+        """
+        for cond in conditions:
+            query += " AND " + cond
+        query += " ORDER BY t.date DESC, t.id DESC"
+        if paginated:
+            query += " LIMIT %s"
+            params.append(limit + 1)
+
         with get_db_connection() as conn:
             with conn.cursor() as cur:
-                cur.execute("""
-                    SELECT t.id, t.date, COUNT(p.joueur_id),
-                           COALESCE(t.ligue_nom, l.nom),
-                           COALESCE(t.ligue_couleur, l.couleur),
-                           (SELECT j.nom FROM Participations p2
-                            JOIN Joueurs j ON p2.joueur_id = j.id
-                            WHERE p2.tournoi_id = t.id
-                            ORDER BY p2.score DESC LIMIT 1) as vainqueur
-                    FROM Tournois t
-                    JOIN Participations p ON t.id = p.tournoi_id
-                    LEFT JOIN Ligues l ON t.ligue_id = l.id
-                    GROUP BY t.id, t.date, t.ligue_nom, t.ligue_couleur, l.nom, l.couleur
-                    ORDER BY t.date DESC
-                """)
-                tournois = [{
-                    "id": r[0],
-                    "date": r[1].strftime("%d/%m/%Y"),
-                    "date_iso": r[1].strftime("%Y-%m-%d"),
-                    "nb_joueurs": r[2],
-                    "participants": r[2],
-                    "ligue_nom": r[3] if r[3] else "N/A",
-                    "ligue_couleur": r[4] if r[4] else None,
-                    "vainqueur": r[5]
-                } for r in cur.fetchall()]
-        return jsonify(tournois)
+                cur.execute(query, params)
+                rows = cur.fetchall()
+                next_cursor = None
+                if paginated and len(rows) > limit:
+                    rows = rows[:limit]
+                    next_cursor = f"{rows[-1][1].strftime('%Y-%m-%d')}:{rows[-1][0]}"
+
+        tournois = []
+        for tid, tdate, ligue_nom, ligue_couleur, nb, vainqueur in rows:
+            t = {
+                "id": tid,
+                "date": tdate.strftime("%d/%m/%Y"),
+                "date_iso": tdate.strftime("%Y-%m-%d"),
+                "ligue_nom": ligue_nom if ligue_nom else "N/A",
+                "ligue_couleur": ligue_couleur if ligue_couleur else None,
+            }
+            if not light:
+                t.update({"nb_joueurs": nb, "participants": nb, "vainqueur": vainqueur})
+            tournois.append(t)
+
+        payload = {"data": tournois, "next_cursor": next_cursor} if paginated else tournois
+        set_cached(cache_key, payload)
+        return jsonify(payload)
     except Exception:
         return jsonify({"error": "Erreur serveur"}), 500
 
@@ -1332,44 +1476,56 @@ def get_tournoi_details(tournoi_id):
         return jsonify({"error": "Erreur serveur"}), 500
 
 
+# Ligues et leurs joueurs, liste vide hors mode ligue.
+def _ligues_payload(cur) -> list:
+    cur.execute("SELECT value FROM Configuration WHERE key = 'league_mode_enabled'")
+    conf = cur.fetchone()
+    if not conf or conf[0] != 'true':
+        return []
+
+    cur.execute("""
+        SELECT l.id, l.nom, l.niveau, l.couleur,
+               j.nom, j.score_trueskill, j.tier
+        FROM Ligues l
+        LEFT JOIN Joueurs j ON j.ligue_id = l.id
+        ORDER BY l.niveau ASC, j.score_trueskill DESC NULLS LAST
+    """)
+    rows = cur.fetchall()
+
+    ligues_map = {}
+    ligues_order = []
+    for lid, lnom, lniv, lcoul, jnom, jscore, jtier in rows:
+        if lid not in ligues_map:
+            ligues_map[lid] = {
+                "id": lid, "nom": lnom, "niveau": lniv, "couleur": lcoul,
+                "joueurs": []
+            }
+            ligues_order.append(lid)
+        if jnom:
+            ligues_map[lid]["joueurs"].append({"nom": jnom, "score": jscore, "tier": jtier})
+
+    return [ligues_map[lid] for lid in ligues_order]
+
+
 @public_bp.route('/ligues', methods=['GET'])
 def get_ligues_public():
     try:
         with get_db_connection() as conn:
             with conn.cursor() as cur:
-                cur.execute("SELECT value FROM Configuration WHERE key = 'league_mode_enabled'")
-                conf = cur.fetchone()
-                if not conf or conf[0] != 'true':
-                    return jsonify([])
-
-                cur.execute("""
-                    SELECT l.id, l.nom, l.niveau, l.couleur,
-                           j.nom, j.score_trueskill, j.tier
-                    FROM Ligues l
-                    LEFT JOIN Joueurs j ON j.ligue_id = l.id
-                    ORDER BY l.niveau ASC, j.score_trueskill DESC NULLS LAST
-                """)
-                rows = cur.fetchall()
-
-                ligues_map = {}
-                ligues_order = []
-                for lid, lnom, lniv, lcoul, jnom, jscore, jtier in rows:
-                    if lid not in ligues_map:
-                        ligues_map[lid] = {
-                            "id": lid, "nom": lnom, "niveau": lniv, "couleur": lcoul,
-                            "joueurs": []
-                        }
-                        ligues_order.append(lid)
-                    if jnom:
-                        ligues_map[lid]["joueurs"].append({"nom": jnom, "score": jscore, "tier": jtier})
-
-                ligues = [ligues_map[lid] for lid in ligues_order]
+                ligues = _ligues_payload(cur)
         return jsonify(ligues)
     except Exception as e:
         logger.error(f"Erreur serveur: {e}")
         return jsonify({"error": "Erreur interne du serveur"}), 500
 
 
+# Version courante des donnees, pour les GET conditionnels du frontend (la
+# valeur est aussi dans l'en-tete X-Data-Version de toute reponse publique).
+@public_bp.route('/data-version', methods=['GET'])
+def data_version():
+    return jsonify({"version": g.get('data_version')})
+
+
 @public_bp.route('/health', methods=['GET'])
 def health():
     try:
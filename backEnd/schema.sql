@@ -4,6 +4,14 @@ SET standard_conforming_strings = on;
 SET client_min_messages = warning;
 SET row_security = off;
 
+DROP TABLE IF EXISTS public.head_to_head CASCADE;
+DROP TABLE IF EXISTS public.data_version CASCADE;
+DROP TABLE IF EXISTS public.tournoi_pointers CASCADE;
+DROP TABLE IF EXISTS public.distribution_stats CASCADE;
+DROP TABLE IF EXISTS public.joueur_profiles CASCADE;
+DROP TABLE IF EXISTS public.jobs CASCADE;
+DROP TABLE IF EXISTS public.journal_deltas CASCADE;
+DROP TABLE IF EXISTS public.journal_operations CASCADE;
 DROP TABLE IF EXISTS public.ghost_log CASCADE;
 DROP TABLE IF EXISTS public.awards_obtenus CASCADE;
 DROP TABLE IF EXISTS public.participations CASCADE;
@@ -54,7 +62,9 @@ CREATE TABLE public.joueurs (
     consecutive_missed integer DEFAULT 0,
     is_ranked boolean DEFAULT true,
     color character varying(7) DEFAULT '#FFFFFF',
-    ligue_id INTEGER REFERENCES public.ligues(id) ON DELETE SET NULL
+    ligue_id INTEGER REFERENCES public.ligues(id) ON DELETE SET NULL,
+    nb_tournois integer NOT NULL DEFAULT 0,
+    nb_victoires integer NOT NULL DEFAULT 0
 );
 ALTER TABLE public.joueurs OWNER TO CURRENT_USER;
 
@@ -69,7 +79,14 @@ CREATE TABLE public.tournois (
     date date NOT NULL,
     ligue_id INTEGER REFERENCES public.ligues(id) ON DELETE SET NULL,
     ligue_nom character varying(100),    -- Archive du nom au moment du tournoi
-    ligue_couleur character varying(20)  -- Archive de la couleur
+    ligue_couleur character varying(20), -- Archive de la couleur
+    -- Resume tenu a jour par refresh_tournoi_summary (services.py)
+    nb_joueurs integer NOT NULL DEFAULT 0,
+    winner_id integer REFERENCES public.joueurs(id) ON DELETE SET NULL,
+    avg_score double precision,
+    sum_old_mu double precision NOT NULL DEFAULT 0,
+    nb_old_mu integer NOT NULL DEFAULT 0,
+    session_id integer
 );
 ALTER TABLE public.tournois OWNER TO CURRENT_USER;
 
@@ -138,6 +155,112 @@ CREATE TABLE public.global_resets (
 );
 ALTER TABLE public.global_resets OWNER TO CURRENT_USER;
 
+-- JOURNAL D'ANNULATION
+-- Une ligne par ecriture touchant les joueurs (tournoi, reset global, tiers,
+-- mouvements inter-ligues), et pour chacune l'etat "avant" des seuls joueurs
+-- modifies. Voir journal.py.
+CREATE TABLE public.journal_operations (
+    id SERIAL PRIMARY KEY,
+    kind character varying(32) NOT NULL,
+    ref_id integer,
+    label character varying(255),
+    created_at timestamp without time zone DEFAULT now()
+);
+ALTER TABLE public.journal_operations OWNER TO CURRENT_USER;
+
+CREATE TABLE public.journal_deltas (
+    operation_id integer NOT NULL REFERENCES public.journal_operations(id) ON DELETE CASCADE,
+    joueur_id integer NOT NULL REFERENCES public.joueurs(id) ON DELETE CASCADE,
+    before jsonb NOT NULL,
+    CONSTRAINT journal_deltas_pkey PRIMARY KEY (operation_id, joueur_id)
+);
+ALTER TABLE public.journal_deltas OWNER TO CURRENT_USER;
+
+-- FILE DE TACHES DE FOND
+-- Travail de suivi des ecritures admin, execute par worker.py. Voir jobs.py.
+CREATE TABLE public.jobs (
+    id SERIAL PRIMARY KEY,
+    kind character varying(50) NOT NULL,
+    payload jsonb NOT NULL DEFAULT '{}'::jsonb,
+    dedupe_key character varying(100),
+    status character varying(16) NOT NULL DEFAULT 'pending',
+    attempts integer NOT NULL DEFAULT 0,
+    result jsonb,
+    error text,
+    created_at timestamp without time zone DEFAULT now(),
+    started_at timestamp without time zone,
+    finished_at timestamp without time zone
+);
+ALTER TABLE public.jobs OWNER TO CURRENT_USER;
+
+CREATE UNIQUE INDEX jobs_pending_dedupe_key ON public.jobs (dedupe_key) WHERE status = 'pending';
+
+-- PROFILS JOUEURS MATERIALISES
+-- Partie de /stats/joueur/<nom> qui ne change qu'avec l'historique du joueur,
+-- reconstruite quand une ecriture le touche. Voir profiles.py.
+CREATE TABLE public.joueur_profiles (
+    joueur_id integer PRIMARY KEY REFERENCES public.joueurs(id) ON DELETE CASCADE,
+    payload jsonb,
+    dirty boolean NOT NULL DEFAULT true,
+    version integer NOT NULL DEFAULT 0,
+    built_at timestamp without time zone
+);
+ALTER TABLE public.joueur_profiles OWNER TO CURRENT_USER;
+
+-- DISTRIBUTION TRUESKILL
+-- Moyenne, ecart-type, seuils de tier et courbe de la population classee,
+-- une version par recalcul des tiers qui les change. Voir services.py.
+CREATE TABLE public.distribution_stats (
+    version SERIAL PRIMARY KEY,
+    mean double precision,
+    stdev double precision,
+    count integer NOT NULL,
+    sigma_threshold double precision NOT NULL,
+    thresholds jsonb NOT NULL,
+    curve jsonb NOT NULL,
+    created_at timestamp without time zone DEFAULT now()
+);
+ALTER TABLE public.distribution_stats OWNER TO CURRENT_USER;
+
+-- DERNIER TOURNOI PAR LIGUE
+-- Pointeur vers le tournoi le plus recent de chaque ligue (par nom archive),
+-- tenu a jour par refresh_tournoi_pointers (services.py). Sert /dernier-tournoi.
+CREATE TABLE public.tournoi_pointers (
+    ligue_nom character varying(100) PRIMARY KEY,
+    tournoi_id integer NOT NULL REFERENCES public.tournois(id) ON DELETE CASCADE
+);
+ALTER TABLE public.tournoi_pointers OWNER TO CURRENT_USER;
+
+-- VERSION DES DONNEES
+-- Compteur global incremente a chaque ecriture (cache.invalidate_cache), servi
+-- comme ETag par les endpoints publics. Il demarre a l'horodatage de creation
+-- en millisecondes : une base recreee ne repasse jamais par une version deja
+-- distribuee.
+CREATE TABLE public.data_version (
+    id boolean PRIMARY KEY DEFAULT true CHECK (id),
+    version bigint NOT NULL DEFAULT (extract(epoch FROM now()) * 1000)::bigint
+);
+ALTER TABLE public.data_version OWNER TO CURRENT_USER;
+INSERT INTO public.data_version DEFAULT VALUES;
+
+-- CONFRONTATIONS DIRECTES
+-- Une ligne par paire de joueurs ayant partage un lobby (joueur_a < joueur_b),
+-- compteurs du point de vue de joueur_a, tenue a jour tournoi par tournoi.
+-- Voir head_to_head.py.
+CREATE TABLE public.head_to_head (
+    joueur_a integer NOT NULL REFERENCES public.joueurs(id) ON DELETE CASCADE,
+    joueur_b integer NOT NULL REFERENCES public.joueurs(id) ON DELETE CASCADE,
+    nb_lobbies integer NOT NULL DEFAULT 0,
+    a_devant integer NOT NULL DEFAULT 0,
+    b_devant integer NOT NULL DEFAULT 0,
+    somme_ecart integer NOT NULL DEFAULT 0,
+    nb_predits integer NOT NULL DEFAULT 0,
+    attendu_a double precision NOT NULL DEFAULT 0,
+    PRIMARY KEY (joueur_a, joueur_b),
+    CHECK (joueur_a < joueur_b)
+);
+ALTER TABLE public.head_to_head OWNER TO CURRENT_USER;
+
 -- API TOKENS
 CREATE TABLE public.api_tokens (
     token character varying(64) NOT NULL PRIMARY KEY,
@@ -212,11 +335,18 @@ CREATE UNIQUE INDEX awards_obtenus_unique_no_ligue ON public.awards_obtenus (jou
 CREATE INDEX idx_participations_joueur_id ON public.participations(joueur_id);
 CREATE INDEX idx_participations_tournoi_id ON public.participations(tournoi_id);
 CREATE INDEX idx_joueurs_ligue_id ON public.joueurs(ligue_id);
+CREATE INDEX idx_joueurs_classement ON public.joueurs(score_trueskill DESC NULLS LAST, id);
 CREATE INDEX idx_tournois_date ON public.tournois(date);
+CREATE INDEX idx_tournois_date_id ON public.tournois(date, id);
 CREATE INDEX idx_awards_obtenus_joueur_id ON public.awards_obtenus(joueur_id);
 CREATE INDEX idx_awards_obtenus_saison_id ON public.awards_obtenus(saison_id);
 CREATE INDEX idx_ghost_log_joueur_id ON public.ghost_log(joueur_id);
 CREATE INDEX idx_ghost_log_tournoi_id ON public.ghost_log(tournoi_id);
+CREATE INDEX idx_league_movements_saison_joueur ON public.league_movements(saison_id, joueur_id);
+CREATE INDEX idx_journal_operations_kind_ref ON public.journal_operations(kind, ref_id);
+CREATE INDEX idx_jobs_pending ON public.jobs(id) WHERE status = 'pending';
+CREATE INDEX idx_joueur_profiles_dirty ON public.joueur_profiles(joueur_id) WHERE dirty;
+CREATE INDEX idx_head_to_head_joueur_b ON public.head_to_head(joueur_b);
 
 INSERT INTO public.types_awards (code, nom, emoji, description) VALUES 
 ('gold_moai', '1er', 'trophy/saison/gold_moai.png', 'Vainqueur de Saison'),
@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import gzip
+from typing import Any
+
+from flask import Response, request
+from flask.json.provider import DefaultJSONProvider
+
+from constants import COMPRESS_MIN_BYTES, GZIP_LEVEL, ZSTD_LEVEL
+
+# Dependances optionnelles : sans orjson on garde le json de Flask, sans
+# zstandard on ne propose que gzip.
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Memes conventions que le provider par defaut de Flask : cles triees, et
+# dates confiees a default() pour garder le format HTTP de Flask.
+_ORJSON_OPTIONS = (
+    orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+    | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_PASSTHROUGH_DATETIME
+) if orjson is not None else 0
+
+_COMPRESSIBLE_MIMETYPES = {'application/json', 'text/html'}
+
+
+def _default(o: Any) -> Any:
+    # Tableaux et scalaires numpy
+    if hasattr(o, 'tolist'):
+        return o.tolist()
+    return DefaultJSONProvider.default(o)
+
+
+# Provider JSON de l'application : orjson quand il est installe (les payloads
+# de recap, avec un point par joueur et par tournoi, se serialisent plusieurs
+# fois plus vite), le json de Flask sinon. Le JSON produit est le meme.
+class JSONProvider(DefaultJSONProvider):
+    default = staticmethod(_default)
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS).decode()
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        if orjson is None:
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=_default, option=_ORJSON_OPTIONS),
+            mimetype=self.mimetype
+        )
+
+
+def _negotiate_encoding() -> str | None:
+    candidates = (['zstd'] if zstandard is not None else []) + ['gzip']
+    return request.accept_encodings.best_match(candidates)
+
+
+def compress_body(data: bytes, encoding: str) -> bytes:
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    return gzip.compress(data, compresslevel=GZIP_LEVEL)
+
+
+# after_request de l'application : compresse les reponses JSON / HTML selon
+# l'Accept-Encoding du client (zstd de preference, sinon gzip). Le frontend,
+# via requests, decompresse de lui-meme.
+def compress_response(response: Response) -> Response:
+    if (response.direct_passthrough or response.status_code != 200
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in _COMPRESSIBLE_MIMETYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_BYTES:
+        return response
+
+    encoding = _negotiate_encoding()
+    if encoding is None:
+        return response
+    response.set_data(compress_body(data, encoding))
+    response.headers['Content-Encoding'] = encoding
+    return response
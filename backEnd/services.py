@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import json
 import math
 import statistics
 import logging
@@ -7,8 +8,10 @@ from math import erf, sqrt
 from typing import Any, Callable, Iterable
 
 import psycopg2.extras
+import trueskill
 
 from constants import (
+    DEFAULT_MU, DEFAULT_SIGMA, TRUESKILL_BETA, TRUESKILL_DRAW_PROBABILITY,
     DEFAULT_SIGMA_THRESHOLD,
     RANKED_SIGMA_LIMIT, GHOST_SIGMA_CAP,
     CHILLGUY_DELTA_LIMIT, BORDERLINE_INSTABILITY_THRESHOLD, BORDERLINE_AWARD_THRESHOLD,
@@ -19,8 +22,12 @@ from constants import (
     GM_MAX_RATIO_CAP, GM_MAX_IP, GM_BASE_WEIGHT_V1, GM_BASE_WEIGHT_V2, GM_EXTRA_MATCH_BONUS, REFERENCE_PLAYER_COUNT,
     IP_V2_FORCE_LOBBY_PER_MU, IP_V2_FORCE_LOBBY_MIN, IP_V2_FORCE_LOBBY_MAX, IP_VERSION_DEFAULT,
     IP_V2_REF_REQUIRE_TIER, IP_V2_REF_REQUIRE_RANKED,
+    DISTRIBUTION_KEEP_VERSIONS,
 )
 from db import get_db_connection
+from journal import journal_begin, journal_snapshot, journal_restore, journal_delete
+from profiles import invalidate_profiles
+from head_to_head import apply_head_to_head
 
 logger = logging.getLogger(__name__)
 
@@ -115,7 +122,10 @@ def compute_distribution_stats(scores: Iterable[float]) -> tuple[float, float] |
 
 
 def tier_thresholds(scores: Iterable[float]) -> dict[str, float]:
-    stats = compute_distribution_stats(scores)
+    return _thresholds_for(compute_distribution_stats(scores))
+
+
+def _thresholds_for(stats: tuple[float, float] | None) -> dict[str, float]:
     if stats is None:
         return {"S": 0, "A": 0, "B": 0, "C": 0}
     mean, stdev = stats
@@ -147,26 +157,37 @@ def _normal_pdf(x: float, mean: float, stdev: float) -> float:
     return (1 / (stdev * math.sqrt(2 * math.pi))) * math.exp(-0.5 * ((x - mean) / stdev) ** 2)
 
 
+def _distribution_curve(mean: float, stdev: float) -> list[dict]:
+    curve = []
+    x_min = mean - _CURVE_SPREAD * stdev
+    x_max = mean + _CURVE_SPREAD * stdev
+    step = (x_max - x_min) / _CURVE_RESOLUTION
+    x = x_min
+    while x <= x_max:
+        curve.append({"x": round(x, 2), "y": _normal_pdf(x, mean, stdev)})
+        x += step
+    return curve
+
+
+# stats / curve : moyenne, ecart-type et courbe deja calcules pour cette
+# population (cf distribution_stats), pour ne pas les recalculer a chaque appel.
 def build_distribution(
     players: Iterable[dict],
     score_fn: Callable[[dict], float | None],
+    stats: tuple[float, float] | None = None,
+    curve: list[dict] | None = None,
 ) -> dict:
     scored = [(p, score_fn(p)) for p in players]
     scored = [(p, s) for p, s in scored if s is not None]
-    stats = compute_distribution_stats(s for _, s in scored)
+    if stats is None:
+        stats = compute_distribution_stats(s for _, s in scored)
 
     dist: dict[str, list] = {"curve": [], "players": []}
     if stats is None:
         return dist
     mean, stdev = stats
 
-    x_min = mean - _CURVE_SPREAD * stdev
-    x_max = mean + _CURVE_SPREAD * stdev
-    step = (x_max - x_min) / _CURVE_RESOLUTION
-    x = x_min
-    while x <= x_max:
-        dist["curve"].append({"x": round(x, 2), "y": _normal_pdf(x, mean, stdev)})
-        x += step
+    dist["curve"] = curve if curve is not None else _distribution_curve(mean, stdev)
 
     for p, score in scored:
         dist["players"].append({
@@ -180,6 +201,126 @@ def build_distribution(
     return dist
 
 
+def _distribution_row(row: tuple) -> dict:
+    return {
+        "version": row[0],
+        "mean": row[1],
+        "stdev": row[2],
+        "count": row[3],
+        "sigma_threshold": row[4],
+        "thresholds": row[5],
+        "curve": row[6],
+    }
+
+
+def _compute_distribution(threshold: float, scores: list[float]) -> dict:
+    stats = compute_distribution_stats(scores)
+    mean, stdev = stats if stats is not None else (None, None)
+    return {
+        "version": None,
+        "mean": mean,
+        "stdev": stdev,
+        "count": len(scores),
+        "sigma_threshold": threshold,
+        "thresholds": _thresholds_for(stats),
+        "curve": _distribution_curve(mean, stdev) if stats is not None else [],
+    }
+
+
+# Enregistre la distribution TrueSkill de la population classee (joueurs avec
+# tier) comme nouvelle version de distribution_stats, si elle differe de la
+# precedente. Ecrit par recalculate_tiers : la distribution est donc toujours
+# celle qui a servi a attribuer les tiers en place.
+def save_distribution(cur: Any, threshold: float, scores: list[float]) -> dict:
+    dist = _compute_distribution(threshold, scores)
+
+    current = load_distribution(cur)
+    key = ("mean", "stdev", "count", "sigma_threshold")
+    if current is not None and all(current[k] == dist[k] for k in key):
+        return current
+
+    cur.execute("""
+        INSERT INTO distribution_stats (mean, stdev, count, sigma_threshold, thresholds, curve)
+        VALUES (%s, %s, %s, %s, %s, %s)
+        RETURNING version, mean, stdev, count, sigma_threshold, thresholds, curve
+    """, (dist["mean"], dist["stdev"], dist["count"], threshold,
+          json.dumps(dist["thresholds"]), json.dumps(dist["curve"])))
+    saved = _distribution_row(cur.fetchone())
+    cur.execute("DELETE FROM distribution_stats WHERE version <= %s", (saved["version"] - DISTRIBUTION_KEEP_VERSIONS,))
+    return saved
+
+
+def load_distribution(cur: Any) -> dict | None:
+    cur.execute("""
+        SELECT version, mean, stdev, count, sigma_threshold, thresholds, curve
+        FROM distribution_stats
+        ORDER BY version DESC LIMIT 1
+    """)
+    row = cur.fetchone()
+    return _distribution_row(row) if row else None
+
+
+# Distribution en vigueur. Ne relit la table Joueurs que si aucune version
+# n'a encore ete enregistree (base neuve avant le premier recalcul des tiers),
+# sans l'enregistrer : les lectures n'ecrivent pas.
+def current_distribution(cur: Any) -> dict:
+    dist = load_distribution(cur)
+    if dist is not None:
+        return dist
+    cur.execute("SELECT value FROM Configuration WHERE key = 'sigma_threshold'")
+    res = cur.fetchone()
+    threshold = float(res[0]) if res else DEFAULT_SIGMA_THRESHOLD
+    cur.execute("SELECT mu, sigma, is_ranked FROM Joueurs")
+    scores = [trueskill_score(mu, sigma) for mu, sigma, is_ranked in cur.fetchall() if has_tier(is_ranked, sigma, threshold)]
+    return _compute_distribution(threshold, scores)
+
+
+def distribution_ref_stats(dist: dict) -> tuple[float, float] | None:
+    if dist["mean"] is None or dist["stdev"] is None:
+        return None
+    return dist["mean"], dist["stdev"]
+
+
+def trueskill_env(tau: float) -> trueskill.TrueSkill:
+    return trueskill.TrueSkill(mu=DEFAULT_MU, sigma=DEFAULT_SIGMA, beta=TRUESKILL_BETA, tau=tau, draw_probability=TRUESKILL_DRAW_PROBABILITY)
+
+
+# Classement "1224" : les ex aequo partagent le meilleur rang, le suivant
+# saute d'autant. Les scores doivent etre tries par ordre decroissant.
+def _competition_ranks(scores: list[int]) -> list[int]:
+    ranks = []
+    last_s, rank = -1, 1
+    for i, score in enumerate(scores):
+        if score < last_s: rank = i + 1
+        ranks.append(rank)
+        last_s = score
+    return ranks
+
+
+# Calcule les nouvelles notes d'un lobby. entries : dicts {id, score, mu,
+# sigma, exclude_from_ts}. Retourne {id: (mu, sigma, position)} ; un joueur
+# exclu du TrueSkill garde sa note mais recoit quand meme sa position.
+def rate_lobby(ts_env: trueskill.TrueSkill, entries: list[dict]) -> dict[Any, tuple[float, float, int]]:
+    sorted_entries = sorted(entries, key=lambda e: e['score'], reverse=True)
+    positions = _competition_ranks([e['score'] for e in sorted_entries])
+
+    ts_entries = [e for e in sorted_entries if not e.get('exclude_from_ts')]
+    new_ratings = {}
+    if ts_entries:
+        ts_ranks = _competition_ranks([e['score'] for e in ts_entries])
+        rated = ts_env.rate(
+            [[trueskill.Rating(mu=float(e['mu']), sigma=float(e['sigma']))] for e in ts_entries],
+            ranks=ts_ranks
+        )
+        for e, (r,) in zip(ts_entries, rated):
+            new_ratings[e['id']] = (r.mu, r.sigma)
+
+    return {
+        e['id']: (*new_ratings.get(e['id'], (float(e['mu']), float(e['sigma']))), pos)
+        for e, pos in zip(sorted_entries, positions)
+    }
+
+
 def sync_sequences() -> None:
     with get_db_connection() as conn:
         with conn.cursor() as cur:
@@ -194,34 +335,55 @@ def sync_sequences() -> None:
         conn.commit()
 
 
-def recalculate_tiers() -> None:
+# Recalcule le tier de tous les joueurs a partir de la distribution courante.
+# Seuls les joueurs dont le tier change sont ecrits. op_ids liste les
+# operations du journal a l'origine du recalcul (plusieurs quand des taches
+# ont ete fusionnees) : le tier precedent est journalise dans la plus recente
+# encore presente, pour que son annulation le restaure. Une operation annulee
+# ou purgee entre-temps est ignoree ; s'il n'en reste aucune, rien n'est
+# journalise. raise_errors propage l'erreur apres rollback (worker : la tache
+# passe en echec au lieu d'etre marquee terminee).
+def recalculate_tiers(op_ids: Iterable[int] = (), raise_errors: bool = False) -> None:
     with get_db_connection() as conn:
         try:
             with conn.cursor() as cur:
+                op_id = None
+                if op_ids:
+                    cur.execute("""
+                        SELECT id FROM journal_operations
+                        WHERE id = ANY(%s)
+                        ORDER BY id DESC LIMIT 1
+                        FOR KEY SHARE
+                    """, (list(op_ids),))
+                    row = cur.fetchone()
+                    op_id = row[0] if row else None
+
                 cur.execute("SELECT value FROM Configuration WHERE key = 'sigma_threshold'")
                 res = cur.fetchone()
                 threshold = float(res[0]) if res else DEFAULT_SIGMA_THRESHOLD
 
-                cur.execute("SELECT id, mu, sigma, is_ranked FROM Joueurs")
+                cur.execute("SELECT id, mu, sigma, is_ranked, tier FROM Joueurs")
                 all_players = cur.fetchall()
 
                 valid_scores = [
                     trueskill_score(mu, sigma)
-                    for _, mu, sigma, is_ranked in all_players
+                    for _, mu, sigma, is_ranked, _ in all_players
                     if has_tier(is_ranked, sigma, threshold)
                 ]
-                stats = compute_distribution_stats(valid_scores)
+                stats = distribution_ref_stats(save_distribution(cur, threshold, valid_scores))
 
                 tier_updates = []
-                for pid, mu, sigma, is_ranked in all_players:
+                for pid, mu, sigma, is_ranked, current_tier in all_players:
                     if stats is not None and has_tier(is_ranked, sigma, threshold):
                         mean_score, std_dev = stats
                         new_tier = tier_for_score(trueskill_score(mu, sigma), mean_score, std_dev)
                     else:
                         new_tier = 'U'
-                    tier_updates.append((pid, new_tier))
+                    if (current_tier or '').strip() != new_tier:
+                        tier_updates.append((pid, new_tier))
 
                 if tier_updates:
+                    journal_snapshot(cur, op_id, [pid for pid, _ in tier_updates], ('tier',))
                     psycopg2.extras.execute_values(cur, """
                         UPDATE Joueurs AS j SET tier = data.tier
                         FROM (VALUES %s) AS data(id, tier)
@@ -231,6 +393,86 @@ def recalculate_tiers() -> None:
         except Exception as e:
             logger.error(f"Erreur recalcul tiers: {e}")
             conn.rollback()
+            if raise_errors:
+                raise
+
+
+# Recompte Joueurs.nb_tournois / nb_victoires (compteurs lus par /classement)
+# pour les joueurs donnes, tous si joueur_ids vaut None. A appeler apres toute
+# ecriture qui ajoute, supprime ou reclasse des participations.
+def refresh_player_counters(cur: Any, joueur_ids: Iterable[int] | None = None) -> None:
+    ids = None if joueur_ids is None else list(set(joueur_ids))
+    if ids is not None and not ids:
+        return
+    where = "" if ids is None else "WHERE j2.id = ANY(%s)"
+    cur.execute(f"""
+        UPDATE Joueurs AS j
+        SET nb_tournois = c.nb_tournois, nb_victoires = c.nb_victoires
+        FROM (
+            SELECT j2.id, COUNT(p.tournoi_id) AS nb_tournois,
+                   COUNT(*) FILTER (WHERE p.position = 1) AS nb_victoires
+            FROM Joueurs j2
+            LEFT JOIN Participations p ON p.joueur_id = j2.id
+            {where}
+            GROUP BY j2.id
+        ) AS c
+        WHERE j.id = c.id
+          AND (j.nb_tournois, j.nb_victoires) IS DISTINCT FROM (c.nb_tournois, c.nb_victoires)
+    """, () if ids is None else (ids,))
+
+
+# Resume d'un tournoi stocke sur sa ligne Tournois : effectif, vainqueur
+# (meilleur score), score moyen, somme et nombre des old_mu renseignes, et
+# session. A rappeler des que les participations d'un tournoi changent.
+#
+# La session regroupe les tournois d'une meme journee dans une meme ligue (un
+# matchmaking qui scinde un groupe en plusieurs lobbies) : c'est l'id de session
+# deja porte par un tournoi de la meme journee et de la meme ligue, a defaut
+# l'id du tournoi lui-meme. Une fois attribuee elle ne change plus.
+def refresh_tournoi_summary(cur: Any, tournoi_ids: Iterable[int]) -> None:
+    ids = list(set(tournoi_ids))
+    if not ids:
+        return
+    cur.execute("""
+        UPDATE Tournois AS t
+        SET nb_joueurs = s.nb_joueurs,
+            winner_id = s.winner_id,
+            avg_score = s.avg_score,
+            sum_old_mu = s.sum_old_mu,
+            nb_old_mu = s.nb_old_mu,
+            session_id = COALESCE(t.session_id, (
+                SELECT MIN(t2.session_id) FROM Tournois t2
+                WHERE t2.date = t.date AND t2.ligue_id IS NOT DISTINCT FROM t.ligue_id AND t2.id <> t.id
+            ), t.id)
+        FROM (
+            SELECT t0.id AS tournoi_id,
+                   COUNT(p.joueur_id) AS nb_joueurs,
+                   (ARRAY_AGG(p.joueur_id ORDER BY p.score DESC, p.position ASC)
+                        FILTER (WHERE p.joueur_id IS NOT NULL))[1] AS winner_id,
+                   AVG(p.score)::double precision AS avg_score,
+                   COALESCE(SUM(p.old_mu), 0) AS sum_old_mu,
+                   COUNT(p.old_mu) AS nb_old_mu
+            FROM Tournois t0
+            LEFT JOIN Participations p ON p.tournoi_id = t0.id
+            WHERE t0.id = ANY(%s)
+            GROUP BY t0.id
+        ) AS s
+        WHERE t.id = s.tournoi_id
+    """, (ids,))
+
+
+# Recalcule le pointeur vers le dernier tournoi de chaque ligue (cf
+# /dernier-tournoi). A rappeler apres tout ajout ou suppression de tournoi ;
+# il n'y a que quelques ligues, on repart donc de zero a chaque fois.
+def refresh_tournoi_pointers(cur: Any) -> None:
+    cur.execute("DELETE FROM tournoi_pointers")
+    cur.execute("""
+        INSERT INTO tournoi_pointers (ligue_nom, tournoi_id)
+        SELECT DISTINCT ON (ligue_nom) ligue_nom, id
+        FROM Tournois
+        WHERE ligue_nom IS NOT NULL AND ligue_nom != 'Mixte'
+        ORDER BY ligue_nom, date DESC, id DESC
+    """)
 
 
 # Fige la grille des joueurs pour cette journee, si elle ne l'est pas deja.
@@ -455,7 +697,38 @@ def _compute_borderline_scores(stats: dict) -> dict[Any, float]:
     return scores
 
 
-def compute_ip_evolution(d_debut: str, d_fin: str, recap_mode: str | None = None, specific_ligue_id: int | None = None, ip_version: str = IP_VERSION_DEFAULT) -> dict:
+# Colonnes du detail par point de compute_ip_evolution au format "columns".
+# La colonne score sert de masque : null = le joueur n'a pas joue ce tournoi.
+_IP_POINT_COLUMNS = ("position", "score", "ip_pur_v1", "ip_pur_v2", "ip_total_v1", "ip_total_v2")
+
+
+# Reconstitue le format historique (un dict par point) a partir des colonnes.
+def _ip_points_from_columns(columns: dict, data: list, dates: list[str], ip_version: str) -> list[dict | None]:
+    pur_key = "ip_pur_v2" if ip_version == "v2" else "ip_pur_v1"
+    points: list[dict | None] = []
+    for i, score in enumerate(columns["score"]):
+        if score is None:
+            points.append(None)
+            continue
+        points.append({
+            "date": dates[i],
+            "position": columns["position"][i],
+            "score": score,
+            "ip_pur_v1": columns["ip_pur_v1"][i],
+            "ip_pur_v2": columns["ip_pur_v2"][i],
+            "ip_pur": columns[pur_key][i],
+            "ip_total_v1": columns["ip_total_v1"][i],
+            "ip_total_v2": columns["ip_total_v2"][i],
+            "ip_total": data[i],
+        })
+    return points
+
+
+# Deux formats de sortie :
+# - "rows" (historique) : chaque dataset porte "points", un dict par tournoi ;
+# - "columns" : dates partagees au niveau racine, et par joueur des tableaux
+#   paralleles ("columns") alignes sur labels, null quand il n'a pas joue.
+def compute_ip_evolution(d_debut: str, d_fin: str, recap_mode: str | None = None, specific_ligue_id: int | None = None, ip_version: str = IP_VERSION_DEFAULT, fmt: str = "rows") -> dict:
     with get_db_connection() as conn:
         with conn.cursor() as cur:
             ligue_filter = ""
@@ -504,6 +777,7 @@ def compute_ip_evolution(d_debut: str, d_fin: str, recap_mode: str | None = None
                     period_count_mu += 1
 
     labels = [d.strftime("%d/%m") for _, d, _ in tournois]
+    dates = [d.strftime("%d/%m/%Y") for _, d, _ in tournois]
     tournoi_ids = [tid for tid, _, _ in tournois]
     tournoi_dates = {tid: d for tid, d, _ in tournois}
     tid_index = {tid: i for i, tid in enumerate(tournoi_ids)}
@@ -533,7 +807,7 @@ def compute_ip_evolution(d_debut: str, d_fin: str, recap_mode: str | None = None
     datasets = []
     for jid, p in players.items():
         data: list[float | None] = []
-        points: list[dict | None] = []
+        columns: dict[str, list] = {key: [] for key in _IP_POINT_COLUMNS}
         # v1 et v2 calcules en parallele pour pouvoir afficher les deux dans
         # le tooltip, quelle que soit la version active sur le graphique.
         num_total_v1 = 0.0
@@ -544,7 +818,6 @@ def compute_ip_evolution(d_debut: str, d_fin: str, recap_mode: str | None = None
         seen_first = False
         for idx in range(total_tournois):
             entry = p["by_idx"].get(idx)
-            point_detail = None
             if entry is not None:
                 score, position, own_old_mu = entry
                 seen_first = True
@@ -573,17 +846,10 @@ def compute_ip_evolution(d_debut: str, d_fin: str, recap_mode: str | None = None
                 num_total_v2 += ratio_v2 * poids_v2
                 denom_total_v2 += poids_v2
 
-                point_detail = {
-                    "date": tournoi_dates[tournoi_ids[idx]].strftime("%d/%m/%Y"),
-                    "position": int(position) if position is not None else None,
-                    "score": int(score),
-                    "ip_pur_v1": round(ratio_v1 * 100, 2),
-                    "ip_pur_v2": round(ratio_v2 * 100, 2),
-                }
-
             if not seen_first:
                 data.append(None)
-                points.append(None)
+                for column in columns.values():
+                    column.append(None)
                 continue
 
             bonus = max(0, matchs - seuil_participation) * GM_EXTRA_MATCH_BONUS
@@ -594,31 +860,47 @@ def compute_ip_evolution(d_debut: str, d_fin: str, recap_mode: str | None = None
             ip_total = ip_total_v2 if ip_version == "v2" else ip_total_v1
             data.append(ip_total)
 
-            if point_detail is not None:
-                point_detail["ip_pur"] = point_detail["ip_pur_v2"] if ip_version == "v2" else point_detail["ip_pur_v1"]
-                point_detail["ip_total_v1"] = ip_total_v1
-                point_detail["ip_total_v2"] = ip_total_v2
-                point_detail["ip_total"] = ip_total
-            points.append(point_detail)
+            if entry is not None:
+                columns["position"].append(int(position) if position is not None else None)
+                columns["score"].append(int(score))
+                columns["ip_pur_v1"].append(round(ratio_v1 * 100, 2))
+                columns["ip_pur_v2"].append(round(ratio_v2 * 100, 2))
+                columns["ip_total_v1"].append(ip_total_v1)
+                columns["ip_total_v2"].append(ip_total_v2)
+            else:
+                for column in columns.values():
+                    column.append(None)
 
         final_ip = next((v for v in reversed(data) if v is not None), 0.0)
-        datasets.append({
+        dataset = {
             "joueur_id": jid,
             "nom": p["nom"],
             "color": p["color"],
             "data": data,
-            "points": points,
             "final_ip": final_ip,
             "matchs": matchs,
             "eligible": matchs >= seuil_participation,
-        })
+        }
+        if fmt == "columns":
+            dataset["columns"] = columns
+        else:
+            dataset["points"] = _ip_points_from_columns(columns, data, dates, ip_version)
+        datasets.append(dataset)
 
     datasets.sort(key=lambda d: d["final_ip"], reverse=True)
 
+    if fmt == "columns":
+        return {
+            "format": "columns", "ip_version": ip_version,
+            "labels": labels, "dates": dates, "tournoi_ids": tournoi_ids, "datasets": datasets,
+        }
     return {"labels": labels, "tournoi_ids": tournoi_ids, "datasets": datasets}
 
 
-def compute_position_evolution(d_debut: str, d_fin: str, recap_mode: str | None = None, specific_ligue_id: int | None = None) -> dict:
+# Memes deux formats que compute_ip_evolution. En "columns", le detail par
+# point disparait : la date et l'effectif du tournoi sont au niveau racine
+# (dates, nb_joueurs), la position est deja dans data.
+def compute_position_evolution(d_debut: str, d_fin: str, recap_mode: str | None = None, specific_ligue_id: int | None = None, fmt: str = "rows") -> dict:
     with get_db_connection() as conn:
         with conn.cursor() as cur:
             ligue_filter = ""
@@ -649,37 +931,35 @@ def compute_position_evolution(d_debut: str, d_fin: str, recap_mode: str | None
             parts = cur.fetchall()
 
     labels = [d.strftime("%d/%m") for _, d in tournois]
+    dates = [d.strftime("%d/%m/%Y") for _, d in tournois]
     tournoi_ids = [tid for tid, _ in tournois]
-    tournoi_dates = {tid: d for tid, d in tournois}
     tid_index = {tid: i for i, tid in enumerate(tournoi_ids)}
     total_tournois = len(tournoi_ids)
 
     field_size = {}
     for tid, _jid, _nom, _col, _pos in parts:
         field_size[tid] = field_size.get(tid, 0) + 1
+    nb_joueurs = [field_size.get(tid, 0) for tid in tournoi_ids]
 
     players: dict[int, dict] = {}
     for tid, jid, nom, color, position in parts:
         p = players.setdefault(jid, {"nom": nom, "color": color or "#FFFFFF", "by_idx": {}})
         idx = tid_index.get(tid)
         if idx is not None and position is not None:
-            p["by_idx"][idx] = (int(position), field_size.get(tid, 0))
+            p["by_idx"][idx] = int(position)
 
     max_position = 1
     datasets = []
     for jid, p in players.items():
         data: list[int | None] = []
-        points: list[dict | None] = []
         sum_pos = 0
         matchs = 0
         wins = 0
         for idx in range(total_tournois):
-            entry = p["by_idx"].get(idx)
-            if entry is None:
+            position = p["by_idx"].get(idx)
+            if position is None:
                 data.append(None)
-                points.append(None)
                 continue
-            position, nb = entry
             matchs += 1
             sum_pos += position
             if position == 1:
@@ -687,27 +967,33 @@ def compute_position_evolution(d_debut: str, d_fin: str, recap_mode: str | None
             if position > max_position:
                 max_position = position
             data.append(position)
-            points.append({
-                "date": tournoi_dates[tournoi_ids[idx]].strftime("%d/%m/%Y"),
-                "position": position,
-                "nb_joueurs": nb,
-            })
 
         if matchs == 0:
             continue
-        datasets.append({
+        dataset = {
             "joueur_id": jid,
             "nom": p["nom"],
             "color": p["color"],
             "data": data,
-            "points": points,
             "moyenne_position": round(sum_pos / matchs, 2),
             "victoires": wins,
             "matchs": matchs,
-        })
+        }
+        if fmt != "columns":
+            dataset["points"] = [
+                {"date": dates[i], "position": pos, "nb_joueurs": nb_joueurs[i]} if pos is not None else None
+                for i, pos in enumerate(data)
+            ]
+        datasets.append(dataset)
 
     datasets.sort(key=lambda d: (d["moyenne_position"], -d["victoires"]))
 
+    if fmt == "columns":
+        return {
+            "format": "columns",
+            "labels": labels, "dates": dates, "nb_joueurs": nb_joueurs, "tournoi_ids": tournoi_ids,
+            "datasets": datasets, "max_position": max_position,
+        }
     return {"labels": labels, "tournoi_ids": tournoi_ids, "datasets": datasets, "max_position": max_position}
 
 
@@ -775,7 +1061,8 @@ def _aggregate_season_stats(d_debut: str, d_fin: str, recap_mode: str | None = N
                 SELECT
                     j.id, j.nom, p.score, p.position,
                     p.new_score_trueskill, p.mu, p.sigma,
-                    t.date, p.tournoi_id, j.sigma, t.ligue_id, p.old_mu
+                    t.date, p.tournoi_id, j.sigma, t.ligue_id, p.old_mu,
+                    t.nb_joueurs, t.avg_score, t.sum_old_mu, t.nb_old_mu, t.session_id
                 FROM Participations p
                 JOIN Tournois t ON p.tournoi_id = t.id
                 JOIN Joueurs j ON p.joueur_id = j.id
@@ -801,39 +1088,34 @@ def _aggregate_season_stats(d_debut: str, d_fin: str, recap_mode: str | None = N
 
             # Repli pour les journees sans grille figee : mu moyen de la periode.
             cur.execute("""
-                SELECT p.old_mu
-                FROM Participations p
-                JOIN Tournois t ON p.tournoi_id = t.id
-                WHERE t.date >= %s AND t.date <= %s
+                SELECT COALESCE(SUM(sum_old_mu), 0), COALESCE(SUM(nb_old_mu), 0)
+                FROM Tournois
+                WHERE date >= %s AND date <= %s
             """, [d_debut, d_fin])
-            period_sum_mu = 0.0
-            period_count_mu = 0
-            for (old_mu,) in cur.fetchall():
-                if old_mu is not None:
-                    period_sum_mu += float(old_mu)
-                    period_count_mu += 1
-
+            period_sum_mu, period_count_mu = cur.fetchone()
+            period_sum_mu, period_count_mu = float(period_sum_mu), int(period_count_mu)
+
+        # Resume de chaque tournoi, stocke a l'ecriture (cf refresh_tournoi_summary).
+        # Les scores etant entiers, la somme se deduit exactement de la moyenne.
+        # Une session (ex: matchmaking qui scinde un gros groupe) peut generer
+        # plusieurs tournois le meme jour dans la meme ligue : ils partagent le
+        # meme session_id et ne comptent que pour un.
         tournoi_meta = {}
         session_keys = {}
         for row in rows:
             tid = row[8]
-            score = float(row[2])
-            old_mu = row[11]
-            if tid not in tournoi_meta:
-                tournoi_meta[tid] = {"sum_score": 0.0, "count": 0, "sum_mu": 0.0, "count_mu": 0}
-                # Une session (ex: matchmaking qui scinde un gros groupe) peut generer
-                # plusieurs tournois le meme jour dans la meme ligue. On les regroupe
-                # ici comme pour la penalisation d'absence (cf routes_admin.py).
-                session_keys[tid] = (row[7], row[10])
-            tournoi_meta[tid]["count"] += 1
-            tournoi_meta[tid]["sum_score"] += score
-            if old_mu is not None:
-                tournoi_meta[tid]["sum_mu"] += float(old_mu)
-                tournoi_meta[tid]["count_mu"] += 1
-
-        for tid, meta in tournoi_meta.items():
-            meta["avg_score"] = meta["sum_score"] / meta["count"] if meta["count"] > 0 else 1.0
+            if tid in tournoi_meta:
+                continue
+            nb, avg_score, sum_mu, nb_mu, session_id = row[12:17]
+            tournoi_meta[tid] = {
+                "count": nb,
+                "avg_score": float(avg_score) if nb > 0 else 1.0,
+                "sum_score": float(round(float(avg_score) * nb)),
+                "sum_mu": float(sum_mu),
+                "count_mu": nb_mu,
+            }
             # avg_old_mu leave-one-out : calcule par joueur plus bas (cf _leave_one_out).
+            session_keys[tid] = session_id
 
         total_tournois = len(set(session_keys.values()))
         min_participation_req = total_tournois * MIN_PARTICIPATION_RATIO
@@ -1042,9 +1324,10 @@ def _determine_winners(candidates: dict, vic_cond: str, active_awards: list[str]
 def _save_awards_to_db(conn: Any, season_id: int, top_3: list[dict], special_winners_map: dict, is_yearly: bool, ligue_info: dict | None = None) -> None:
     with conn.cursor() as cur:
         if ligue_info:
-            cur.execute("DELETE FROM awards_obtenus WHERE saison_id = %s AND ligue_id = %s", (season_id, ligue_info['id']))
+            cur.execute("DELETE FROM awards_obtenus WHERE saison_id = %s AND ligue_id = %s RETURNING joueur_id", (season_id, ligue_info['id']))
         else:
-            cur.execute("DELETE FROM awards_obtenus WHERE saison_id = %s AND ligue_id IS NULL", (season_id,))
+            cur.execute("DELETE FROM awards_obtenus WHERE saison_id = %s AND ligue_id IS NULL RETURNING joueur_id", (season_id,))
+        touched = {r[0] for r in cur.fetchall()}
 
         cur.execute("SELECT code, id FROM types_awards")
         types_map = {r[0]: r[1] for r in cur.fetchall()}
@@ -1068,6 +1351,7 @@ def _save_awards_to_db(conn: Any, season_id: int, top_3: list[dict], special_win
                     INSERT INTO awards_obtenus (joueur_id, saison_id, award_id, valeur, is_league_award, ligue_id, ligue_nom, ligue_couleur)
                     VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
                 """, (player['id'], season_id, types_map[code_award], valeur_str, is_league, l_id, l_nom, l_couleur))
+                touched.add(player['id'])
 
         for code, winners in special_winners_map.items():
             if code in types_map:
@@ -1078,16 +1362,21 @@ def _save_awards_to_db(conn: Any, season_id: int, top_3: list[dict], special_win
                         INSERT INTO awards_obtenus (joueur_id, saison_id, award_id, valeur, is_league_award, ligue_id, ligue_nom, ligue_couleur)
                         VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
                     """, (w['id'], season_id, award_id, val_str, is_league, l_id, l_nom, l_couleur))
+                    touched.add(w['id'])
 
+        invalidate_profiles(cur, touched)
         cur.execute("UPDATE saisons SET is_active = true WHERE id = %s", (season_id,))
     conn.commit()
 
 
-def _apply_inter_league_moves(conn: Any, moves_count: int, ranking_data: dict, rankings_by_ligue: dict | None = None) -> list[dict]:
+# Si saison_id est fourni, la ligue d'origine des joueurs deplaces est
+# journalisee dans une operation 'league_moves' rattachee a cette saison.
+def _apply_inter_league_moves(conn: Any, moves_count: int, ranking_data: dict, rankings_by_ligue: dict | None = None, saison_id: int | None = None) -> list[dict]:
     if moves_count <= 0:
         return []
 
     movements = []
+    op_id = None
 
     with conn.cursor() as cur:
         cur.execute("SELECT id, nom, niveau FROM Ligues ORDER BY niveau ASC")
@@ -1122,6 +1411,12 @@ def _apply_inter_league_moves(conn: Any, moves_count: int, ranking_data: dict, r
             )
             promus = joueurs_basse_sorted[:moves_count]
 
+            moved_ids = [jid for jid, _ in relegues + promus]
+            if saison_id is not None and moved_ids:
+                if op_id is None:
+                    op_id = journal_begin(cur, 'league_moves', saison_id, "Mouvements inter-ligues")
+                journal_snapshot(cur, op_id, moved_ids, ('ligue_id',))
+
             for jid, jnom in relegues:
                 cur.execute("UPDATE Joueurs SET ligue_id = %s WHERE id = %s", (ligue_basse_id, jid))
                 movements.append({
@@ -1143,3 +1438,229 @@ def _apply_inter_league_moves(conn: Any, moves_count: int, ranking_data: dict, r
                 })
 
     return movements
+
+
+# Annule les operations du journal donnees (de la plus recente a la plus
+# ancienne) : restauration des deltas joueurs, puis nettoyage propre a chaque
+# type d'operation. Ne commit pas et ne recalcule pas les tiers : c'est a
+# l'appelant de le faire une fois toutes les operations annulees.
+def undo_journal_operations(cur: Any, operations: list[dict]) -> list[dict]:
+    undone = []
+    for op in operations:
+        nb_joueurs = journal_restore(cur, op['id'])
+
+        if op['kind'] == 'tournament' and op['ref_id'] is not None:
+            cur.execute("""
+                SELECT joueur_id FROM Participations WHERE tournoi_id = %s
+                UNION SELECT joueur_id FROM ghost_log WHERE tournoi_id = %s
+            """, (op['ref_id'], op['ref_id']))
+            touched = [r[0] for r in cur.fetchall()]
+            invalidate_profiles(cur, touched)
+            cur.execute("SELECT date FROM Tournois WHERE id = %s", (op['ref_id'],))
+            row = cur.fetchone()
+            apply_head_to_head(cur, [op['ref_id']], -1)
+            cur.execute("DELETE FROM Tournois WHERE id = %s", (op['ref_id'],))
+            refresh_player_counters(cur, touched)
+            refresh_tournoi_pointers(cur)
+            if row:
+                drop_grille_snapshot_if_orphan(cur, row[0])
+        elif op['kind'] == 'global_reset' and op['ref_id'] is not None:
+            cur.execute("DELETE FROM global_resets WHERE id = %s", (op['ref_id'],))
+            invalidate_profiles(cur)
+        elif op['kind'] == 'league_moves' and op['ref_id'] is not None:
+            cur.execute("DELETE FROM league_movements WHERE saison_id = %s", (op['ref_id'],))
+
+        journal_delete(cur, op['id'])
+        undone.append({**op, "nb_joueurs": nb_joueurs})
+    return undone
+
+
+def _read_league_moves_config(cur: Any) -> tuple[bool, int]:
+    cur.execute("SELECT value FROM Configuration WHERE key = 'league_mode_enabled'")
+    league_row = cur.fetchone()
+    league_enabled = (league_row[0] == 'true') if league_row else False
+
+    cur.execute("SELECT value FROM Configuration WHERE key = 'inter_league_moves'")
+    moves_row = cur.fetchone()
+    moves_count = int(moves_row[0]) if moves_row else 0
+    return league_enabled, moves_count
+
+
+def _record_league_movements(cur: Any, saison_id: int, movements: list[dict]) -> None:
+    for m in movements:
+        cur.execute("SELECT id FROM Ligues WHERE nom = %s", (m['from'],))
+        from_row = cur.fetchone()
+        from_ligue_id = from_row[0] if from_row else None
+
+        cur.execute("SELECT id FROM Ligues WHERE nom = %s", (m['to'],))
+        to_row = cur.fetchone()
+        to_ligue_id = to_row[0] if to_row else None
+
+        cur.execute("""
+            INSERT INTO league_movements (saison_id, joueur_id, from_ligue_id, to_ligue_id,
+                from_ligue_nom, to_ligue_nom, direction)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+        """, (saison_id, m['joueur_id'], from_ligue_id, to_ligue_id, m['from'], m['to'], m['direction']))
+
+
+# Mouvements inter-ligues deja enregistres pour la saison, au format de
+# _apply_inter_league_moves. Une publication rejouee (tache remise en attente
+# apres un arret du worker, second clic) les renvoie au lieu de deplacer les
+# joueurs une seconde fois. Le verrou sur la saison serialise deux
+# publications concurrentes : la seconde attend le commit de la premiere et
+# voit ses mouvements.
+def _recorded_league_movements(cur: Any, saison_id: int) -> list[dict]:
+    cur.execute("SELECT 1 FROM saisons WHERE id = %s FOR UPDATE", (saison_id,))
+    cur.execute("""
+        SELECT m.joueur_id, j.nom, m.from_ligue_nom, m.to_ligue_nom, m.direction
+        FROM league_movements m
+        JOIN Joueurs j ON j.id = m.joueur_id
+        WHERE m.saison_id = %s
+        ORDER BY m.id
+    """, (saison_id,))
+    return [
+        {"joueur_id": jid, "nom": nom, "from": from_nom, "to": to_nom, "direction": direction}
+        for jid, nom, from_nom, to_nom, direction in cur.fetchall()
+    ]
+
+
+def _league_rankings(d_debut: Any, d_fin: Any, ligues: list[tuple], ip_version: str) -> tuple[dict, dict]:
+    all_rankings = {}
+    stats_by_ligue = {}
+    for ligue_id, _, _ in ligues:
+        ligue_stats = _aggregate_season_stats(d_debut, d_fin, 'league', ligue_id, ip_version)
+        gm_list = ligue_stats['candidates'].get('grand_master', [])
+        gm_sorted = sorted(gm_list, key=lambda x: x.get('final_score', 0), reverse=True)
+        all_rankings[ligue_id] = {p['id']: rank for rank, p in enumerate(gm_sorted, 1)}
+        stats_by_ligue[ligue_id] = ligue_stats
+    return all_rankings, stats_by_ligue
+
+
+# Publication d'une saison : calcul des awards (une ou plusieurs agregations
+# completes de la saison) et mouvements inter-ligues eventuels. Execute par le
+# worker (tache 'publish_season'), hors de la requete HTTP. Leve ValueError
+# avec un message affichable si la saison ne peut pas etre publiee. Rejouable :
+# les awards sont recalcules, les mouvements deja enregistres ne sont pas
+# reappliques (ils sont commites avec leur trace dans league_movements).
+def publish_season(saison_id: int, move_criterion: str | None = None) -> dict:
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT date_debut, date_fin, config_awards, victory_condition, is_yearly, ligue_id, is_league_recap,
+                       include_league_stats, include_league_moves, ip_version
+                FROM saisons WHERE id = %s
+            """, (saison_id,))
+            row = cur.fetchone()
+            if not row:
+                raise ValueError("Saison introuvable")
+
+            d_debut, d_fin, config, vic_cond, is_yearly, saison_ligue_id, is_league_recap, include_league_stats, include_league_moves, ip_version = row
+            active_awards = config.get('active_awards', [])
+            movements = []
+
+            if is_league_recap or include_league_stats or include_league_moves:
+                cur.execute("""
+                    SELECT DISTINCT l.id, l.nom, l.niveau, l.couleur
+                    FROM Ligues l
+                    JOIN Tournois t ON t.ligue_id = l.id
+                    WHERE t.date >= %s AND t.date <= %s
+                    ORDER BY l.niveau ASC
+                """, (d_debut, d_fin))
+                ligues = [(r[0], r[1], r[3]) for r in cur.fetchall()]
+            else:
+                ligues = []
+
+            if is_league_recap:
+                if not ligues:
+                    raise ValueError("Aucun tournoi de ligue pendant cette période")
+
+                cur.execute("DELETE FROM awards_obtenus WHERE saison_id = %s RETURNING joueur_id", (saison_id,))
+                invalidate_profiles(cur, [r[0] for r in cur.fetchall()])
+                conn.commit()
+
+                all_rankings, stats_by_ligue = _league_rankings(d_debut, d_fin, ligues, ip_version)
+                for ligue_id, ligue_nom, ligue_couleur in ligues:
+                    ligue_stats = stats_by_ligue[ligue_id]
+                    top_3, winners_map = _determine_winners(
+                        ligue_stats['candidates'], vic_cond, active_awards, ligue_stats['total_tournois']
+                    )
+                    ligue_info = {'id': ligue_id, 'nom': ligue_nom, 'couleur': ligue_couleur}
+                    _save_awards_to_db(conn, saison_id, top_3, winners_map, is_yearly, ligue_info=ligue_info)
+
+                if move_criterion:
+                    league_enabled, moves_count = _read_league_moves_config(cur)
+                    movements = _recorded_league_movements(cur, saison_id)
+                    if league_enabled and moves_count > 0 and not movements:
+                        if move_criterion == "ip":
+                            movements = _apply_inter_league_moves(conn, moves_count, {}, rankings_by_ligue=all_rankings, saison_id=saison_id)
+                        else:
+                            cur.execute("SELECT id, score_trueskill FROM Joueurs WHERE ligue_id IS NOT NULL ORDER BY score_trueskill DESC")
+                            ranking_data = {r[0]: rank for rank, r in enumerate(cur.fetchall(), 1)}
+                            movements = _apply_inter_league_moves(conn, moves_count, ranking_data, saison_id=saison_id)
+                        _record_league_movements(cur, saison_id, movements)
+
+                cur.execute("UPDATE saisons SET is_active = true WHERE id = %s", (saison_id,))
+
+            elif saison_ligue_id:
+                cur.execute("""
+                    SELECT COUNT(*) FROM Tournois
+                    WHERE date >= %s AND date <= %s AND ligue_id = %s
+                """, (d_debut, d_fin, saison_ligue_id))
+                if cur.fetchone()[0] == 0:
+                    raise ValueError("Aucun tournoi pour cette ligue pendant cette période")
+                global_stats = _aggregate_season_stats(d_debut, d_fin, 'league', saison_ligue_id, ip_version)
+
+                top_3, winners_map = _determine_winners(
+                    global_stats['candidates'], vic_cond, active_awards, global_stats['total_tournois']
+                )
+                _save_awards_to_db(conn, saison_id, top_3, winners_map, is_yearly)
+
+                if move_criterion:
+                    league_enabled, moves_count = _read_league_moves_config(cur)
+                    movements = _recorded_league_movements(cur, saison_id)
+                    if league_enabled and moves_count > 0 and not movements:
+                        if move_criterion == "ip":
+                            gm_list = global_stats['candidates'].get('grand_master', [])
+                            gm_sorted = sorted(gm_list, key=lambda x: x.get('final_score', 0), reverse=True)
+                            ranking_data = {p['id']: rank for rank, p in enumerate(gm_sorted, 1)}
+                        else:
+                            cur.execute("SELECT id, score_trueskill FROM Joueurs WHERE ligue_id IS NOT NULL ORDER BY score_trueskill DESC")
+                            ranking_data = {r[0]: rank for rank, r in enumerate(cur.fetchall(), 1)}
+                        movements = _apply_inter_league_moves(conn, moves_count, ranking_data, saison_id=saison_id)
+                        _record_league_movements(cur, saison_id, movements)
+            else:
+                cur.execute("""
+                    SELECT COUNT(*) FROM Tournois
+                    WHERE date >= %s AND date <= %s AND ligue_id IS NULL
+                """, (d_debut, d_fin))
+                if cur.fetchone()[0] == 0:
+                    raise ValueError("Aucun tournoi en mode classique pendant cette période")
+                global_stats = _aggregate_season_stats(d_debut, d_fin, 'classic', None, ip_version)
+
+                top_3, winners_map = _determine_winners(
+                    global_stats['candidates'], vic_cond, active_awards, global_stats['total_tournois']
+                )
+                _save_awards_to_db(conn, saison_id, top_3, winners_map, is_yearly)
+
+                if ligues and include_league_moves and move_criterion:
+                    all_rankings, _ = _league_rankings(d_debut, d_fin, ligues, ip_version)
+                    league_enabled, moves_count = _read_league_moves_config(cur)
+                    movements = _recorded_league_movements(cur, saison_id)
+                    if league_enabled and moves_count > 0 and not movements:
+                        if move_criterion == "ip":
+                            movements = _apply_inter_league_moves(conn, moves_count, {}, rankings_by_ligue=all_rankings, saison_id=saison_id)
+                        else:
+                            cur.execute("SELECT id, score_trueskill FROM Joueurs WHERE ligue_id IS NOT NULL ORDER BY score_trueskill DESC")
+                            ranking_data = {r[0]: rank for rank, r in enumerate(cur.fetchall(), 1)}
+                            movements = _apply_inter_league_moves(conn, moves_count, ranking_data, saison_id=saison_id)
+                        _record_league_movements(cur, saison_id, movements)
+
+                cur.execute("UPDATE saisons SET is_active = true WHERE id = %s", (saison_id,))
+
+        conn.commit()
+
+    response = {'status': 'success', 'message': 'Saison publiée et awards distribués !'}
+    if movements:
+        response['movements'] = movements
+        response['message'] += f' {len(movements)} mouvements inter-ligue effectués.'
+    return response
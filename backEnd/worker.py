@@ -0,0 +1,135 @@
+from __future__ import annotations
+
+import logging
+import select
+import time
+from typing import Any
+
+import psycopg2
+import psycopg2.extensions
+
+from constants import JOB_CHANNEL, JOB_POLL_SECONDS, JOB_RETENTION_DAYS
+from db import (
+    get_db_connection,
+    POSTGRES_DB, POSTGRES_USER, POSTGRES_PASSWORD, POSTGRES_HOST, POSTGRES_PORT,
+)
+from cache import invalidate_cache
+from jobs import claim_job, complete_job, fail_job, requeue_stale_jobs, purge_finished_jobs
+from services import recalculate_tiers, publish_season
+from profiles import rebuild_dirty_profiles
+from head_to_head import rebuild_head_to_head
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+logger = logging.getLogger("worker")
+
+
+def _handle_recalculate_tiers(payload: dict) -> dict:
+    recalculate_tiers(payload.get('op_ids', []), raise_errors=True)
+    invalidate_cache()
+    return {}
+
+
+def _handle_publish_season(payload: dict) -> dict:
+    result = publish_season(payload['saison_id'], payload.get('move_criterion'))
+    invalidate_cache()
+    return result
+
+
+def _handle_rebuild_profiles(payload: dict) -> dict:
+    with get_db_connection() as conn:
+        return {"profils": rebuild_dirty_profiles(conn)}
+
+
+def _handle_rebuild_head_to_head(payload: dict) -> dict:
+    with get_db_connection() as conn:
+        result = {"tournois": rebuild_head_to_head(conn)}
+    invalidate_cache()
+    return result
+
+
+HANDLERS = {
+    'recalculate_tiers': _handle_recalculate_tiers,
+    'publish_season': _handle_publish_season,
+    'rebuild_profiles': _handle_rebuild_profiles,
+    'rebuild_head_to_head': _handle_rebuild_head_to_head,
+}
+
+
+# Execute les taches en attente une par une jusqu'a vider la file. Chaque
+# tache est reservee dans sa propre transaction, puis executee hors de
+# celle-ci : les handlers ouvrent leurs propres connexions.
+def run_pending_jobs() -> int:
+    done = 0
+    while True:
+        with get_db_connection() as conn:
+            with conn.cursor() as cur:
+                job = claim_job(cur)
+            conn.commit()
+        if not job:
+            return done
+
+        job_id, kind, payload = job
+        handler = HANDLERS.get(kind)
+        try:
+            if handler is None:
+                raise ValueError(f"Type de tâche inconnu : {kind}")
+            result = handler(payload or {})
+            with get_db_connection() as conn:
+                with conn.cursor() as cur:
+                    complete_job(cur, job_id, result)
+                conn.commit()
+            logger.info(f"Tache {job_id} ({kind}) terminee")
+        except Exception as e:
+            logger.error(f"Tache {job_id} ({kind}) en echec: {e}")
+            with get_db_connection() as conn:
+                conn.rollback()
+                with conn.cursor() as cur:
+                    fail_job(cur, job_id, str(e))
+                conn.commit()
+        done += 1
+
+
+def _listen_connection() -> Any:
+    conn = psycopg2.connect(
+        user=POSTGRES_USER,
+        password=POSTGRES_PASSWORD,
+        host=POSTGRES_HOST,
+        port=POSTGRES_PORT,
+        database=POSTGRES_DB
+    )
+    conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+    with conn.cursor() as cur:
+        cur.execute(f"LISTEN {JOB_CHANNEL}")
+    return conn
+
+
+# Boucle principale : vide la file, puis attend un NOTIFY (ou JOB_POLL_SECONDS
+# au plus, au cas ou une notification serait perdue pendant une reconnexion).
+def main() -> None:
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            requeued = requeue_stale_jobs(cur)
+            purge_finished_jobs(cur, JOB_RETENTION_DAYS)
+        conn.commit()
+    if requeued:
+        logger.info(f"{requeued} tache(s) interrompue(s) remise(s) en attente")
+
+    listen_conn = None
+    while True:
+        try:
+            if listen_conn is None or listen_conn.closed:
+                listen_conn = _listen_connection()
+            run_pending_jobs()
+            if select.select([listen_conn], [], [], JOB_POLL_SECONDS) != ([], [], []):
+                listen_conn.poll()
+                listen_conn.notifies.clear()
+        except psycopg2.Error as e:
+            logger.error(f"Erreur base de donnees: {e}")
+            if listen_conn is not None:
+                listen_conn.close()
+            listen_conn = None
+            time.sleep(JOB_POLL_SECONDS)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,11 +1,20 @@
 import os
 import sys
+import json
+import hashlib
 import logging
 import requests
 import time
-from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify
+import threading
+from collections import OrderedDict
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import EmptyPoolError
+from urllib3.util.retry import Retry
+from flask import Flask, render_template, request, redirect, url_for, session, flash, jsonify, g
 from datetime import timedelta, date
 from flask_wtf.csrf import CSRFProtect
+from werkzeug.local import LocalProxy
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -36,6 +45,78 @@ app.config['SESSION_COOKIE_SECURE'] = (os.environ.get('TLS_MODE', 'http') == 'ht
 
 csrf = CSRFProtect(app)
 
+# Appels au backend : une session HTTP par processus, dont les connexions
+# keep-alive sont reutilisees d'une requete a l'autre au lieu d'ouvrir une
+# connexion TCP par appel.
+# Delais (connexion, lecture) en secondes : BACKEND_TIMEOUT par defaut,
+# BACKEND_TIMEOUT_FAST pour les verifications faites a chaque page,
+# BACKEND_TIMEOUT_WRITE pour les ecritures admin qui rejouent l'historique.
+# Un echec de connexion est retente quelle que soit la methode (la requete
+# n'est pas partie) ; une connexion coupee pendant la reponse, typiquement une
+# connexion keep-alive fermee entre-temps par le backend, n'est retentee que
+# pour les GET, les ecritures n'etant pas idempotentes.
+# Avec les workers gevent, un processus sert des centaines de requetes a la
+# fois : au-dela de BACKEND_POOL_SIZE appels simultanes, les suivants
+# attendent qu'une connexion se libere plutot que d'ouvrir des connexions
+# jetables, ce qui borne la charge envoyee au backend. Cette attente est
+# elle-meme bornee a BACKEND_POOL_TIMEOUT secondes : si le backend ralentit,
+# les pages echouent vite au lieu de s'empiler derriere le pool.
+BACKEND_POOL_SIZE = 32
+BACKEND_POOL_TIMEOUT = 1
+BACKEND_TIMEOUT = (1, 5)
+BACKEND_TIMEOUT_FAST = (0.5, 1)
+BACKEND_TIMEOUT_WRITE = (1, 30)
+
+
+# requests ne transmet pas de pool_timeout a urllib3 : sans ces pools, un
+# appel qui trouve le pool plein attendrait sans limite, hors des delais
+# BACKEND_TIMEOUT*.
+class BoundedWaitHTTPConnectionPool(HTTPConnectionPool):
+    def urlopen(self, *args, **kwargs):
+        kwargs.setdefault('pool_timeout', BACKEND_POOL_TIMEOUT)
+        return super().urlopen(*args, **kwargs)
+
+
+class BoundedWaitHTTPSConnectionPool(HTTPSConnectionPool):
+    def urlopen(self, *args, **kwargs):
+        kwargs.setdefault('pool_timeout', BACKEND_POOL_TIMEOUT)
+        return super().urlopen(*args, **kwargs)
+
+
+# Pool plein au-dela de BACKEND_POOL_TIMEOUT : l'appel echoue comme une
+# connexion impossible (ConnectTimeout), que les appelants traitent deja.
+class BackendHTTPAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': BoundedWaitHTTPConnectionPool,
+            'https': BoundedWaitHTTPSConnectionPool,
+        }
+
+    def send(self, request, *args, **kwargs):
+        try:
+            return super().send(request, *args, **kwargs)
+        except EmptyPoolError as e:
+            raise requests.exceptions.ConnectTimeout(e, request=request)
+
+
+def create_backend_session():
+    retry = Retry(
+        total=2, connect=2, read=1, status=0, other=0,
+        backoff_factor=0.05,
+        allowed_methods=frozenset({'GET', 'HEAD'}),
+        raise_on_status=False,
+    )
+    adapter = BackendHTTPAdapter(pool_connections=1, pool_maxsize=BACKEND_POOL_SIZE, pool_block=True,
+                                 max_retries=retry)
+    http = requests.Session()
+    http.mount('http://', adapter)
+    http.mount('https://', adapter)
+    return http
+
+
+backend_session = create_backend_session()
+
 APP_VERSION = "1.4.3"
 
 @app.context_processor
@@ -43,6 +124,83 @@ def inject_version():
     return dict(app_version=APP_VERSION)
 
 
+# Assets compiles par scripts/build_static.py (make static) : noms empreintes,
+# variantes gzip/brotli et atlas des sprites du bandeau, servis par nginx
+# directement depuis le disque. Si le manifeste existe, url_for('static', ...)
+# renvoie le nom empreinte et Flask sert le dossier compile (utile sans
+# nginx) ; sinon, rien ne change.
+STATIC_DIST_DIR = os.environ.get('STATIC_DIST_DIR', os.path.join(app.root_path, 'static-dist'))
+
+
+def load_static_manifest():
+    try:
+        with open(os.path.join(STATIC_DIST_DIR, 'manifest.json')) as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Manifeste des assets illisible, assets non empreintes : {e}")
+        return None
+    logger.info(f"✅ Assets compilés : {len(manifest['files'])} fichiers empreintes")
+    return manifest
+
+
+static_manifest = load_static_manifest()
+if static_manifest:
+    app.static_folder = STATIC_DIST_DIR
+
+
+# Identifiant du build servi : empreinte des templates, du manifeste des
+# assets et de ce fichier, calculee au demarrage. Elle entre dans la version
+# des pages (ETag, cle du cache nginx) : un template ou un asset modifie
+# invalide les pages en cache des le redemarrage, sans attendre une ecriture
+# en base ou le lendemain.
+def compute_build_id():
+    digest = hashlib.sha256()
+    paths = [os.path.abspath(__file__), os.path.join(STATIC_DIST_DIR, 'manifest.json')]
+    for dirpath, dirnames, filenames in os.walk(os.path.join(app.root_path, app.template_folder)):
+        dirnames.sort()
+        paths.extend(os.path.join(dirpath, filename) for filename in sorted(filenames))
+    for path in paths:
+        try:
+            with open(path, 'rb') as f:
+                content = f.read()
+        except OSError:
+            continue
+        digest.update(os.path.relpath(path, app.root_path).encode())
+        digest.update(content)
+    return digest.hexdigest()[:10]
+
+
+BUILD_ID = compute_build_id()
+
+
+@app.url_defaults
+def fingerprint_static_url(endpoint, values):
+    if endpoint == 'static' and static_manifest and 'filename' in values:
+        values['filename'] = static_manifest['files'].get(values['filename'], values['filename'])
+
+
+# Atlas du bandeau pour smk-banner.js : URL des feuilles et, par image
+# d'origine, sa position dans la feuille. None sans assets compiles.
+def banner_sprite_atlases():
+    if not static_manifest or not static_manifest.get('atlases'):
+        return None
+    return [
+        {
+            'png': url_for('static', filename=atlas['png']),
+            'webp': url_for('static', filename=atlas['webp']),
+            'frames': atlas['frames'],
+        }
+        for atlas in static_manifest['atlases']
+    ]
+
+
+@app.context_processor
+def inject_static_assets():
+    return dict(banner_sprite_atlases=banner_sprite_atlases)
+
+
 @app.before_request
 def check_admin_token_validity():
     if request.path.startswith('/static'):
@@ -51,10 +209,10 @@ def check_admin_token_validity():
     if 'admin_token' in session:
         token = session['admin_token']
         try:
-            response = requests.get(
+            response = backend_session.get(
                 f"{BACKEND_URL}/admin/check-token",
                 headers={'X-Admin-Token': token},
-                timeout=1
+                timeout=BACKEND_TIMEOUT_FAST
             )
             
             if response.status_code != 200:
@@ -78,31 +236,57 @@ def inject_lifetime():
     
     return dict(session_lifetime=total_lifetime)
 
+# Menu des saisons : garde par processus avec la version des donnees du
+# backend pour laquelle il a ete lu, il n'est relu qu'apres une ecriture. La
+# version est celle deja lue pour l'ETag de la page (check_data_version) ; a
+# defaut (pages admin), elle n'est reverifiee qu'au plus toutes les
+# SAISONS_MENU_RECHECK_SECONDS. Si le backend ne repond pas, le dernier menu
+# connu est servi.
+SAISONS_MENU_RECHECK_SECONDS = 30
+
+_saisons_menu = {'version': None, 'checked_at': 0.0, 'data': None}
+
+
+def get_saisons_menu():
+    cached = _saisons_menu['data']
+    now = time.monotonic()
+    version = g.get('data_version')
+    if version is None:
+        if cached is not None and now - _saisons_menu['checked_at'] < SAISONS_MENU_RECHECK_SECONDS:
+            return cached
+        version = fetch_data_version()
+    if cached is not None and version is not None and version == _saisons_menu['version']:
+        _saisons_menu['checked_at'] = now
+        return cached
+
+    data, status = backend_request('GET', '/saisons')
+    if status != 200 or not isinstance(data, list):
+        return cached or []
+    _saisons_menu.update(version=version, checked_at=now, data=data)
+    return data
+
+
+# Le menu n'est lu que si le template s'en sert.
 @app.context_processor
 def inject_saisons():
-    try:
-        data, status = backend_request('GET', '/saisons')
-        if status == 200:
-            return dict(saisons_menu=data)
-    except Exception:
-        pass
-    return dict(saisons_menu=[])
+    return dict(saisons_menu=LocalProxy(get_saisons_menu))
 
 
-def backend_request(method, endpoint, data=None, params=None, headers=None):
+# Appel brut au backend, sans contexte Flask.
+def call_backend(method, endpoint, data=None, params=None, headers=None, timeout=BACKEND_TIMEOUT):
     url = f"{BACKEND_URL}{endpoint}"
     try:
         if method == 'GET':
-            response = requests.get(url, params=params, headers=headers, timeout=5)
+            response = backend_session.get(url, params=params, headers=headers, timeout=timeout)
         elif method == 'POST':
-            response = requests.post(url, json=data, headers=headers, timeout=5)
+            response = backend_session.post(url, json=data, headers=headers, timeout=timeout)
         elif method == 'PUT':
-            response = requests.put(url, json=data, headers=headers, timeout=5)
+            response = backend_session.put(url, json=data, headers=headers, timeout=timeout)
         elif method == 'DELETE':
-            response = requests.delete(url, headers=headers, timeout=5)
+            response = backend_session.delete(url, headers=headers, timeout=timeout)
         else:
             return None, 405
-        
+
         try:
             return response.json(), response.status_code
         except ValueError:
@@ -111,6 +295,144 @@ def backend_request(method, endpoint, data=None, params=None, headers=None):
         return None, 503
 
 
+# Une erreur du backend marque la page comme incomplete (pas d'ETag).
+def backend_result(result):
+    if result[1] >= 500:
+        g.backend_error = True
+    return result
+
+
+def backend_request(method, endpoint, data=None, params=None, headers=None, timeout=BACKEND_TIMEOUT):
+    return backend_result(call_backend(method, endpoint, data, params, headers, timeout))
+
+
+# GET conditionnel sur les pages publiques : l'ETag combine la version de
+# l'application, la date du jour (banniere saisonniere) et la version des
+# donnees du backend. Si le navigateur a deja cette version, on repond 304
+# sans interroger le backend ni rendre le template.
+# Les pages admin et les visiteurs connectes ne sont jamais concernes : leur
+# rendu depend de la session (jeton CSRF, menus admin).
+def is_conditional_request():
+    return (
+        request.method == 'GET'
+        and not request.path.startswith(('/static', '/admin'))
+        and 'admin_token' not in session
+    )
+
+
+def fetch_data_version():
+    try:
+        response = backend_session.get(f"{BACKEND_URL}/data-version", timeout=BACKEND_TIMEOUT_FAST)
+        if response.status_code == 200:
+            return response.headers.get('X-Data-Version')
+    except requests.exceptions.RequestException:
+        pass
+    return None
+
+
+@app.before_request
+def check_data_version():
+    if not is_conditional_request():
+        return None
+    version = fetch_data_version()
+    if version is None:
+        return None
+    g.data_version = version
+    g.page_etag = f"{APP_VERSION}-{BUILD_ID}-{date.today().isoformat()}-{version}"
+    if request.if_none_match.contains_weak(g.page_etag):
+        return app.response_class(status=304)
+    return None
+
+
+# Micro-cache des pages publiques rendues pour les visiteurs anonymes, par
+# processus. La cle est le chemin avec sa query string, sous l'ETag de la page
+# (version de l'application, date du jour, version des donnees) : quand l'ETag
+# change, toutes les pages gardees sont abandonnees. Une page n'est gardee que
+# si son rendu n'a pas touche a la session (jeton CSRF, message flash) ni
+# rencontre d'erreur backend. Les plus anciennes sont evincees au-dela de
+# PAGE_CACHE_MAX_BYTES.
+PAGE_CACHE_ENDPOINTS = {'index', 'classement', 'recap_season', 'stats_joueur_detail', 'stats_tournois'}
+PAGE_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+_page_cache = OrderedDict()
+_page_cache_state = {'etag': None, 'size': 0}
+_page_cache_lock = threading.Lock()
+
+
+def page_cache_get(key, etag):
+    with _page_cache_lock:
+        if _page_cache_state['etag'] != etag:
+            return None
+        body = _page_cache.get(key)
+        if body is not None:
+            _page_cache.move_to_end(key)
+        return body
+
+
+def page_cache_set(key, etag, body):
+    if len(body) > PAGE_CACHE_MAX_BYTES:
+        return
+    with _page_cache_lock:
+        if _page_cache_state['etag'] != etag:
+            _page_cache.clear()
+            _page_cache_state.update(etag=etag, size=0)
+        old = _page_cache.pop(key, None)
+        if old is not None:
+            _page_cache_state['size'] -= len(old)
+        _page_cache[key] = body
+        _page_cache_state['size'] += len(body)
+        while _page_cache_state['size'] > PAGE_CACHE_MAX_BYTES:
+            _, evicted = _page_cache.popitem(last=False)
+            _page_cache_state['size'] -= len(evicted)
+
+
+def is_cacheable_page():
+    return request.endpoint in PAGE_CACHE_ENDPOINTS and g.get('page_etag') is not None
+
+
+# Page identique pour tous les visiteurs anonymes : gardee par le micro-cache
+# du processus et par celui de nginx.
+def is_shareable_page(response):
+    return (
+        is_cacheable_page()
+        and not g.get('backend_error')
+        and not session.modified
+        and response.status_code == 200
+        and response.mimetype == 'text/html'
+    )
+
+
+@app.before_request
+def serve_cached_page():
+    if not is_cacheable_page():
+        return None
+    body = page_cache_get(request.full_path, g.page_etag)
+    if body is None:
+        return None
+    g.page_cache_hit = True
+    return app.response_class(body, mimetype='text/html')
+
+
+@app.after_request
+def store_cached_page(response):
+    if not g.get('page_cache_hit') and is_shareable_page(response):
+        page_cache_set(request.full_path, g.page_etag, response.get_data())
+    return response
+
+
+# Cache de nginx (nginx/snippets/app.conf) : une page partageable y est gardee
+# PROXY_PAGE_CACHE_SECONDS sous la cle de sa version, /_page-version, que
+# nginx consulte avant chaque page publique. Une nouvelle version des donnees
+# change la cle : la duree ne borne que l'espace occupe et le delai de prise
+# en compte d'un deploiement.
+PROXY_PAGE_CACHE_SECONDS = 600
+
+
+@app.route('/_page-version')
+def page_version():
+    return '', 200, {'X-Page-Version': g.get('page_etag') or ''}
+
+
 @app.route('/admin/types-awards', methods=['GET'])
 
 def proxy_types_awards():
@@ -122,16 +444,19 @@ def proxy_types_awards():
 
 @app.route('/joueurs/noms')
 def proxy_joueurs_noms():
-    try:
-        response = requests.get(f'{BACKEND_URL}/joueurs/noms')
-        return jsonify(response.json())
-    except Exception:
-        return jsonify([])
+    data, status = backend_request('GET', '/joueurs/noms')
+    return jsonify(data if status == 200 else [])
+
+@app.route('/joueurs/search')
+def proxy_joueurs_search():
+    params = {k: v for k, v in request.args.items() if k in ('q', 'limit', 'ligue_id')}
+    data, status = backend_request('GET', '/joueurs/search', params=params)
+    return jsonify(data if status == 200 else [])
 
 @app.route('/api/saisons')
 def proxy_saisons_public():
     try:
-        response = requests.get(f'{BACKEND_URL}/saisons')
+        response = backend_session.get(f'{BACKEND_URL}/saisons', timeout=BACKEND_TIMEOUT)
         return jsonify(response.json())
     except Exception:
         return jsonify([])
@@ -155,7 +480,7 @@ def proxy_add_tournament():
     try:
         data = request.get_json()
         headers = {'X-Admin-Token': session.get('admin_token')}
-        response = requests.post(f'{BACKEND_URL}/add-tournament', json=data, headers=headers)
+        response = backend_session.post(f'{BACKEND_URL}/add-tournament', json=data, headers=headers, timeout=BACKEND_TIMEOUT_WRITE)
         return jsonify(response.json()), response.status_code
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
@@ -175,33 +500,51 @@ def get_banner_season():
 
 @app.route('/')
 def index():
-    data, status = backend_request('GET', '/dernier-tournoi')
-    resultats = data if status == 200 and isinstance(data, list) else []
+    data, status = backend_request('GET', '/page/index')
+    resultats = data.get('resultats', []) if status == 200 and isinstance(data, dict) else []
     return render_template("index.html", resultats=resultats, banner_season=get_banner_season())
 
+# Sous-ressources du recap chargees a la demande par la page, une fois le
+# resume et les awards affiches.
+RECAP_LAZY_PARTS = ('charts/trueskill', 'charts/ip', 'charts/positions')
+
+
+def recap_params():
+    params = {'format': 'columns'}
+    ligue_id = request.args.get('ligue_id')
+    if ligue_id:
+        params['ligue_id'] = ligue_id
+    return params
+
+
 @app.route('/recap/<season_slug>')
 def recap_season(season_slug):
-    ligue_id = request.args.get('ligue_id')
     view_mode = request.args.get('view')
 
-    url = f'/stats/recap/{season_slug}'
-    params = []
-    if ligue_id:
-        params.append(f'ligue_id={ligue_id}')
-    if params:
-        url += '?' + '&'.join(params)
+    params = recap_params()
+    if view_mode:
+        params['view'] = view_mode
+    data, status = backend_request('GET', f'/page/recap/{season_slug}', params=params)
+    if status != 200 or not isinstance(data, dict):
+        return render_template("recap.html", error="Saison introuvable ou erreur serveur", saison=None, view_mode=None, new_leagues_data=None, season_slug=season_slug)
 
-    data, status = backend_request('GET', url)
-    if status != 200:
-        return render_template("recap.html", error="Saison introuvable ou erreur serveur", saison=None, view_mode=None, new_leagues_data=None)
+    return render_template("recap.html", saison=data['saison'], view_mode=view_mode, new_leagues_data=data.get('new_leagues'), season_slug=season_slug)
 
-    new_leagues_data = None
-    if view_mode == 'new-leagues' and data.get('include_league_moves'):
-        nl_data, nl_status = backend_request('GET', f'/stats/recap/{season_slug}/new-leagues')
-        if nl_status == 200:
-            new_leagues_data = nl_data
+@app.route('/api/recap/<season_slug>/<path:part>')
+def proxy_recap_part(season_slug, part):
+    if part not in RECAP_LAZY_PARTS:
+        return jsonify({"error": "Ressource inconnue"}), 404
+    data, status = backend_request('GET', f'/stats/recap/{season_slug}/{part}', params=recap_params())
+    return jsonify(data), status
 
-    return render_template("recap.html", saison=data, view_mode=view_mode, new_leagues_data=new_leagues_data)
+# Le tableau des positions est rendu cote serveur et insere tel quel dans la
+# page.
+@app.route('/recap/<season_slug>/breakdown')
+def recap_breakdown(season_slug):
+    data, status = backend_request('GET', f'/stats/recap/{season_slug}/breakdown', params=recap_params())
+    if status != 200:
+        return '', status
+    return render_template("recap_breakdown.html", breakdown=data.get('position_breakdown'))
 
 @app.route('/recap')
 def recap_default():
@@ -216,60 +559,45 @@ def classement():
     vue = request.args.get('vue')
     saison_ligue_id = request.args.get('ligue_id')
 
-    params = {}
+    params = {'format': 'columns'}
     if tier:
         params['tier'] = tier
     if ligue_id:
         params['ligue'] = ligue_id
-
-    data, status = backend_request('GET', '/classement', params=params)
-    distribution_data = {"curve": [], "players": []}
-    if status == 200 and isinstance(data, dict):
-        joueurs = data.get('joueurs', [])
-        distribution_data = data.get('distribution_data', distribution_data)
-        def sort_key(j):
-            tier_val = j.get('tier', '').strip()
-            is_ranked = tier_val not in ['U', '?', 'Unranked']
-            try:
-                score = float(j.get('score_trueskill', 0))
-            except (ValueError, TypeError):
-                score = 0.0
-            return (is_ranked, score)
-        joueurs.sort(key=sort_key, reverse=True)
-    else:
-        joueurs = []
+    if vue:
+        params['vue'] = vue
+    if saison_ligue_id:
+        params['ligue_id'] = saison_ligue_id
+
+    data, status = backend_request('GET', '/page/classement', params=params)
+    if status != 200 or not isinstance(data, dict):
+        data = {}
         flash('Erreur lors du chargement du classement', 'warning')
 
-    ligues = []
-    ligues_data, ligues_status = backend_request('GET', '/ligues')
-    if ligues_status == 200 and isinstance(ligues_data, list):
-        ligues = ligues_data
-
-    seuils = {}
-    seuils_data, seuils_status = backend_request('GET', '/tier-seuils')
-    if seuils_status == 200 and isinstance(seuils_data, dict):
-        seuils = seuils_data
-
-    saison = None
-    if vue == 'saison':
-        s_params = {}
-        if saison_ligue_id:
-            s_params['ligue_id'] = saison_ligue_id
-        s_data, s_status = backend_request('GET', '/classement/saison', params=s_params)
-        if s_status == 200 and isinstance(s_data, dict):
-            saison = s_data
+    joueurs = data.get('joueurs', [])
+    distribution_data = data.get('distribution_data', {"curve": [], "players": []})
+    ligues = data.get('ligues', [])
+    seuils = data.get('seuils', {})
+    saison = data.get('saison')
 
     return render_template("classement.html", joueurs=joueurs, tier_actif=tier, ligue_active=ligue_id, ligues=ligues, seuils=seuils, distribution_data=distribution_data, vue=vue, saison=saison)
 
+# Entrees d'historique rendues avec la page ; la suite est chargee a la
+# demande, par pages de meme taille.
+HISTORIQUE_PAGE_SIZE = 50
+
+
 @app.route('/stats/joueur/<nom>')
 def stats_joueur_detail(nom):
-    data, status = backend_request('GET', f'/stats/joueur/{nom}')
+    data, status = backend_request('GET', f'/stats/joueur/{nom}', params={'historique': HISTORIQUE_PAGE_SIZE})
     if status == 200:
+        historique = data.get('historique', [])
         return render_template(
             "stats_joueur.html", 
             nom=nom,
             stats=data.get('stats', {}),
-            historique=data.get('historique', []),
+            historique=historique,
+            historique_total=data.get('historique_total', len(historique)),
             awards=data.get('awards', []),
             palmares=data.get('palmares', []),
             has_league_data=data.get('has_league_data', False),
@@ -282,6 +610,20 @@ def stats_joueur_detail(nom):
         flash("Erreur lors de la récupération des statistiques.", "danger")
         return redirect(url_for('classement'))
     
+@app.route('/stats/joueur/<nom>/historique')
+def stats_joueur_historique(nom):
+    params = {'offset': request.args.get('offset', 0, type=int), 'limit': HISTORIQUE_PAGE_SIZE}
+    data, status = backend_request('GET', f'/stats/joueur/{nom}/historique', params=params)
+    if status != 200:
+        return '', status
+    return render_template("stats_joueur_historique.html", historique=data.get('data', []))
+
+@app.route('/api/joueur/<nom>/trueskill')
+def proxy_joueur_trueskill(nom):
+    params = {'points': request.args.get('points', type=int)}
+    data, status = backend_request('GET', f'/stats/joueur/{nom}/trueskill', params=params)
+    return jsonify(data), status
+
 @app.route('/confirmation')
 def confirmation():
     return render_template("confirmation.html")
@@ -302,11 +644,22 @@ def stats_joueurs():
         
     return render_template("stats_joueurs.html", joueurs=joueurs, distribution_tiers=dist)
 
+TOURNOIS_PAGE_SIZE = 30
+
 @app.route('/stats/tournois')
 def stats_tournois():
-    data, status = backend_request('GET', '/stats/tournois')
-    tournois = data if status == 200 else []
-    return render_template("stats_tournois.html", tournois=tournois)
+    data, status = backend_request('GET', '/stats/tournois', params={'limit': TOURNOIS_PAGE_SIZE})
+    if status == 200 and isinstance(data, dict):
+        tournois, next_cursor = data.get('data', []), data.get('next_cursor')
+    else:
+        tournois, next_cursor = [], None
+    return render_template("stats_tournois.html", tournois=tournois, next_cursor=next_cursor, page_size=TOURNOIS_PAGE_SIZE)
+
+@app.route('/api/stats/tournois')
+def proxy_stats_tournois():
+    params = {k: v for k, v in request.args.items() if k in ('after', 'limit', 'date_debut', 'date_fin', 'ligue', 'fields')}
+    data, status = backend_request('GET', '/stats/tournois', params=params)
+    return jsonify(data), status
 
 @app.route('/stats/tournoi/<int:tournoi_id>')
 def stats_tournoi_detail(tournoi_id):
@@ -339,7 +692,7 @@ def admin_logout():
     if token:
         try:
             headers = {'X-Admin-Token': token}
-            requests.post(f"{BACKEND_URL}/admin-logout", headers=headers, timeout=2)
+            backend_session.post(f"{BACKEND_URL}/admin-logout", headers=headers, timeout=BACKEND_TIMEOUT_FAST)
         except Exception:
             pass
     session.pop('admin_token', None)
@@ -384,7 +737,7 @@ def add_tournament():
 
         headers = {'X-Admin-Token': session['admin_token']}
         payload = {"date": date_tournoi, "joueurs": joueurs_data}
-        _, status = backend_request('POST', '/add-tournament', data=payload, headers=headers)
+        _, status = backend_request('POST', '/add-tournament', data=payload, headers=headers, timeout=BACKEND_TIMEOUT_WRITE)
         
         if status == 201:
             flash('Tournoi ajouté avec succès !', 'success')
@@ -395,14 +748,12 @@ def add_tournament():
         else:
             flash('Erreur lors de l\'ajout du tournoi.', 'danger')
 
-    data, status = backend_request('GET', '/joueurs/noms')
-    joueurs = data if status == 200 else []
-    return render_template("add_tournament.html", joueurs=joueurs)
+    return render_template("add_tournament.html")
 
 @app.route('/admin/matchmaking', methods=['GET'])
 def matchmaking():
     # Ouvert à tout le monde : la page ne fait que consulter la liste publique
-    # des joueurs (/joueurs/noms) et calcule les équipes côté client, aucune
+    # des joueurs (/joueurs/search) et calcule les équipes côté client, aucune
     # action admin n'est effectuée ici.
     return render_template("matchmaking.html")
 
@@ -414,9 +765,10 @@ def admin_revert_last():
     try:
         headers = {'X-Admin-Token': session.get('admin_token')}
         
-        resp = requests.post(
+        resp = backend_session.post(
             f"{BACKEND_URL}/api/admin/revert-last-tournament",
-            headers=headers 
+            headers=headers,
+            timeout=BACKEND_TIMEOUT_WRITE
         )
         return jsonify(resp.json()), resp.status_code
     except Exception as e:
@@ -500,6 +852,15 @@ def proxy_saisons_save_awards(id):
     data, status = backend_request('POST', f'/admin/saisons/{id}/save-awards', data=payload, headers=headers)
     return jsonify(data), status
 
+@app.route('/admin/jobs/<int:job_id>', methods=['GET'])
+
+def proxy_job_status(job_id):
+    if 'admin_token' not in session:
+        return jsonify({'error': 'Non autorisé'}), 403
+    headers = {'X-Admin-Token': session['admin_token']}
+    data, status = backend_request('GET', f'/admin/jobs/{job_id}', headers=headers)
+    return jsonify(data), status
+
 @app.route('/admin/joueurs', methods=['GET', 'POST'])
 
 def proxy_joueurs():
@@ -553,7 +914,7 @@ def proxy_global_reset():
     if not session.get('admin_token'):
         return jsonify({"error": "Non autorisé"}), 401
     headers = {'X-Admin-Token': session.get('admin_token')}
-    data, status = backend_request('POST', '/api/admin/global-reset', data=request.get_json(), headers=headers)
+    data, status = backend_request('POST', '/api/admin/global-reset', data=request.get_json(), headers=headers, timeout=BACKEND_TIMEOUT_WRITE)
     return jsonify(data), status
 
 @app.route('/admin/revert-global-reset', methods=['POST'])
@@ -562,7 +923,25 @@ def proxy_revert_global_reset():
     if not session.get('admin_token'):
         return jsonify({"error": "Non autorisé"}), 401
     headers = {'X-Admin-Token': session.get('admin_token')}
-    data, status = backend_request('POST', '/api/admin/revert-global-reset', headers=headers)
+    data, status = backend_request('POST', '/api/admin/revert-global-reset', headers=headers, timeout=BACKEND_TIMEOUT_WRITE)
+    return jsonify(data), status
+
+@app.route('/admin/journal', methods=['GET'])
+
+def proxy_journal():
+    if not session.get('admin_token'):
+        return jsonify({"error": "Non autorisé"}), 401
+    headers = {'X-Admin-Token': session.get('admin_token')}
+    data, status = backend_request('GET', '/api/admin/journal', params=request.args, headers=headers)
+    return jsonify(data), status
+
+@app.route('/admin/journal/undo', methods=['POST'])
+
+def proxy_journal_undo():
+    if not session.get('admin_token'):
+        return jsonify({"error": "Non autorisé"}), 401
+    headers = {'X-Admin-Token': session.get('admin_token')}
+    data, status = backend_request('POST', '/api/admin/journal/undo', data=request.get_json(), headers=headers, timeout=BACKEND_TIMEOUT_WRITE)
     return jsonify(data), status
 
 @app.route('/api/ligues', methods=['GET'])
@@ -607,9 +986,17 @@ def admin_ligues_page():
 
 @app.after_request
 def add_header(response):
-    response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
-    response.headers["Pragma"] = "no-cache"
-    response.headers["Expires"] = "0"
+    # Une page rendue apres une erreur backend ne doit pas etre resservie en
+    # 304 : elle reste non cacheable.
+    page_etag = g.get('page_etag')
+    if page_etag and response.status_code in (200, 304) and not g.get('backend_error'):
+        response.set_etag(page_etag, weak=True)
+        response.headers["Cache-Control"] = "private, no-cache"
+    else:
+        response.headers["Cache-Control"] = "no-cache, no-store, must-revalidate"
+        response.headers["Pragma"] = "no-cache"
+        response.headers["Expires"] = "0"
+    response.headers["X-Accel-Expires"] = str(PROXY_PAGE_CACHE_SECONDS) if is_shareable_page(response) else "0"
     response.headers["X-Content-Type-Options"] = "nosniff"
     response.headers["X-Frame-Options"] = "SAMEORIGIN"
     response.headers["X-XSS-Protection"] = "1; mode=block"
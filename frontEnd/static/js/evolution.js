@@ -0,0 +1,34 @@
+// Courbes d'evolution (IP, positions) : le backend peut les envoyer au format
+// "columns" (dates partagees, un tableau par mesure et par joueur), plus leger
+// que le format historique avec un objet par point. Les graphiques attendent
+// ce dernier : on reconstitue ds.points cote navigateur.
+function expandEvolution(raw) {
+    if (!raw || raw.format !== 'columns') return raw;
+    const dates = raw.dates || [];
+
+    raw.datasets.forEach(ds => {
+        if (ds.columns) {
+            const cols = ds.columns;
+            const purKey = raw.ip_version === 'v2' ? 'ip_pur_v2' : 'ip_pur_v1';
+            // La colonne score sert de masque : null = tournoi non joue.
+            ds.points = cols.score.map((score, i) => (score === null ? null : {
+                date: dates[i],
+                position: cols.position[i],
+                score: score,
+                ip_pur_v1: cols.ip_pur_v1[i],
+                ip_pur_v2: cols.ip_pur_v2[i],
+                ip_pur: cols[purKey][i],
+                ip_total_v1: cols.ip_total_v1[i],
+                ip_total_v2: cols.ip_total_v2[i],
+                ip_total: ds.data[i]
+            }));
+        } else if (raw.nb_joueurs) {
+            ds.points = ds.data.map((position, i) => (position === null ? null : {
+                date: dates[i],
+                position: position,
+                nb_joueurs: raw.nb_joueurs[i]
+            }));
+        }
+    });
+    return raw;
+}
@@ -67,6 +67,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
     loadPlayers();
     loadConfig();
+    loadJournal();
 
     const dateInput = document.getElementById('globalResetDate');
     if (dateInput) {
@@ -336,6 +337,7 @@ async function applyGlobalReset() {
         if (res.ok) {
             alert("✅ " + data.message);
             loadPlayers();
+            loadJournal();
         } else {
             alert("⛔ Erreur : " + data.error);
         }
@@ -356,6 +358,7 @@ async function revertGlobalReset() {
         if (res.ok) {
             alert("✅ " + data.message);
             loadPlayers();
+            loadJournal();
         } else {
             alert("⛔ " + data.error);
         }
@@ -363,3 +366,44 @@ async function revertGlobalReset() {
         alert("Erreur de connexion au serveur");
     }
 }
+
+async function loadJournal() {
+    const tbody = document.getElementById('journalBody');
+    if (!tbody) return;
+
+    const ops = await apiCall('/admin/journal?limit=20');
+    if (!Array.isArray(ops)) {
+        tbody.innerHTML = `<tr><td class="has-text-danger">${escapeHtml(ops.error || 'Erreur')}</td></tr>`;
+        return;
+    }
+    if (ops.length === 0) {
+        tbody.innerHTML = '<tr><td class="has-text-grey">Aucune opération annulable.</td></tr>';
+        return;
+    }
+
+    tbody.innerHTML = ops.map((op, i) => `
+        <tr>
+            <td class="has-text-white">${escapeHtml(op.label || op.kind)}</td>
+            <td class="has-text-grey-light">${op.nb_joueurs} joueur(s)</td>
+            <td class="has-text-right">
+                <button class="button is-danger is-outlined is-small" onclick="undoJournal(${i + 1})">
+                    <i class="fas fa-undo"></i>
+                </button>
+            </td>
+        </tr>
+    `).join('');
+}
+
+async function undoJournal(count) {
+    const label = count === 1 ? "la dernière opération" : `les ${count} dernières opérations`;
+    if (!confirm(`Annuler ${label} ?\n\nLes joueurs reviendront à leur état précédent.`)) return;
+
+    const res = await apiCall('/admin/journal/undo', 'POST', { count: count });
+    if (res.status === 'success') {
+        alert("✅ " + res.message);
+        loadPlayers();
+        loadJournal();
+    } else {
+        alert("⛔ " + (res.error || "Erreur inconnue"));
+    }
+}
@@ -222,6 +222,9 @@ let cachedContainer = null;
 let cachedIsMobile = false;
 
 const imageCache = {};
+// Sprites decoupes dans les atlas (scripts/build_static.py), par chemin
+// d'origine : URL blob locale, plus aucune requete.
+const spriteUrls = {};
 
 function getGameTime() {
     return Date.now() - globalTimeOffset;
@@ -308,39 +311,78 @@ function getScreenPosition(worldX, cameraX, screenWidth) {
     return rawDiff;
 }
 
+function loadImage(src) {
+    return new Promise((resolve, reject) => {
+        const img = new Image();
+        img.onload = () => resolve(img);
+        img.onerror = reject;
+        img.src = src;
+    });
+}
+
+// Les atlas sont injectes par la page (window.SMK_SPRITE_ATLASES) quand les
+// assets sont compiles. Chaque feuille, en WebP ou a defaut en PNG, est
+// decoupee une fois en sprites : le reste du bandeau garde des <img> a src
+// classique. Un atlas en echec n'est pas bloquant, ses sprites seront
+// charges un par un.
+function loadSpriteAtlases() {
+    const atlases = window.SMK_SPRITE_ATLASES;
+    if (!atlases || !window.URL || !URL.createObjectURL) return Promise.resolve();
+
+    return Promise.all(atlases.map(atlas =>
+        loadImage(atlas.webp)
+            .catch(() => loadImage(atlas.png))
+            .then(sheet => Promise.all(Object.entries(atlas.frames).map(([path, [x, y, w, h]]) => {
+                const canvas = document.createElement('canvas');
+                canvas.width = w;
+                canvas.height = h;
+                canvas.getContext('2d').drawImage(sheet, x, y, w, h, 0, 0, w, h);
+                return new Promise(resolve => canvas.toBlob(blob => {
+                    if (blob) spriteUrls[`static/${path}`] = URL.createObjectURL(blob);
+                    resolve();
+                }));
+            })))
+            .catch(() => {})
+    ));
+}
+
+function spriteSrc(path) {
+    return spriteUrls[path] || path;
+}
+
 function preloadImages() {
     for (let i = 1; i <= 3; i++) {
         const gImg = new Image();
-        gImg.src = GAME_CONFIG.resources.paths.greenShell(i);
+        gImg.src = spriteSrc(GAME_CONFIG.resources.paths.greenShell(i));
         imageCache[`greenShell_${i}`] = gImg;
 
         const rImg = new Image();
-        rImg.src = GAME_CONFIG.resources.paths.redShell(i);
+        rImg.src = spriteSrc(GAME_CONFIG.resources.paths.redShell(i));
         imageCache[`redShell_${i}`] = rImg;
     }
 
     const banana = new Image();
-    banana.src = GAME_CONFIG.resources.paths.banana;
+    banana.src = spriteSrc(GAME_CONFIG.resources.paths.banana);
     imageCache['banana'] = banana;
 
     const shroom = new Image();
-    shroom.src = GAME_CONFIG.resources.paths.shroom;
+    shroom.src = spriteSrc(GAME_CONFIG.resources.paths.shroom);
     imageCache['shroom'] = shroom;
 
     const star = new Image();
-    star.src = GAME_CONFIG.resources.paths.star;
+    star.src = spriteSrc(GAME_CONFIG.resources.paths.star);
     imageCache['star'] = star;
 
     GAME_CONFIG.resources.characters.forEach(charName => {
         const ppImg = new Image();
-        ppImg.src = GAME_CONFIG.resources.paths.pp(charName);
+        ppImg.src = spriteSrc(GAME_CONFIG.resources.paths.pp(charName));
         imageCache[`pp_${charName}`] = ppImg;
 
         // Toutes les orientations, sinon le premier tête-à-queue clignote
         // le temps que les frames se téléchargent.
         GAME_CONFIG.resources.kartDirections.forEach(dir => {
             const dirImg = new Image();
-            dirImg.src = GAME_CONFIG.resources.paths.charFrame(charName, dir);
+            dirImg.src = spriteSrc(GAME_CONFIG.resources.paths.charFrame(charName, dir));
             imageCache[`kart_${charName}_${dir}`] = dirImg;
         });
     });
@@ -375,7 +417,7 @@ function addKartToLeaderboard(kart) {
     ppDiv.dataset.kartId = kart.id;
 
     const img = document.createElement('img');
-    img.src = GAME_CONFIG.resources.paths.pp(kart.charName);
+    img.src = spriteSrc(GAME_CONFIG.resources.paths.pp(kart.charName));
     img.alt = kart.charName;
     ppDiv.appendChild(img);
 
@@ -538,7 +580,7 @@ function initWorld() {
         sprite.classList.add('kart-sprite');
 
         const img = document.createElement('img');
-        img.src = GAME_CONFIG.resources.paths.char(charName);
+        img.src = spriteSrc(GAME_CONFIG.resources.paths.char(charName));
         img.classList.add('kart-static-png');
 
         sprite.appendChild(img);
@@ -1267,12 +1309,14 @@ function createLandedSnowflake(container, containerWidth) {
 }
 
 document.addEventListener('DOMContentLoaded', () => {
-    preloadImages();
-    initWorld();
-    const _bannerEl = document.getElementById('bannerSection');
-    if (!_bannerEl || _bannerEl.dataset.season === 'winter') initSnow();
-    animate(0);
+    loadSpriteAtlases().then(() => {
+        preloadImages();
+        initWorld();
+        const _bannerEl = document.getElementById('bannerSection');
+        if (!_bannerEl || _bannerEl.dataset.season === 'winter') initSnow();
+        animate(0);
+        document.addEventListener('visibilitychange', handleVisibilityChange);
+    });
     const fadeElements = document.querySelectorAll('.fade-in');
     fadeElements.forEach(el => setTimeout(() => el.classList.add('visible'), 100));
-    document.addEventListener('visibilitychange', handleVisibilityChange);
 });
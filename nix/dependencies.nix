@@ -8,9 +8,12 @@ pkgs.python3.withPackages (
     psycopg2
     trueskill
     numpy
+    orjson
+    zstandard
     bcrypt
     requests
     flask-wtf
     gunicorn
+    gevent
   ]
 )
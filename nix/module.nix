@@ -30,7 +30,26 @@ let
 
       python3 -c 'from backend import sync_sequences, recalculate_tiers; sync_sequences(); recalculate_tiers();';
 
-      gunicorn -w 4 -b 0.0.0.0:${cfg.backend.port} backend:app;
+      gunicorn -w 4 -k gthread --threads 1 --keep-alive 30 -b 0.0.0.0:${cfg.backend.port} backend:app;
+    '';
+  };
+
+  startWorker = pkgs.writeShellApplication {
+    name = "start_mario_crade_worker.sh";
+
+    runtimeInputs = [
+      depsPkg
+    ];
+
+    text = ''
+      cd ${pkg}/backEnd;
+
+      set -a; 
+      # shellcheck disable=SC1091
+      source ${cfg.envFile}; 
+      set +a
+
+      python3 worker.py;
     '';
   };
 
@@ -52,7 +71,7 @@ let
       echo "ENVIRONMENT"
       env
 
-      gunicorn -w 4 -b 0.0.0.0:${cfg.frontend.port} frontend:app;
+      gunicorn -w 4 -k gevent --worker-connections 500 -b 0.0.0.0:${cfg.frontend.port} frontend:app;
     '';
   };
 in
@@ -86,6 +105,21 @@ in
           User = user;
         };
       };
+      mario-crade-worker = {
+        enable = true;
+        after = [
+          "network.target"
+          "mario-crade-backend.service"
+        ];
+        wantedBy = [ "multi-user.target" ];
+        description = "Mario Krade worker";
+        serviceConfig = {
+          User = user;
+          Type = "simple";
+          Restart = "on-failure";
+          ExecStart = "${startWorker}/bin/start_mario_crade_worker.sh";
+        };
+      };
       mario-crade-backend = {
         enable = true;
         after = [ "network.target" ];
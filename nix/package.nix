@@ -18,6 +18,15 @@ stdenvNoCC.mkDerivation {
       ../backEnd/cache.py
       ../backEnd/constants.py
       ../backEnd/utils.py
+      ../backEnd/journal.py
+      ../backEnd/replay.py
+      ../backEnd/jobs.py
+      ../backEnd/worker.py
+      ../backEnd/profiles.py
+      ../backEnd/serialization.py
+      ../backEnd/player_search.py
+      ../backEnd/head_to_head.py
+      ../backEnd/routes_pages.py
       ../backEnd/schema.sql
       ../backEnd/seed.sql
       ../backEnd/dump.sql
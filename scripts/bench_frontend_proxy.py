@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Mesure le surcout des appels frontend -> backend pour une page publique.
+
+Rejoue les appels qu'une page publique fait au backend (version des donnees
+pour l'ETag, menu des saisons, donnees de la page), d'abord comme avant, une
+connexion TCP par appel (requests.get), puis avec la session keep-alive
+partagee du frontend (frontend.backend_session). Affiche, par page, le temps
+median, le p95 et le nombre de connexions ouvertes.
+
+Usage, depuis la racine du projet :
+    make bench-proxy                  # 200 pages
+    make bench-proxy PAGES=1000
+
+Equivalent sans make :
+    docker compose exec -T frontend python - < scripts/bench_frontend_proxy.py [pages]
+"""
+import statistics
+import sys
+import time
+
+import requests
+
+sys.path.insert(0, '/app')
+
+from frontend import BACKEND_URL, BACKEND_TIMEOUT, BACKEND_TIMEOUT_FAST, create_backend_session
+
+PAGE_CALLS = (
+    ('/data-version', BACKEND_TIMEOUT_FAST),
+    ('/saisons', BACKEND_TIMEOUT),
+    ('/classement', BACKEND_TIMEOUT),
+)
+
+
+def opened_connections(http):
+    # urllib3 compte les connexions creees par chaque pool
+    total = 0
+    for adapter in http.adapters.values():
+        pools = adapter.poolmanager.pools
+        total += sum(pools[key].num_connections for key in pools.keys())
+    return total
+
+
+def run(label, get, pages):
+    durations = []
+    for _ in range(pages):
+        start = time.perf_counter()
+        for endpoint, timeout in PAGE_CALLS:
+            resp = get(f"{BACKEND_URL}{endpoint}", timeout)
+            resp.content
+        durations.append(time.perf_counter() - start)
+    durations.sort()
+    p95 = durations[int(len(durations) * 0.95) - 1]
+    print(f"  {label:<22} median {statistics.median(durations) * 1000:7.2f} ms   p95 {p95 * 1000:7.2f} ms")
+
+
+def main():
+    pages = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    print(f"{pages} pages de {len(PAGE_CALLS)} appels backend ({', '.join(e for e, _ in PAGE_CALLS)})")
+
+    # Echauffement : caches du backend remplis avant la mesure
+    for endpoint, timeout in PAGE_CALLS:
+        requests.get(f"{BACKEND_URL}{endpoint}", timeout=timeout)
+
+    run("connexion par appel", lambda url, timeout: requests.get(url, timeout=timeout), pages)
+
+    http = create_backend_session()
+    run("session keep-alive", lambda url, timeout: http.get(url, timeout=timeout), pages)
+    print(f"  connexions ouvertes par la session : {opened_connections(http)} (contre {pages * len(PAGE_CALLS)} sans session)")
+
+
+if __name__ == '__main__':
+    main()
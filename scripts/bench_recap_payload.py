@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Mesure le cout de serialisation et le poids sur le fil des gros payloads.
+
+Prend le recap d'une saison (par defaut la derniere saison annuelle publiee,
+donc une annee complete de tournois) et le classement de saison, tels que le
+backend les renvoie, puis compare :
+  - le temps de serialisation JSON : json de Flask (provider par defaut) contre
+    orjson (serialization.JSONProvider) ;
+  - la taille brute, gzip et zstd du corps, avec le temps de compression.
+
+Usage, depuis la racine du projet :
+    make bench-recap                    # derniere saison annuelle
+    make bench-recap SLUG=annee-2026    # saison donnee
+
+Equivalent sans make :
+    docker compose exec -T backend python - < scripts/bench_recap_payload.py [slug]
+"""
+import gzip
+import json
+import sys
+import time
+
+sys.path.insert(0, '/app')
+
+from constants import GZIP_LEVEL, ZSTD_LEVEL
+from db import get_db_connection
+from backend import app
+from serialization import orjson, zstandard, _ORJSON_OPTIONS, _default
+
+REPEAT = 20
+
+
+def pick_slug(argv):
+    if argv:
+        return argv[0]
+    with get_db_connection() as conn:
+        with conn.cursor() as cur:
+            cur.execute("""
+                SELECT slug FROM saisons
+                WHERE is_active = true
+                ORDER BY is_yearly DESC, date_fin - date_debut DESC, date_fin DESC
+                LIMIT 1
+            """)
+            row = cur.fetchone()
+    return row[0] if row else None
+
+
+def fetch_payload(client, url):
+    start = time.perf_counter()
+    resp = client.get(url, headers={'Accept-Encoding': 'identity'})
+    elapsed = time.perf_counter() - start
+    if resp.status_code != 200:
+        print(f"{url} : HTTP {resp.status_code}")
+        return None, elapsed
+    return json.loads(resp.get_data()), elapsed
+
+
+def timed(fn, repeat=REPEAT):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def bench(name, payload, elapsed):
+    print(f"\n== {name} (reponse complete : {elapsed * 1000:.0f} ms)")
+
+    # Memes reglages que DefaultJSONProvider.dumps en production
+    flask_body, flask_t = timed(lambda: json.dumps(payload, sort_keys=True, separators=(',', ':')).encode())
+    print(f"  json Flask  : {flask_t * 1000:8.2f} ms  {len(flask_body):>10} octets")
+    body = flask_body
+    if orjson is not None:
+        body, orjson_t = timed(lambda: orjson.dumps(payload, default=_default, option=_ORJSON_OPTIONS))
+        print(f"  orjson      : {orjson_t * 1000:8.2f} ms  {len(body):>10} octets  (x{flask_t / orjson_t:.1f})")
+    else:
+        print("  orjson      : non installe")
+
+    gz, gz_t = timed(lambda: gzip.compress(body, compresslevel=GZIP_LEVEL), repeat=5)
+    print(f"  gzip -{GZIP_LEVEL}     : {gz_t * 1000:8.2f} ms  {len(gz):>10} octets  ({len(gz) / len(body):.1%})")
+    if zstandard is not None:
+        cctx = zstandard.ZstdCompressor(level=ZSTD_LEVEL)
+        zs, zs_t = timed(lambda: cctx.compress(body), repeat=5)
+        print(f"  zstd -{ZSTD_LEVEL}     : {zs_t * 1000:8.2f} ms  {len(zs):>10} octets  ({len(zs) / len(body):.1%})")
+    else:
+        print("  zstd        : non installe")
+
+
+def main():
+    slug = pick_slug(sys.argv[1:])
+    if not slug:
+        print("Aucune saison publiee.")
+        return
+
+    with app.test_client() as client:
+        payload, elapsed = fetch_payload(client, f'/stats/recap/{slug}')
+        if payload is not None:
+            bench(f"/stats/recap/{slug}", payload, elapsed)
+
+        payload, elapsed = fetch_payload(client, '/classement/saison')
+        if payload is not None:
+            bench("/classement/saison", payload, elapsed)
+
+
+if __name__ == '__main__':
+    main()
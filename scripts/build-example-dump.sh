@@ -45,8 +45,23 @@ docker exec -i "$CONTAINER" psql -U example -d example -v ON_ERROR_STOP=1 -q -o
 docker exec -i "$CONTAINER" psql -U example -d example -v ON_ERROR_STOP=1 -q -o /dev/null \
   < "$DATA"
 
+# Le générateur n'écrit que les tables de base. Les migrations du 2026-10-18,
+# toutes rejouables, remplissent le reste : compteurs des joueurs, résumé des
+# tournois, pointeurs par ligue et tâches de reconstruction (profils, tiers,
+# confrontations) que le worker exécutera au premier démarrage.
+info "Colonnes dérivées…"
+for migration in backEnd/migrations/2026-10-18_*.sql; do
+  docker exec -i "$CONTAINER" psql -U example -d example -v ON_ERROR_STOP=1 -q -o /dev/null \
+    < "$migration"
+done
+
 info "Extraction…"
-docker exec "$CONTAINER" pg_dump -U example -d example --clean --if-exists > "$OUT"
+# data_version n'est pas figée dans le dump : recréée à chaque restauration,
+# elle repart de l'horodatage courant et ne redistribue jamais une version
+# déjà servie (ETag, cache nginx).
+docker exec "$CONTAINER" pg_dump -U example -d example --clean --if-exists \
+  --exclude-table-data=public.data_version > "$OUT"
+sed -i '/^\\unrestrict /i INSERT INTO public.data_version DEFAULT VALUES;\n' "$OUT"
 sed -i -E 's/ OWNER TO [A-Za-z0-9_]+;/ OWNER TO CURRENT_USER;/g' "$OUT"
 # 644 obligatoire : postgres tourne en uid 70 dans le conteneur db et doit
 # pouvoir lire le fichier lors de l'initialisation.
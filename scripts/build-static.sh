@@ -0,0 +1,38 @@
+#!/usr/bin/env bash
+# Compile frontEnd/static dans frontEnd/static-dist (cf scripts/build_static.py).
+# Le script tourne dans un conteneur python jetable, avec Pillow et brotli :
+# le build ne dépend pas de ce qui est installé sur l'hôte, et un atlas du
+# bandeau ne peut plus manquer en silence.
+set -euo pipefail
+
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+ROOT_DIR="$(cd "$SCRIPT_DIR/.." && pwd)"
+cd "$ROOT_DIR"
+
+if [ -t 1 ]; then
+  C_GREEN='\033[0;32m'; C_RESET='\033[0m'
+else
+  C_GREEN=''; C_RESET=''
+fi
+info() { printf "${C_GREEN}[static]${C_RESET} %s\n" "$1"; }
+
+# Même base que l'image du frontend (frontEnd/Dockerfile.frontend).
+IMAGE="python:3.10-slim"
+DEPS="pillow==12.3.0 brotli==1.2.0"
+
+# static-dist est monté par nginx et le frontend : on le crée ici, à l'uid de
+# l'utilisateur, et le conteneur tourne sous ce même uid pour que les fichiers
+# produits lui appartiennent.
+mkdir -p frontEnd/static-dist
+
+info "Compilation des assets ($IMAGE)…"
+docker run --rm \
+  --user "$(id -u):$(id -g)" \
+  -e HOME=/tmp -e PIP_DISABLE_PIP_VERSION_CHECK=1 \
+  -v "$ROOT_DIR/scripts:/work/scripts:ro" \
+  -v "$ROOT_DIR/frontEnd/static:/work/frontEnd/static:ro" \
+  -v "$ROOT_DIR/frontEnd/static-dist:/work/frontEnd/static-dist" \
+  -w /work \
+  "$IMAGE" \
+  sh -c "pip install --quiet --user --no-cache-dir $DEPS && exec python scripts/build_static.py \"\$@\"" \
+  sh "$@"
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+"""Compile les assets statiques du frontend pour que nginx les serve du disque.
+
+Copie frontEnd/static dans frontEnd/static-dist, puis :
+  - empreinte chaque fichier : css/styles.css -> css/styles.<hash>.css, a cote
+    de l'original. Un nom empreinte ne change jamais de contenu, nginx le sert
+    avec un cache immuable d'un an ; les chemins codes en dur (/static/img/...)
+    restent servis sous leur nom d'origine, avec un cache court ;
+  - reecrit les url(...) relatives des CSS vers les noms empreintes ;
+  - assemble les sprites du bandeau (frames des karts, portraits, objets) en
+    atlas PNG + WebP, un par personnage et un pour les objets : une dizaine de
+    requetes au lieu d'une soixantaine ;
+  - ecrit a cote des fichiers texte une variante .gz (gzip_static de nginx)
+    et, si le module brotli est installe, .br (brotli_static) ;
+  - ecrit manifest.json (nom d'origine -> nom empreinte, cadres des atlas),
+    lu au demarrage par le frontend pour generer les URL.
+
+Les fichiers empreintes du build precedent sont conserves (un build de plus) :
+une page en cache qui les reference reste servie correctement.
+
+Pillow est requis (atlas) ; brotli est facultatif, sans lui seules les
+variantes gzip sont produites.
+
+Usage, depuis la racine du projet :
+    make static
+
+make static lance scripts/build-static.sh, qui execute ce script dans un
+conteneur python avec Pillow et brotli. Equivalent hors conteneur, si Pillow
+est installe :
+    python3 scripts/build_static.py [--src frontEnd/static] [--out frontEnd/static-dist]
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    from PIL import Image
+except ImportError:
+    raise SystemExit("Pillow est requis pour assembler les atlas du bandeau : "
+                     "lancer make static, ou pip install pillow")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HASH_LENGTH = 10
+COMPRESSIBLE = ('.css', '.js', '.svg', '.json', '.txt', '.ico')
+
+# Sprites du bandeau de l'accueil (js/smk-banner.js, GAME_CONFIG.resources) :
+# un atlas par personnage (ses 5 orientations et son portrait), un pour les
+# objets.
+ATLAS_MAX_WIDTH = 1024
+ATLAS_COLORS = 256
+ATLAS_CHARACTERS = ('mario', 'luigi', 'peach', 'toad', 'yoshi', 'bowser', 'dk', 'koopa')
+ATLAS_DIRECTIONS = ('side-right', 'front-right', 'front', 'back-right', 'back')
+ATLAS_ITEMS = (
+    'img/green-shell/green-shell1.png', 'img/green-shell/green-shell2.png', 'img/green-shell/green-shell3.png',
+    'img/red-shell/red-shell1.png', 'img/red-shell/red-shell2.png', 'img/red-shell/red-shell3.png',
+    'img/banana.png', 'img/shroom.png', 'img/star.png',
+)
+
+CSS_URL_RE = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+
+
+def fingerprint(rel_path, data):
+    digest = hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+    base, ext = os.path.splitext(rel_path)
+    return f"{base}.{digest}{ext}"
+
+
+def write_file(out_dir, rel_path, data):
+    path = os.path.join(out_dir, rel_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+# Variantes precompressees, gardees seulement si elles sont plus petites
+# (nginx retomberait sinon sur un fichier plus lourd que l'original).
+def write_compressed(out_dir, rel_path, data):
+    if not rel_path.endswith(COMPRESSIBLE):
+        return 0
+    written = 0
+    gz = gzip.compress(data, compresslevel=9, mtime=0)
+    if len(gz) < len(data):
+        write_file(out_dir, rel_path + '.gz', gz)
+        written += 1
+    if brotli is not None:
+        br = brotli.compress(data, quality=11)
+        if len(br) < len(data):
+            write_file(out_dir, rel_path + '.br', br)
+            written += 1
+    return written
+
+
+def atlas_groups():
+    groups = {}
+    for name in ATLAS_CHARACTERS:
+        groups[f"img/{name}/{name}-atlas"] = (
+            [f"img/{name}/{name}-asset-anime/{name}-{d}.png" for d in ATLAS_DIRECTIONS]
+            + [f"img/{name}/{name}-pp.png"]
+        )
+    groups['img/items-atlas'] = list(ATLAS_ITEMS)
+    return groups
+
+
+# Rangement en etageres : sprites tries par hauteur, poses de gauche a droite
+# jusqu'a ATLAS_MAX_WIDTH. 1 px de marge evite qu'un filtrage du navigateur
+# ne fasse baver un sprite voisin.
+# Chaque sprite source a sa propre palette : reunis, ils depassent 256
+# couleurs et un atlas en couleurs vraies pese deux fois la somme des PNG.
+# L'atlas est donc ramene a colors couleurs, sans tramage (ecart moyen de
+# l'ordre de 5/255 par canal sur les karts) ; colors=0 le garde sans perte.
+def build_atlas(src_dir, out_dir, name, paths, colors):
+    sprites = []
+    for rel_path in paths:
+        with Image.open(os.path.join(src_dir, rel_path)) as img:
+            sprites.append((rel_path, img.convert('RGBA')))
+    sprites.sort(key=lambda s: s[1].height, reverse=True)
+
+    frames, x, y, shelf_h, width = {}, 0, 0, 0, 0
+    for rel_path, img in sprites:
+        if x and x + img.width > ATLAS_MAX_WIDTH:
+            x, y, shelf_h = 0, y + shelf_h + 1, 0
+        frames[rel_path] = [x, y, img.width, img.height]
+        x += img.width + 1
+        shelf_h = max(shelf_h, img.height)
+        width = max(width, x - 1)
+
+    sheet = Image.new('RGBA', (width, y + shelf_h), (0, 0, 0, 0))
+    for rel_path, img in sprites:
+        sheet.paste(img, tuple(frames[rel_path][:2]))
+        img.close()
+    if colors:
+        sheet = sheet.quantize(colors, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+
+    sheet.save(os.path.join(out_dir, f"{name}.png"), optimize=True)
+    sheet.convert('RGBA').save(os.path.join(out_dir, f"{name}.webp"), lossless=True, method=6)
+    return {'png': f"{name}.png", 'webp': f"{name}.webp", 'frames': frames}
+
+
+# Fichiers empreintes du build precedent (et leurs variantes compressees),
+# gardes un build de plus : une page rendue avant ce build, dans le cache
+# nginx ou un onglet ouvert, peut encore les demander. Un nom empreinte ne
+# change jamais de contenu, les garder est sans risque.
+def previous_build_files(out_dir):
+    try:
+        with open(os.path.join(out_dir, 'manifest.json')) as f:
+            hashed = json.load(f)['files'].values()
+    except (OSError, ValueError, KeyError):
+        return set()
+    kept = set()
+    for rel_path in hashed:
+        for variant in (rel_path, rel_path + '.gz', rel_path + '.br'):
+            if os.path.isfile(os.path.join(out_dir, variant)):
+                kept.add(variant)
+    return kept
+
+
+def rewrite_css(rel_path, data, files):
+    css_dir = os.path.dirname(rel_path)
+
+    def replace(match):
+        quote, url = match.group(1), match.group(2)
+        if url.startswith(('data:', 'http:', 'https:', '//', '/', '#')):
+            return match.group(0)
+        url_path, sep, suffix = url.partition('?')
+        target = os.path.normpath(os.path.join(css_dir, url_path)).replace(os.sep, '/')
+        hashed = files.get(target)
+        if hashed is None:
+            return match.group(0)
+        new_url = os.path.relpath(hashed, css_dir or '.').replace(os.sep, '/')
+        return f"url({quote}{new_url}{sep}{suffix}{quote})"
+
+    return CSS_URL_RE.sub(replace, data.decode('utf-8')).encode('utf-8')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--src', default=os.path.join(ROOT, 'frontEnd', 'static'))
+    parser.add_argument('--out', default=os.path.join(ROOT, 'frontEnd', 'static-dist'))
+    parser.add_argument('--colors', type=int, default=ATLAS_COLORS, help="couleurs des atlas, 0 = sans perte")
+    args = parser.parse_args()
+
+    # Vide le dossier sans le supprimer : nginx et le frontend le montent, un
+    # dossier recree ne serait plus celui vu par les conteneurs. Seuls les
+    # fichiers empreintes du build precedent restent.
+    os.makedirs(args.out, exist_ok=True)
+    kept = previous_build_files(args.out)
+    for dirpath, _, filenames in os.walk(args.out, topdown=False):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            if os.path.relpath(path, args.out).replace(os.sep, '/') not in kept:
+                os.remove(path)
+        if dirpath != args.out and not os.listdir(dirpath):
+            os.rmdir(dirpath)
+    shutil.copytree(args.src, args.out, dirs_exist_ok=True)
+
+    atlases = []
+    for name, paths in atlas_groups().items():
+        paths = [p for p in paths if os.path.exists(os.path.join(args.src, p))]
+        if paths:
+            atlases.append(build_atlas(args.src, args.out, name, paths, args.colors))
+
+    sources = []
+    for dirpath, _, filenames in os.walk(args.out):
+        for filename in filenames:
+            rel_path = os.path.relpath(os.path.join(dirpath, filename), args.out).replace(os.sep, '/')
+            if rel_path not in kept:
+                sources.append(rel_path)
+    sources.sort()
+
+    # Les CSS en dernier : leur empreinte depend des noms des images qu'elles
+    # referencent.
+    files, compressed = {}, 0
+    for rel_path in sorted(sources, key=lambda p: p.endswith('.css')):
+        with open(os.path.join(args.out, rel_path), 'rb') as f:
+            data = f.read()
+        if rel_path.endswith('.css'):
+            data = rewrite_css(rel_path, data, files)
+            write_file(args.out, rel_path, data)
+        hashed = fingerprint(rel_path, data)
+        files[rel_path] = hashed
+        write_file(args.out, hashed, data)
+        compressed += write_compressed(args.out, hashed, data)
+        compressed += write_compressed(args.out, rel_path, data)
+
+    with open(os.path.join(args.out, 'manifest.json'), 'w') as f:
+        json.dump({'files': files, 'atlases': atlases}, f, indent=1, sort_keys=True)
+
+    print(f"{len(files)} fichiers empreintes dans {os.path.relpath(args.out)}, "
+          f"{compressed} variantes compressees ({'gzip + brotli' if brotli else 'gzip seul'})")
+    print(f"{len(kept)} fichiers du build precedent conserves")
+    if atlases:
+        sprites = sum(len(a['frames']) for a in atlases)
+        size = sum(os.path.getsize(os.path.join(args.out, files[a['webp']])) for a in atlases)
+        print(f"Bandeau : {sprites} sprites en {len(atlases)} atlas ({size // 1024} Ko en WebP)")
+
+
+if __name__ == '__main__':
+    main()
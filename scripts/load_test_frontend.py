@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Test de charge du frontend : debit et latences sous N visiteurs simultanes.
+
+Chaque visiteur (un thread, une connexion keep-alive) enchaine les pages de
+--paths pendant --duration secondes. Avec --bust, chaque requete porte une
+query string unique : le micro-cache des pages est contourne et chaque page
+interroge le backend, ce qui mesure le modele de workers plutot que le cache.
+
+Pour comparer workers gevent (par defaut) et sync, depuis la racine :
+    make load-front                                   # gevent
+    FRONTEND_WORKER_CLASS=sync docker compose up -d frontend
+    make load-front                                   # sync
+    docker compose up -d frontend                     # retour a gevent
+
+Options de make : URL (http://localhost), CONCURRENCY (200), DURATION (30),
+PATHS ("/,/classement,/stats/tournois"). Equivalent sans make :
+    python3 scripts/load_test_frontend.py --url http://localhost --concurrency 200 --bust
+
+Uniquement la bibliotheque standard : se lance depuis l'hote.
+"""
+import argparse
+import http.client
+import itertools
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+
+def visitor(url, paths, deadline, bust, counter, results, lock):
+    parts = urlsplit(url)
+    conn_cls = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+    conn = None
+    latencies, statuses, errors = [], {}, 0
+    for path in itertools.cycle(paths):
+        if time.monotonic() >= deadline:
+            break
+        if bust:
+            path += ('&' if '?' in path else '?') + f"lt={next(counter)}"
+        start = time.perf_counter()
+        try:
+            if conn is None:
+                conn = conn_cls(parts.hostname, parts.port, timeout=30)
+            conn.request('GET', path)
+            resp = conn.getresponse()
+            resp.read()
+            latencies.append(time.perf_counter() - start)
+            statuses[resp.status] = statuses.get(resp.status, 0) + 1
+            if resp.getheader('Connection', '').lower() == 'close':
+                conn.close()
+                conn = None
+        except (OSError, http.client.HTTPException):
+            errors += 1
+            if conn is not None:
+                conn.close()
+            conn = None
+    if conn is not None:
+        conn.close()
+    with lock:
+        results['latencies'].extend(latencies)
+        results['errors'] += errors
+        for status, count in statuses.items():
+            results['statuses'][status] = results['statuses'].get(status, 0) + count
+
+
+def percentile(values, p):
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--url', default='http://localhost')
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--duration', type=float, default=30)
+    parser.add_argument('--paths', default='/,/classement,/stats/tournois')
+    parser.add_argument('--bust', action='store_true')
+    args = parser.parse_args()
+
+    paths = [p.strip() for p in args.paths.split(',') if p.strip()]
+    results = {'latencies': [], 'errors': 0, 'statuses': {}}
+    lock = threading.Lock()
+    counter = itertools.count()
+    deadline = time.monotonic() + args.duration
+
+    print(f"{args.concurrency} visiteurs, {args.duration:.0f} s, {args.url} {paths}{' (cache contourne)' if args.bust else ''}")
+    threads = [
+        threading.Thread(target=visitor, args=(args.url, paths, deadline, args.bust, counter, results, lock), daemon=True)
+        for _ in range(args.concurrency)
+    ]
+    start = time.monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.monotonic() - start
+
+    latencies = sorted(results['latencies'])
+    if not latencies:
+        print(f"Aucune reponse ({results['errors']} erreurs)")
+        return
+    print(f"  requetes   : {len(latencies)}  ({len(latencies) / elapsed:.1f} req/s)")
+    print(f"  statuts    : {dict(sorted(results['statuses'].items()))}  erreurs reseau : {results['errors']}")
+    print(f"  latence ms : median {statistics.median(latencies) * 1000:.0f}  p95 {percentile(latencies, 0.95) * 1000:.0f}"
+          f"  p99 {percentile(latencies, 0.99) * 1000:.0f}  max {latencies[-1] * 1000:.0f}")
+
+
+if __name__ == '__main__':
+    main()